@@ -9,13 +9,51 @@ a modular structure (src/ directory).
 
 import os
 import subprocess
+import sys
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew, Process
 from crewai_tools import tool
-from langchain_anthropic import ChatAnthropic
+
+# Make the src/ engines importable when run as a script from examples/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.tools.decoder_tools import crack_found_hashes, solve_classical_cipher
+from src.tools.file_analysis import (
+    analyze_jpeg_structure, analyze_pdf_streams, analyze_png_chunks, extract_metadata,
+)
+from src.tools.pattern_tools import detect_text_stego
+from src.tools.stego_tools import (
+    analyze_audio_lsb, analyze_audio_signals, analyze_bmp, analyze_gif_frames, analyze_jpeg_dct,
+    render_image_transforms, scan_png_lsb,
+)
+from src.utils.file_context import borrow, open_context
+from src.utils.helpers import find_flags
+from src.utils.llm_cache import get_llm_cache
+from src.utils.model_router import ModelRouter, STRONG, parse_agent_tiers, stalled
+from src.utils.offline_llm import OFFLINE_LLM, offline_model
+from src.utils.prompt_cache import CachingChatAnthropic, usage_ledger
+from src.utils.run_control import current_run, guard_tool, run_command, start_run
+from src.utils.session_trace import start_trace, stop_trace, trace_report, trace_tool, tracer
+from src.utils.tool_result import ToolResult
+from src.utils.tool_planner import plan_for_file
 
 load_dotenv()
-llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0)
+# Identical prompts (re-runs at temperature 0) are answered from the local response cache;
+# the static role/backstory/tools prefix of each agent prompt uses Anthropic's prompt cache
+llm_cache = get_llm_cache()
+
+
+def _chat_model(**model):
+    """Model for one routing tier; STEGOCREW_OFFLINE_LLM swaps in a local scripted or replayed one."""
+    if OFFLINE_LLM:
+        return offline_model(callbacks=[tracer], **model)
+    return CachingChatAnthropic(temperature=0, cache=llm_cache, callbacks=[tracer], **model)
+
+
+# Routine agents run on a fast model and escalate to the strong one when a task stalls
+router = ModelRouter(
+    _chat_model,
+    agent_tiers=parse_agent_tiers(os.environ.get('STEGOCREW_AGENT_TIERS', '')),
+)
 
 # ==================== HELPER FUNCTIONS ====================
 
@@ -36,101 +74,48 @@ def check_tool_installed(tool_name: str) -> bool:
 # ==================== RECONNAISSANCE TOOLS ====================
 
 @tool
-def get_file_type(file_path: str) -> str:
+def get_file_type(file_path: str) -> ToolResult:
     """Get detailed file type information."""
     if not check_tool_installed('file'):
-        return "❌ file command not installed"
-
-    if not os.path.exists(file_path):
-        return f"❌ File not found: {file_path}"
-
-    try:
-        result = subprocess.run(
-            ['file', '-b', file_path],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        if result.returncode == 0:
-            file_type = result.stdout.strip()
-            size = os.path.getsize(file_path)
-            size_readable = f"{size / 1024:.2f} KB" if size > 1024 else f"{size} bytes"
-
-            return f"📄 File Type: {file_type}\n📊 Size: {size_readable} ({size} bytes)"
-        else:
-            return f"⚠️ file command failed"
-
-    except Exception as e:
-        return f"❌ ERROR: {str(e)}"
-
-
-@tool
-def extract_metadata(file_path: str) -> str:
-    """Extract metadata using exiftool."""
-    if not check_tool_installed('exiftool'):
-        return "❌ exiftool not installed"
+        return ToolResult.failed('get_file_type', "file command not installed")
 
     if not os.path.exists(file_path):
-        return f"❌ File not found: {file_path}"
+        return ToolResult.failed('get_file_type', f"File not found: {file_path}")
 
+    report = ToolResult('get_file_type')
     try:
-        result = subprocess.run(
-            ['exiftool', file_path],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        with report.timed('file'):
+            result = run_command(
+                ['file', '-b', file_path],
+                text=True,
+                timeout=10
+            )
 
         if result.returncode != 0:
-            return "⚠️ Exiftool failed"
-
-        lines = result.stdout.split('\n')
-        interesting = []
-
-        for line in lines:
-            if ': ' in line:
-                # Look for flags or interesting fields
-                if 'CTF{' in line or 'FLAG{' in line or 'flag{' in line:
-                    interesting.append(f"🚩 FLAG IN METADATA! {line}")
-                elif any(keyword in line.lower() for keyword in ['comment', 'description', 'copyright', 'author']):
-                    interesting.append(f"⭐ {line}")
-
-        report = f"📋 Metadata Analysis ({len(lines)} fields):\n\n"
-
-        if interesting:
-            report += "🔍 Interesting Findings:\n" + "\n".join(interesting[:10])
-        else:
-            report += "First 10 fields:\n" + "\n".join(lines[:10])
+            return report.fail("file command failed")
 
+        size = os.path.getsize(file_path)
+        size_readable = f"{size / 1024:.2f} KB" if size > 1024 else f"{size} bytes"
+        report.summary = f"{result.stdout.strip()}; {size_readable} ({size} bytes)"
         return report
 
     except Exception as e:
-        return f"❌ ERROR: {str(e)}"
+        return report.fail(f"ERROR: {str(e)}")
 
 
 @tool
-def calculate_entropy(file_path: str) -> str:
+def calculate_entropy(file_path: str) -> ToolResult:
     """Calculate file entropy (measure of randomness/encryption)."""
-    import math
-    from collections import Counter
-
+    report = ToolResult('calculate_entropy')
     try:
         if not os.path.exists(file_path):
-            return f"❌ File not found: {file_path}"
-
-        with open(file_path, 'rb') as f:
-            data = f.read()
-
-        if len(data) == 0:
-            return "❌ Empty file"
-
-        byte_counts = Counter(data)
-        entropy = 0
+            return report.fail(f"File not found: {file_path}")
 
-        for count in byte_counts.values():
-            p = count / len(data)
-            entropy -= p * math.log2(p)
+        # Byte histogram of the shared mapping, computed once per analysis
+        with report.timed('entropy'), borrow(file_path) as context:
+            if context.size == 0:
+                return report.fail("Empty file")
+            entropy = context.entropy
 
         if entropy > 7.5:
             assessment = "VERY HIGH - likely encrypted/compressed"
@@ -141,183 +126,175 @@ def calculate_entropy(file_path: str) -> str:
         else:
             assessment = "LOW - text or simple data"
 
-        return f"📊 Entropy: {entropy:.4f}/8.0\n💡 Assessment: {assessment}"
+        report.summary = f"entropy {entropy:.4f}/8.0, {assessment}"
+        return report
 
     except Exception as e:
-        return f"❌ ERROR: {str(e)}"
+        return report.fail(f"ERROR: {str(e)}")
 
 
 # ==================== STEGANOGRAPHY TOOLS ====================
 
 @tool
-def extract_with_steghide(file_path: str, password: str = "") -> str:
+def extract_with_steghide(file_path: str, password: str = "") -> ToolResult:
     """Extract hidden data using steghide."""
     if not check_tool_installed('steghide'):
-        return "❌ steghide not installed (optional tool)"
+        return ToolResult.failed('extract_with_steghide', "steghide not installed (optional tool)")
 
     if not os.path.exists(file_path):
-        return f"❌ File not found: {file_path}"
+        return ToolResult.failed('extract_with_steghide', f"File not found: {file_path}")
 
+    report = ToolResult('extract_with_steghide', f"password {password!r}")
     try:
         output_file = file_path + ".extracted"
 
         cmd = ['steghide', 'extract', '-sf', file_path, '-xf', output_file, '-f']
         cmd.extend(['-p', password if password else ''])
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        with report.timed('steghide'):
+            result = run_command(cmd, text=True, timeout=30)
 
         if result.returncode == 0 and os.path.exists(output_file):
-            try:
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    data = f.read()
-                os.remove(output_file)
-
-                if 'CTF{' in data or 'FLAG{' in data or 'flag{' in data:
-                    return f"🚩 FLAG FOUND!\n✅ Extracted data:\n{data[:500]}"
-                else:
-                    return f"✅ Data extracted successfully:\n{data[:500]}"
+            with open(output_file, 'rb') as f:
+                data = f.read()
+            os.remove(output_file)
 
+            report.add_flags(find_flags(data), via='steghide')
+            try:
+                report.notable('extracted', f"{len(data)} bytes", value=data.decode('utf-8'))
             except UnicodeDecodeError:
-                os.remove(output_file)
-                return "✅ Binary data extracted (check manually)"
+                report.notable('extracted', f"{len(data)} bytes of binary data (check manually)", value=data[:64])
 
         elif "could not extract" in result.stderr.lower():
-            return "ℹ️ No steghide data found"
+            report.add('steghide', "no steghide data found")
         else:
-            return "ℹ️ Steghide extraction unsuccessful"
+            report.add('steghide', "extraction unsuccessful")
+
+        return report
 
     except Exception as e:
-        return f"ℹ️ Steghide check complete: {str(e)}"
+        report.add('steghide', f"check complete: {str(e)}")
+        return report
 
 
 @tool
-def analyze_with_binwalk(file_path: str) -> str:
+def analyze_with_binwalk(file_path: str) -> ToolResult:
     """Scan for embedded files using binwalk."""
     if not check_tool_installed('binwalk'):
-        return "❌ binwalk not installed (optional tool)"
+        return ToolResult.failed('analyze_with_binwalk', "binwalk not installed (optional tool)")
 
     if not os.path.exists(file_path):
-        return f"❌ File not found: {file_path}"
+        return ToolResult.failed('analyze_with_binwalk', f"File not found: {file_path}")
 
+    report = ToolResult('analyze_with_binwalk')
     try:
-        result = subprocess.run(
-            ['binwalk', file_path],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-
-        lines = result.stdout.split('\n')
-        findings = []
-
-        for line in lines:
-            if line.strip() and not line.startswith('DECIMAL'):
-                findings.append(line.strip())
-
-        if findings:
-            report = f"🔍 Binwalk found {len(findings)} embedded items:\n\n"
-            report += "\n".join(findings[:15])
-            report += "\n\n💡 Hint: Run 'binwalk -e' to extract files"
-            return report
-        else:
-            return "✓ No embedded files detected"
+        with report.timed('binwalk'):
+            result = run_command(
+                ['binwalk', file_path],
+                text=True,
+                timeout=60
+            )
+
+        for line in result.stdout.split('\n'):
+            fields = line.split(None, 2)
+            if len(fields) == 3 and fields[0].isdigit():
+                report.notable('embedded', fields[2], int(fields[0]))
+
+        embedded = len(report.findings)
+        report.summary = f"{embedded} embedded item(s)" if embedded else "no embedded files detected"
+        if embedded:
+            report.add('hint', "run 'binwalk -e' to extract files")
+        return report
 
     except Exception as e:
-        return f"ℹ️ Binwalk check complete"
+        return report.fail(f"binwalk check incomplete: {str(e)}")
 
 
 # ==================== PATTERN TOOLS ====================
 
 @tool
-def extract_strings(file_path: str, min_length: int = 6) -> str:
+def extract_strings(file_path: str, min_length: int = 6) -> ToolResult:
     """Extract printable strings from file."""
-    if not check_tool_installed('strings'):
-        return "❌ strings not installed"
-
     if not os.path.exists(file_path):
-        return f"❌ File not found: {file_path}"
+        return ToolResult.failed('extract_strings', f"File not found: {file_path}")
 
+    report = ToolResult('extract_strings')
     try:
-        result = subprocess.run(
-            ['strings', '-n', str(min_length), file_path],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        if result.returncode != 0:
-            return "⚠️ strings command failed"
-
-        lines = result.stdout.split('\n')
-        flags = []
-        interesting = []
-        base64_like = []
-
-        for line in lines:
-            line = line.strip()
-
-            if 'CTF{' in line or 'FLAG{' in line or 'flag{' in line:
-                flags.append(f"🚩 {line}")
-            elif any(keyword in line.lower() for keyword in ['password', 'secret', 'key', 'hidden']):
-                interesting.append(f"⭐ {line}")
-            elif len(line) > 40 and all(c.isalnum() or c in '+/=' for c in line):
-                base64_like.append(f"📝 Possible encoded: {line[:60]}...")
-
-        report = f"🔤 Strings Analysis:\n\n"
-
-        if flags:
-            report += "🚩 FLAGS FOUND:\n" + "\n".join(flags[:5]) + "\n\n"
-
-        if interesting:
-            report += "⭐ Interesting:\n" + "\n".join(interesting[:10]) + "\n\n"
-
-        if base64_like:
-            report += "📝 Possible encoded data:\n" + "\n".join(base64_like[:5])
-
-        if not flags and not interesting and not base64_like:
-            report += f"Found {len(lines)} strings (none particularly interesting)"
-
+        # Scanned in-process over the shared mapping instead of running strings(1)
+        count = 0
+        keywords = 0
+
+        with report.timed('scan'), borrow(file_path) as context:
+            for offset, raw in context.strings(min_length):
+                count += 1
+                line = raw.decode('ascii').strip()
+
+                flags = find_flags(line)
+                if flags:
+                    for flag in flags:
+                        report.add_flag(flag, offset + raw.find(flag.encode()), 'strings')
+                elif any(keyword in line.lower() for keyword in ['password', 'secret', 'key', 'hidden']):
+                    keywords += 1
+                    if keywords <= 10:
+                        report.notable('keyword', offset=offset, value=line)
+                elif len(line) > 40 and all(c.isalnum() or c in '+/=' for c in line):
+                    report.notable('possible_encoded', offset=offset, value=line)
+
+        report.summary = f"{count} strings of {min_length}+ characters"
         return report
 
     except Exception as e:
-        return f"❌ ERROR: {str(e)}"
+        return report.fail(f"ERROR: {str(e)}")
 
 
 @tool
-def detect_encoding_type(text: str) -> str:
+def detect_encoding_type(text: str) -> ToolResult:
     """Identify the encoding type of text."""
     import re
 
+    report = ToolResult('detect_encoding_type')
+
     # Base64 pattern
     if re.match(r'^[A-Za-z0-9+/]*={0,2}$', text) and len(text) % 4 == 0 and len(text) > 10:
-        return "🔍 LIKELY BASE64: Contains Base64 character set and proper padding"
+        report.notable('base64', "contains Base64 character set and proper padding")
 
     # Hex pattern
-    if re.match(r'^[0-9A-Fa-f]+$', text) and len(text) % 2 == 0 and len(text) > 10:
-        return "🔍 LIKELY HEXADECIMAL: Contains only hex characters"
+    elif re.match(r'^[0-9A-Fa-f]+$', text) and len(text) % 2 == 0 and len(text) > 10:
+        report.notable('hex', "contains only hex characters")
 
     # Binary pattern
-    if re.match(r'^[01]+$', text) and len(text) > 10:
-        return "🔍 LIKELY BINARY: Contains only 0s and 1s"
+    elif re.match(r'^[01]+$', text) and len(text) > 10:
+        report.notable('binary', "contains only 0s and 1s")
 
     # Check for URL encoding
-    if '%' in text and re.search(r'%[0-9A-Fa-f]{2}', text):
-        return "🔍 LIKELY URL ENCODED: Contains %XX patterns"
+    elif '%' in text and re.search(r'%[0-9A-Fa-f]{2}', text):
+        report.notable('url_encoded', "contains %XX patterns")
 
     # Plain text
-    if all(32 <= ord(c) <= 126 or c in '\n\r\t' for c in text):
-        return "🔍 PLAIN TEXT: All printable ASCII characters"
+    elif all(32 <= ord(c) <= 126 or c in '\n\r\t' for c in text):
+        report.add('plain_text', "all printable ASCII characters")
 
-    return "🔍 UNKNOWN ENCODING: Unable to identify clear pattern"
+    else:
+        report.add('unknown', "unable to identify clear pattern")
+
+    return report
 
 
 # ==================== DECODER TOOLS ====================
 
+def _decoded(report: ToolResult, scheme: str, decoded: str) -> ToolResult:
+    """Record a successful decoding and any flag in it."""
+    report.add_flags(find_flags(decoded), via=scheme)
+    report.notable(scheme, value=decoded)
+    return report
+
+
 @tool
-def decode_base64(text: str) -> str:
+def decode_base64(text: str) -> ToolResult:
     """Attempt to decode Base64 encoded text."""
     import base64
 
+    report = ToolResult('decode_base64')
     try:
         # Clean whitespace
         text = text.strip()
@@ -326,19 +303,16 @@ def decode_base64(text: str) -> str:
         decoded_bytes = base64.b64decode(text)
         decoded = decoded_bytes.decode('utf-8')
 
-        # Check for flag
-        if 'CTF{' in decoded or 'FLAG{' in decoded or 'flag{' in decoded:
-            return f"🚩 FLAG FOUND AFTER DECODING!\n✅ Decoded: {decoded}"
-        else:
-            return f"✅ Base64 decoded successfully:\n{decoded}"
+        return _decoded(report, 'base64', decoded)
 
     except Exception as e:
-        return f"❌ Not valid Base64 or decoding failed: {str(e)}"
+        return report.fail(f"Not valid Base64 or decoding failed: {str(e)}")
 
 
 @tool
-def decode_hex(text: str) -> str:
+def decode_hex(text: str) -> ToolResult:
     """Attempt to decode hexadecimal encoded text."""
+    report = ToolResult('decode_hex')
     try:
         # Remove common prefixes
         text = text.replace('0x', '').replace('\\x', '').strip()
@@ -350,53 +324,76 @@ def decode_hex(text: str) -> str:
         decoded_bytes = bytes.fromhex(text)
         decoded = decoded_bytes.decode('utf-8')
 
-        # Check for flag
-        if 'CTF{' in decoded or 'FLAG{' in decoded or 'flag{' in decoded:
-            return f"🚩 FLAG FOUND AFTER DECODING!\n✅ Decoded: {decoded}"
-        else:
-            return f"✅ Hex decoded successfully:\n{decoded}"
+        return _decoded(report, 'hex', decoded)
 
     except Exception as e:
-        return f"❌ Not valid hex or decoding failed: {str(e)}"
+        return report.fail(f"Not valid hex or decoding failed: {str(e)}")
 
 
 @tool
-def try_common_decodings(text: str) -> str:
+def try_common_decodings(text: str) -> ToolResult:
     """Try multiple common encoding schemes."""
     import base64
+    import codecs
 
-    results = []
+    report = ToolResult('try_common_decodings')
+    decoders = [
+        ('base64', lambda t: base64.b64decode(t).decode('utf-8')),
+        ('hex', lambda t: bytes.fromhex(t.replace('0x', '').replace('\\x', '').replace(' ', '')).decode('utf-8')),
+        ('rot13', lambda t: codecs.decode(t, 'rot_13')),
+    ]
 
-    # Try Base64
-    try:
-        decoded = base64.b64decode(text).decode('utf-8')
-        results.append(f"✅ Base64: {decoded[:100]}")
-        if 'CTF{' in decoded or 'FLAG{' in decoded:
-            results.append("🚩 FLAG FOUND IN BASE64!")
-    except:
-        results.append("❌ Base64: Failed")
-
-    # Try Hex
-    try:
-        text_clean = text.replace('0x', '').replace('\\x', '').replace(' ', '')
-        decoded = bytes.fromhex(text_clean).decode('utf-8')
-        results.append(f"✅ Hex: {decoded[:100]}")
-        if 'CTF{' in decoded or 'FLAG{' in decoded:
-            results.append("🚩 FLAG FOUND IN HEX!")
-    except:
-        results.append("❌ Hex: Failed")
-
-    # Try ROT13
-    try:
-        import codecs
-        decoded = codecs.decode(text, 'rot_13')
-        results.append(f"✅ ROT13: {decoded[:100]}")
-        if 'CTF{' in decoded or 'FLAG{' in decoded:
-            results.append("🚩 FLAG FOUND IN ROT13!")
-    except:
-        results.append("❌ ROT13: Failed")
+    for scheme, decode in decoders:
+        try:
+            _decoded(report, scheme, decode(text))
+        except Exception:
+            report.add(scheme, "failed")
+
+    return report
 
-    return "🔄 Trying multiple decodings:\n\n" + "\n".join(results)
+
+# ==================== EVIDENCE TOOLS ====================
+
+@tool
+def get_evidence(evidence_id: str) -> str:
+    """Full detail of an evidence item by its ID from the digest (e.g. R3, R3.2, T1)."""
+    detail = current_run().evidence.get(evidence_id)
+    if detail is None:
+        return f"❌ Unknown evidence ID: {evidence_id}"
+    return detail
+
+
+# ==================== TOOL REGISTRY ====================
+
+# Every tool the planner (src/utils/tool_planner.py) can hand out, by name.
+# Each is guarded by the current run: a verified flag in any output stops the crew.
+# Calls are recorded while a session trace is active (or answered from a tool replay).
+trace_tool(get_evidence)
+TOOLS = {name: guard_tool(trace_tool(t)) for name, t in {
+    'get_file_type': get_file_type,
+    'extract_metadata': extract_metadata,
+    'calculate_entropy': calculate_entropy,
+    'analyze_jpeg_structure': analyze_jpeg_structure,
+    'analyze_png_chunks': analyze_png_chunks,
+    'analyze_pdf_streams': analyze_pdf_streams,
+    'extract_with_steghide': extract_with_steghide,
+    'analyze_with_binwalk': analyze_with_binwalk,
+    'scan_png_lsb': scan_png_lsb,
+    'analyze_jpeg_dct': analyze_jpeg_dct,
+    'analyze_bmp': analyze_bmp,
+    'analyze_gif_frames': analyze_gif_frames,
+    'analyze_audio_lsb': analyze_audio_lsb,
+    'analyze_audio_signals': analyze_audio_signals,
+    'render_image_transforms': render_image_transforms,
+    'extract_strings': extract_strings,
+    'detect_text_stego': detect_text_stego,
+    'detect_encoding_type': detect_encoding_type,
+    'decode_base64': decode_base64,
+    'decode_hex': decode_hex,
+    'try_common_decodings': try_common_decodings,
+    'solve_classical_cipher': solve_classical_cipher,
+    'crack_found_hashes': crack_found_hashes,
+}.items()}
 
 
 # ==================== AGENT 1: RECONNAISSANCE SPECIALIST ====================
@@ -409,13 +406,9 @@ recon_agent = Agent(
     backstory="""You're the team's file detective. Check file signatures, metadata, entropy -
     the basics that everyone else skips. Weird metadata usually means hidden data.""",
 
-    tools=[
-        get_file_type,
-        extract_metadata,
-        calculate_entropy
-    ],
+    tools=[],  # Set per file by create_tasks() from the tool plan
 
-    llm=llm,
+    llm=router.for_agent('recon'),
     verbose=True
 )
 
@@ -430,12 +423,9 @@ stego_agent = Agent(
     backstory="""You've been running stego tools since 2015. steghide, binwalk, zsteg - you know their
     quirks and failure modes. Start with the obvious, then try the weird stuff.""",
 
-    tools=[
-        extract_with_steghide,
-        analyze_with_binwalk
-    ],
+    tools=[],  # Set per file by create_tasks() from the tool plan
 
-    llm=llm,
+    llm=router.for_agent('stego'),
     verbose=True
 )
 
@@ -450,12 +440,9 @@ pattern_agent = Agent(
     backstory="""Pattern recognition is your thing. base64 ends with '=', hex is all 0-9A-F, binary patterns
     stand out. You've seen enough encoded data to spot it immediately.""",
 
-    tools=[
-        extract_strings,
-        detect_encoding_type
-    ],
+    tools=[],  # Set per file by create_tasks() from the tool plan
 
-    llm=llm,
+    llm=router.for_agent('pattern'),
     verbose=True
 )
 
@@ -470,13 +457,9 @@ decoder_agent = Agent(
     backstory="""Decoding is straightforward: try base64, then hex, then ROT13. If none work, it's probably
     XOR or a multi-layer encoding. Work through them methodically.""",
 
-    tools=[
-        decode_base64,
-        decode_hex,
-        try_common_decodings
-    ],
+    tools=[],  # Set per file by create_tasks() from the tool plan
 
-    llm=llm,
+    llm=router.for_agent('decoder'),
     verbose=True
 )
 
@@ -491,27 +474,46 @@ orchestrator_agent = Agent(
     backstory="""You compile what the team found into something readable. Highlight the flag if found,
     show the solution path, note what didn't work. Keep it concise.""",
 
-    tools=[],  # No tools - synthesizes information
+    tools=[get_evidence],  # Only reads evidence - synthesizes information
 
-    llm=llm,
+    llm=router.for_agent('orchestrator'),
     verbose=True
 )
 
 
 # ==================== TASK DEFINITIONS ====================
 
-def create_tasks(file_path: str):
-    """Create all tasks with proper context chain."""
+def _numbered(steps: list) -> str:
+    """Task step list, indented to sit inside the task descriptions."""
+    return "\n".join(f"        {i}. {step}" for i, step in enumerate(steps, 1))
+
+
+def create_tasks(file_path: str, plan=None):
+    """
+    Create all tasks; each agent gets only the tools planned for this file.
+
+    Tasks carry no raw context from earlier tasks: _run_task() appends the
+    run's evidence digest to each description instead.
+    """
+
+    plan = plan or plan_for_file(file_path)
+    for agent, role in ((recon_agent, 'recon'), (stego_agent, 'stego'),
+                        (pattern_agent, 'pattern'), (decoder_agent, 'decoder')):
+        agent.tools = [TOOLS[name] for name in plan.for_agent(role) if name in TOOLS] + [get_evidence]
+        agent.llm = router.for_agent(role)  # Undo any escalation from the previous file
+    orchestrator_agent.llm = router.for_agent('orchestrator')
+
+    stego_steps = plan.steps('stego') or [
+        f"No extraction tools apply to this {plan.kind} file; review the reconnaissance findings for hidden data"
+    ]
 
     # Task 1: Reconnaissance
     recon_task = Task(
         description=f"""
-        Perform initial reconnaissance on: {file_path}
+        Perform initial reconnaissance on: {file_path} ({plan.kind})
 
         Use your tools to:
-        1. Identify file type and size
-        2. Extract all metadata
-        3. Calculate entropy to detect anomalies
+{_numbered(plan.steps('recon'))}
 
         Provide a clear summary of file characteristics and any unusual findings.
         """,
@@ -523,12 +525,11 @@ def create_tasks(file_path: str):
 
     # Task 2: Steganography Analysis
     stego_task = Task(
-        description="""
+        description=f"""
         Based on the reconnaissance findings, extract hidden data.
 
         Use your tools to:
-        1. Try steghide extraction (with empty password first)
-        2. Scan with binwalk for embedded files
+{_numbered(stego_steps)}
 
         Report all findings, extracted data, and embedded files discovered.
         """,
@@ -536,19 +537,16 @@ def create_tasks(file_path: str):
         expected_output="Steganography analysis with extracted data and embedded files",
 
         agent=stego_agent,
-        context=[recon_task]  # ← Sees reconnaissance findings
     )
 
     # Task 3: Pattern Detection
     pattern_task = Task(
-        description="""
+        description=f"""
         Analyze all data found by reconnaissance and steganography teams.
 
         Use your tools to:
-        1. Extract strings from the original file
-        2. Examine any data extracted by steganography expert
-        3. Identify encoding patterns (base64, hex, etc.)
-        4. Look for CTF flag formats
+{_numbered(plan.steps('pattern') + ["Examine any data extracted by steganography expert",
+                                    "Look for CTF flag formats"])}
 
         Report all suspicious patterns and potential encoded data.
         """,
@@ -556,19 +554,15 @@ def create_tasks(file_path: str):
         expected_output="Pattern analysis with encoding detection and flag candidates",
 
         agent=pattern_agent,
-        context=[recon_task, stego_task]  # ← Sees both previous findings
     )
 
     # Task 4: Decoding
     decoder_task = Task(
-        description="""
+        description=f"""
         Decode all encoded data identified by the pattern hunter.
 
         Use your tools to:
-        1. Decode any base64 strings found
-        2. Decode any hex data found
-        3. Try other common encodings
-        4. Search for flags in all decoded output
+{_numbered(plan.steps('decoder') + ["Search for flags in all decoded output"])}
 
         Report all successfully decoded messages and flags found.
         """,
@@ -576,7 +570,6 @@ def create_tasks(file_path: str):
         expected_output="Decoded messages and all flags discovered",
 
         agent=decoder_agent,
-        context=[pattern_task]  # ← Sees pattern findings
     )
 
     # Task 5: Final Report
@@ -597,12 +590,56 @@ def create_tasks(file_path: str):
         expected_output="Comprehensive final analysis report with all flags and solution path",
 
         agent=orchestrator_agent,
-        context=[recon_task, stego_task, pattern_task, decoder_task]  # ← Sees ALL
     )
 
     return [recon_task, stego_task, pattern_task, decoder_task, orchestrator_task]
 
 
+# ==================== EARLY TERMINATION ====================
+
+def _run_task(task, run):
+    """
+    Run one task in its own crew. Its context is the ranked evidence digest
+    of everything found so far, and its conclusion is added to the evidence.
+    A task that stalls on the fast model is run again on the strong one.
+    """
+    if len(run.evidence):
+        task.description += (
+            "\n        Evidence so far (ranked, flags first; pass an ID to get_evidence for full detail):\n"
+            + run.evidence.digest()
+        )
+    crew = Crew(
+        agents=[task.agent],
+        tasks=[task],
+        process=Process.sequential,
+        verbose=True
+    )
+    usage_ledger.begin(task.agent.role)
+    first = len(run.results)
+    result = crew.kickoff()
+    uses_tools = any(tool is not get_evidence for tool in task.agent.tools)
+    reason = None if run.cancelled else stalled(result, run.results[first:], uses_tools)
+    if reason and router.escalate(task.agent, reason):
+        print(f"⏫ {task.agent.role}: {reason}; retrying on {router.models[STRONG]}")
+        usage_ledger.begin(f"{task.agent.role} (escalated)")
+        result = crew.kickoff()
+    run.evidence.add_note(task.agent.role, result)
+    return result
+
+
+def early_report(run, skipped: list) -> str:
+    """Short final report used instead of the remaining tasks once a verified flag is found."""
+    report = "🚩 FLAG FOUND - analysis stopped early\n\n"
+    # Straight from the structured tool results; no model call needed
+    for result in run.results:
+        for flag in result.flags:
+            report += f"   {flag.render()}  [found by {result.tool}]\n"
+    report += f"\n⏱️ Time to answer: {run.time_to_answer:.1f}s\n"
+    if skipped:
+        report += "⏭️ Skipped: " + ", ".join(skipped) + "\n"
+    return report
+
+
 # ==================== MAIN FUNCTION ====================
 
 def analyze_file(file_path: str):
@@ -627,33 +664,46 @@ def analyze_file(file_path: str):
 
     # Check tool availability
     print("🔧 Tool Status Check:")
-    tools = ['file', 'exiftool', 'strings', 'steghide', 'binwalk']
+    tools = ['file', 'exiftool', 'steghide', 'binwalk']
     for tool in tools:
         status = "✅ Ready" if check_tool_installed(tool) else "⚠️ Not installed (optional)"
         print(f"   {tool:12} {status}")
 
     print("\n" + "="*70 + "\n")
 
-    # Create tasks
-    tasks = create_tasks(file_path)
-
-    # Create crew
-    crew = Crew(
-        agents=[
-            recon_agent,
-            stego_agent,
-            pattern_agent,
-            decoder_agent,
-            orchestrator_agent
-        ],
-        tasks=tasks,
-        process=Process.sequential,  # One agent at a time, in order
-        verbose=True
-    )
+    # Plan tools for this file type, then create tasks
+    plan = plan_for_file(file_path)
+    print(f"🧭 {plan.summary()}")
+    print("\n" + "="*70 + "\n")
+    tasks = create_tasks(file_path, plan)
 
-    # Execute analysis
+    # Execute analysis one task at a time, in order, so a verified flag found by
+    # any tool ends the run before the next agent starts. In-process tools share
+    # one mapping of the file while it runs.
     print("🚀 Starting analysis...\n")
-    result = crew.kickoff()
+    run = start_run()
+    usage_ledger.reset()
+    router.reset()
+    trace = start_trace(file=file_path, kind=plan.kind)  # STEGOCREW_TRACE=<path> records the run
+    *investigation, orchestrator_task = tasks
+    skipped = []
+    try:
+        with open_context(file_path):
+            for task in investigation:
+                if run.cancelled:
+                    skipped.append(task.agent.role)
+                    continue
+                _run_task(task, run)
+            if run.cancelled:
+                skipped.append(orchestrator_task.agent.role)
+                result = early_report(run, skipped)
+            else:
+                result = _run_task(orchestrator_task, run)
+    except KeyboardInterrupt:
+        run.cancel("interrupted")  # Kills any external tool still running
+        raise
+    finally:
+        stop_trace(flags=[flag for flag, _ in run.flags], stopped=run.reason)
 
     # Display final result
     print("\n" + "="*70)
@@ -661,6 +711,15 @@ def analyze_file(file_path: str):
     print("="*70)
     print(result)
     print("="*70)
+    print("🪙 Tokens per task (prompt cache):")
+    print(usage_ledger.report())
+    print("🧠 Model tiers:")
+    print(router.tier_report(usage_ledger.calls))
+    if llm_cache is not None:
+        print(f"💾 LLM cache: {llm_cache.store.summary()}")
+    if trace is not None:
+        print(f"🎞️ Session trace: {trace.path}")
+        print(trace_report(trace.path))
 
     return result
 
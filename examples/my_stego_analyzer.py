@@ -8,13 +8,24 @@ Complete the TODOs to create a working CTF challenge solver.
 
 import os
 import subprocess
+import sys
 from dotenv import load_dotenv
 from crewai import Agent, Task, Crew
 from crewai_tools import tool
 from langchain_anthropic import ChatAnthropic
 
+# Make src/ importable when run as a script from examples/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.utils.llm_cache import get_llm_cache
+from src.utils.offline_llm import OFFLINE_LLM, offline_model
+
 load_dotenv()
-llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0)
+# Re-runs of the same challenge are answered from the local response cache;
+# STEGOCREW_OFFLINE_LLM=scripted runs without the API (see src/utils/offline_llm.py)
+if OFFLINE_LLM:
+    llm = offline_model()
+else:
+    llm = ChatAnthropic(model="claude-3-5-sonnet-20241022", temperature=0, cache=get_llm_cache())
 
 # ==================== HELPER FUNCTIONS ====================
 
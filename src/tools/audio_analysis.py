@@ -0,0 +1,246 @@
+"""
+WAV/AU audio analysis for StegoCrew
+
+Parses RIFF/WAVE and Sun AU headers and memory-maps the sample data as a
+typed (frames, channels) NumPy array. 24-bit PCM is read through a view
+with a 3-byte stride, and mu-law AU keeps its 8-bit codes (the values LSB
+tools embed into) and is expanded to linear PCM only for signal analysis.
+LSB extraction and the chi-square attack walk the samples in fixed-size
+blocks, so hour-long recordings are processed in bounded memory.
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from .steganalysis import chi_square_profile, pack_bits, scan_stream
+
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# AU encoding -> NumPy dtype (AU data is big-endian)
+AU_MULAW = 1
+AU_ENCODINGS = {
+    1: 'u1',     # 8-bit G.711 mu-law codes
+    2: '>i1',    # 8-bit linear PCM
+    3: '>i2',    # 16-bit linear PCM
+    5: '>i4',    # 32-bit linear PCM
+    6: '>f4',    # 32-bit float
+    7: '>f8',    # 64-bit float
+}
+
+BLOCK_FRAMES = 1 << 16
+
+
+def _mulaw_table() -> np.ndarray:
+    """G.711 mu-law code -> 16-bit linear sample."""
+    code = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((code & 0x0F) << 3) + 0x84 << ((code >> 4) & 0x07)) - 0x84
+    return np.where(code & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+MULAW_TABLE = _mulaw_table()
+
+
+class AudioFile:
+    """Header fields plus a memory-mapped (frames, channels) sample array."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+        with open(file_path, 'rb') as f:
+            magic = f.read(4)
+            if magic == b'RIFF':
+                self._parse_wave(f)
+            elif magic == b'.snd':
+                self._parse_au(f)
+            else:
+                raise ValueError("Not a WAV or AU file")
+
+        # Truncated files declare more data than they hold
+        available = os.path.getsize(file_path) - self.data_offset
+        frame_bytes = self.sample_bytes * self.channels
+        self.frames = min(self.data_size, available) // frame_bytes
+        if self.frames == 0:
+            raise ValueError("Audio file contains no sample data")
+
+        if self.sample_bytes == 3:
+            # Each 4-byte read starts one byte early, so its top three bytes are the
+            # sample; iter_blocks() shifts the stray low byte out, keeping the sign
+            raw = np.memmap(file_path, dtype='u1', mode='r', offset=self.data_offset - 1,
+                            shape=(self.frames * frame_bytes + 1,))
+            self.samples = np.ndarray((self.frames, self.channels), dtype=self.dtype, buffer=raw,
+                                      strides=(frame_bytes, 3))
+        else:
+            self.samples = np.memmap(file_path, dtype=self.dtype, mode='r', offset=self.data_offset,
+                                     shape=(self.frames, self.channels))
+
+    def _parse_wave(self, f):
+        size, wave = struct.unpack('<I4s', f.read(8))
+        if wave != b'WAVE':
+            raise ValueError("RIFF file is not WAVE")
+
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError("WAV file has no data chunk")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+
+            if chunk_id == b'fmt ':
+                fmt = f.read(chunk_size)
+                f.seek(chunk_size & 1, 1)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError("WAV data chunk before fmt chunk")
+                self.data_offset = f.tell()
+                self.data_size = chunk_size
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)  # Chunks are word-aligned
+
+        audio_format, self.channels, self.sample_rate = struct.unpack('<HHI', fmt[:8])
+        self.bits = struct.unpack('<H', fmt[14:16])[0]
+        if audio_format == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            audio_format = struct.unpack('<H', fmt[24:26])[0]  # First two bytes of the subformat GUID
+
+        if audio_format == WAVE_FORMAT_PCM and self.bits in (8, 16, 24, 32):
+            # 8-bit WAV is unsigned, everything wider is signed; 24-bit is read as int32
+            self.dtype = np.dtype({8: 'u1', 16: '<i2', 24: '<i4', 32: '<i4'}[self.bits])
+            self.encoding = 'pcm'
+        elif audio_format == WAVE_FORMAT_IEEE_FLOAT and self.bits in (32, 64):
+            self.dtype = np.dtype({32: '<f4', 64: '<f8'}[self.bits])
+            self.encoding = 'float'
+        else:
+            raise ValueError(f"Unsupported WAV encoding: format {audio_format}, {self.bits}-bit")
+        self.sample_bytes = self.bits // 8
+        self.format = 'wav'
+
+    def _parse_au(self, f):
+        offset, size, encoding, self.sample_rate, self.channels = struct.unpack('>IIIII', f.read(20))
+        if encoding not in AU_ENCODINGS:
+            raise ValueError(f"Unsupported AU encoding {encoding}")
+
+        self.dtype = np.dtype(AU_ENCODINGS[encoding])
+        self.sample_bytes = self.dtype.itemsize
+        self.bits = self.sample_bytes * 8
+        self.encoding = 'mulaw' if encoding == AU_MULAW else ('float' if self.dtype.kind == 'f' else 'pcm')
+        self.data_offset = offset
+        if size == 0xFFFFFFFF:  # Unknown size: data runs to end of file
+            f.seek(0, 2)
+            size = f.tell() - offset
+        self.data_size = size
+        self.format = 'au'
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def is_integer(self) -> bool:
+        return self.dtype.kind in 'iu'
+
+    def iter_blocks(self, block_frames: int = BLOCK_FRAMES):
+        """Yield (frames, channels) sample blocks of at most block_frames frames (mu-law as codes)."""
+        for start in range(0, self.frames, block_frames):
+            block = self.samples[start:start + block_frames]
+            yield block >> 8 if self.sample_bytes == 3 else block
+
+    def iter_linear(self, block_frames: int = BLOCK_FRAMES):
+        """Yield (frames, channels) float32 blocks scaled to [-1, 1), mu-law expanded."""
+        if self.encoding == 'mulaw':
+            offset, scale = 0.0, 32768.0
+        elif self.dtype.kind == 'u':
+            offset, scale = 128.0, 128.0  # 8-bit WAV is unsigned around 128
+        elif self.dtype.kind == 'i':
+            offset, scale = 0.0, float(1 << (self.bits - 1))
+        else:
+            offset, scale = 0.0, 1.0
+
+        for block in self.iter_blocks(block_frames):
+            if self.encoding == 'mulaw':
+                block = MULAW_TABLE[block]
+            yield (block.astype(np.float32) - offset) / scale
+
+    def iter_lsb_bytes(self, channels=None, bits: int = 1, block_frames: int = BLOCK_FRAMES):
+        """
+        Yield the low bits of the samples as packed bytes.
+
+        Samples are read frame by frame, interleaving the chosen channels in
+        order, and the lowest `bits` bits of each sample are emitted MSB first
+        (so bits=2 gives bit 1 then bit 0), matching common WAV LSB tools.
+
+        Args:
+            channels: Channel indexes to read (default: all)
+            bits: Number of low bits taken from each sample
+            block_frames: Frames processed per step (bounds memory use)
+        """
+        if not self.is_integer:
+            raise ValueError("LSB extraction needs integer PCM samples")
+
+        selector = list(range(self.channels)) if channels is None else list(channels)
+        shifts = np.arange(bits - 1, -1, -1)
+
+        def bit_blocks():
+            for block in self.iter_blocks(block_frames):
+                # Two's complement low bits are the same whether the view is signed or not
+                values = block[:, selector].astype(np.int64) & ((1 << bits) - 1)
+                yield (values[..., None] >> shifts) & 1
+
+        return pack_bits(bit_blocks())
+
+    def chi_square(self, channel: int = 0, steps: int = 10, block_frames: int = BLOCK_FRAMES) -> list:
+        """Chi-square attack profile on one channel's samples."""
+        if not self.is_integer:
+            raise ValueError("Chi-square attack needs integer PCM samples")
+
+        # Masking to the low 8 or 16 bits keeps every (2k, 2k+1) pair together
+        mask = 0xFF if self.dtype.itemsize == 1 else 0xFFFF
+        blocks = (block[:, channel].astype(np.int64) & mask for block in self.iter_blocks(block_frames))
+        return chi_square_profile(blocks, self.frames, bins=mask + 1, steps=steps)
+
+    def peak_levels(self, block_frames: int = BLOCK_FRAMES) -> np.ndarray:
+        """Per-channel absolute peak, computed block by block."""
+        peak = np.zeros(self.channels)
+        for block in self.iter_blocks(block_frames):
+            peak = np.maximum(peak, np.abs(block.astype(np.float64)).max(axis=0))
+        return peak
+
+
+def analyze_audio(file_path: str, bits: int = 1, max_bytes: int = None) -> dict:
+    """
+    Header summary, per-channel chi-square profile and LSB flag scan.
+
+    Args:
+        file_path: WAV or AU file
+        bits: Low bits per sample to extract (1-4 covers most tools)
+        max_bytes: Cap on LSB bytes scanned (None = whole file)
+
+    Returns:
+        Dict with 'header', 'chi_square' (channel -> profile) and 'lsb' results
+    """
+    audio = AudioFile(file_path)
+
+    result = {
+        'header': {
+            'format': audio.format,
+            'channels': audio.channels,
+            'sample_rate': audio.sample_rate,
+            'bits': audio.bits,
+            'encoding': audio.encoding,
+            'frames': audio.frames,
+            'duration': round(audio.duration, 3),
+        },
+        'chi_square': {},
+        'lsb': None,
+    }
+
+    if audio.is_integer:
+        result['chi_square'] = {ch: audio.chi_square(ch) for ch in range(audio.channels)}
+        result['lsb'] = scan_stream(audio.iter_lsb_bytes(bits=bits), max_bytes)
+
+    return result
@@ -0,0 +1,153 @@
+"""
+Memory-mapped BMP access for StegoCrew
+
+Parses the BMP file and DIB headers and exposes the pixel array as a NumPy
+memmap view with the right row stride, padding and orientation, so bit-plane
+extraction and steganalysis touch pixel data in place instead of reading a
+multi-GB cover into Python bytes.
+"""
+
+import struct
+
+import numpy as np
+
+from .steganalysis import chi_square_profile, pack_bits, scan_stream
+
+
+BI_RGB = 0
+BI_BITFIELDS = 3
+BI_ALPHABITFIELDS = 6
+
+# Uncompressed pixel layouts the memmap view supports: bits -> channel letters (file order)
+LAYOUTS = {
+    8: 'i',       # Palette index
+    24: 'bgr',
+    32: 'bgra',
+}
+
+
+class BMPImage:
+    """Header fields plus zero-copy views onto a BMP's pixel array."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+        with open(file_path, 'rb') as f:
+            file_header = f.read(14)
+            if len(file_header) < 14 or file_header[:2] != b'BM':
+                raise ValueError("Not a BMP file")
+            self.pixel_offset = struct.unpack('<I', file_header[10:14])[0]
+
+            dib_size = struct.unpack('<I', f.read(4))[0]
+            dib = f.read(dib_size - 4)
+
+            if dib_size == 12:  # BITMAPCOREHEADER
+                width, height, _, bits = struct.unpack('<HHHH', dib[:8])
+                compression, colors_used = BI_RGB, 0
+                palette_entry = 3
+            else:
+                width, height, _, bits, compression = struct.unpack('<iiHHI', dib[:16])
+                colors_used = struct.unpack('<I', dib[28:32])[0] if len(dib) >= 32 else 0
+                palette_entry = 4
+
+            self.palette = None
+            if bits <= 8:
+                count = colors_used or (1 << bits)
+                if compression == BI_BITFIELDS:
+                    f.seek(12, 1)
+                raw = f.read(count * palette_entry)
+                self.palette = np.frombuffer(raw, dtype=np.uint8).reshape(-1, palette_entry)[:, 2::-1]
+
+        if compression not in (BI_RGB, BI_BITFIELDS, BI_ALPHABITFIELDS) or bits not in LAYOUTS:
+            raise ValueError(f"Unsupported BMP layout: {bits}-bit, compression {compression}")
+
+        self.width = width
+        self.height = abs(height)
+        self.top_down = height < 0
+        self.bits = bits
+        self.channels = LAYOUTS[bits]
+        self.stride = ((bits * width + 31) // 32) * 4
+
+        self._rows = np.memmap(file_path, dtype=np.uint8, mode='r',
+                               offset=self.pixel_offset, shape=(self.height, self.stride))
+
+    @property
+    def raw_rows(self) -> np.ndarray:
+        """(height, stride) rows exactly as stored on disk, padding included."""
+        return self._rows
+
+    @property
+    def file_pixels(self) -> np.ndarray:
+        """(height, width, channels) view with padding stripped, rows in file order."""
+        depth = len(self.channels)
+        return self._rows[:, :self.width * depth].reshape(self.height, self.width, depth)
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """Same view flipped as needed so the top image row comes first."""
+        return self.file_pixels if self.top_down else self.file_pixels[::-1]
+
+    def channel(self, letter: str) -> np.ndarray:
+        """2-D view of a single channel ('r', 'g', 'b', 'a' or 'i')."""
+        if letter not in self.channels:
+            raise ValueError(f"Channel {letter} not present in {self.bits}-bit BMP")
+        return self.pixels[..., self.channels.index(letter)]
+
+    def iter_row_blocks(self, rows_per_block: int = 256, image_order: bool = False):
+        """Yield (rows, width, channels) blocks; file order unless image_order."""
+        view = self.pixels if image_order else self.file_pixels
+        for start in range(0, self.height, rows_per_block):
+            yield view[start:start + rows_per_block]
+
+    def iter_bit_plane(self, channels: str = None, bit: int = 0,
+                       image_order: bool = False, rows_per_block: int = 256):
+        """
+        Yield a bit plane as packed bytes, a block of rows at a time.
+
+        Args:
+            channels: Channel letters in extraction order (default: file order, no alpha)
+            bit: Bit position (0 = least significant)
+            image_order: Walk rows top-down instead of in file order
+            rows_per_block: Rows decoded per step (bounds memory use)
+        """
+        channels = channels or self.channels.replace('a', '')
+        selector = [self.channels.index(c) for c in channels]
+
+        def bit_blocks():
+            for block in self.iter_row_blocks(rows_per_block, image_order):
+                yield (block[..., selector] >> bit) & 1
+
+        return pack_bits(bit_blocks())
+
+    def chi_square(self, letter: str, steps: int = 10, rows_per_block: int = 256) -> list:
+        """Chi-square attack profile for one channel, in file (embedding) order."""
+        index = self.channels.index(letter)
+        blocks = (block[..., index] for block in self.iter_row_blocks(rows_per_block))
+        return chi_square_profile(blocks, self.width * self.height, steps=steps)
+
+
+def analyze_bmp(file_path: str, max_bytes: int = None) -> dict:
+    """
+    Header summary, per-channel chi-square profile and LSB flag scan.
+
+    Args:
+        file_path: BMP to analyze
+        max_bytes: Cap on LSB bytes scanned (None = whole plane)
+
+    Returns:
+        Dict with 'header', 'chi_square' (channel -> profile) and 'lsb' (scan result)
+    """
+    bmp = BMPImage(file_path)
+
+    return {
+        'header': {
+            'width': bmp.width,
+            'height': bmp.height,
+            'bits': bmp.bits,
+            'top_down': bmp.top_down,
+            'stride': bmp.stride,
+            'pixel_offset': bmp.pixel_offset,
+        },
+        'chi_square': {letter: bmp.chi_square(letter) for letter in bmp.channels if letter != 'a'},
+        'lsb': scan_stream(bmp.iter_bit_plane(), max_bytes),
+    }
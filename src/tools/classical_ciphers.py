@@ -0,0 +1,319 @@
+"""
+Classical cipher solver for StegoCrew
+
+Caesar/ROT, Atbash and affine keys are all decrypted and scored in one
+NumPy pass; Vigenère key length comes from the index of coincidence and
+each key letter from a per-column chi-square, then a quadgram hill-climb
+polishes the key; rail fence tries every rail count. Candidates are
+ranked by English quadgram log-probability (table loaded once per
+process) with flag matches first.
+"""
+
+import functools
+import os
+import re
+
+import numpy as np
+
+from ..utils.helpers import find_flags
+
+
+QUADGRAM_FILE = os.path.join(os.path.dirname(__file__), 'data', 'english_quadgrams.txt')
+
+# A-Z relative frequencies in English text
+ENGLISH_FREQUENCIES = np.array([
+    8.167, 1.492, 2.782, 4.253, 12.702, 2.228, 2.015, 6.094, 6.966, 0.153, 0.772, 4.025, 2.406,
+    6.749, 7.507, 1.929, 0.095, 5.987, 6.327, 9.056, 2.758, 0.978, 2.360, 0.150, 1.974, 0.074,
+]) / 100
+UPPERCASE = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+AFFINE_MULTIPLIERS = (1, 3, 5, 7, 9, 11, 15, 17, 19, 21, 23, 25)
+
+
+# ==================== SCORING ====================
+
+@functools.lru_cache(maxsize=1)
+def load_quadgrams(path: str = QUADGRAM_FILE) -> np.ndarray:
+    """
+    Dense 26^4 table of log10 quadgram probabilities.
+
+    The text file has one "QUAD count" pair per line; quadgrams missing from
+    it get a floor of log10(0.01 / total). Cached, so the file is parsed once.
+    """
+    counts = {}
+    with open(path, 'r', encoding='ascii') as f:
+        for line in f:
+            quad, count = line.split()
+            counts[quad] = int(count)
+
+    total = sum(counts.values())
+    table = np.full(26 ** 4, np.log10(0.01 / total), dtype=np.float32)
+    for quad, count in counts.items():
+        a, b, c, d = (ord(ch) - 65 for ch in quad)
+        table[((a * 26 + b) * 26 + c) * 26 + d] = np.log10(count / total)
+    table.flags.writeable = False
+    return table
+
+
+def quadgram_scores(candidates: np.ndarray) -> np.ndarray:
+    """
+    Average quadgram log-probability of each row of letter indices (0-25).
+
+    Args:
+        candidates: (k, n) or (n,) array of letter indices
+
+    Returns:
+        (k,) array; higher is more English-like
+    """
+    candidates = np.atleast_2d(candidates).astype(np.int32)
+    if candidates.shape[1] < 4:
+        # Too short for quadgrams: fall back to letter frequencies
+        return np.log10(ENGLISH_FREQUENCIES)[candidates].mean(axis=1)
+    index = ((candidates[:, :-3] * 26 + candidates[:, 1:-2]) * 26 + candidates[:, 2:-1]) * 26 + candidates[:, 3:]
+    return load_quadgrams()[index].mean(axis=1)
+
+
+def index_of_coincidence(letters: np.ndarray) -> float:
+    n = len(letters)
+    if n < 2:
+        return 0.0
+    counts = np.bincount(letters, minlength=26)
+    return float((counts * (counts - 1)).sum() / (n * (n - 1)))
+
+
+def chi_square_shifts(letters: np.ndarray) -> np.ndarray:
+    """Chi-square against English for every Caesar shift of the letters, shape (26,)."""
+    counts = np.bincount(letters, minlength=26).astype(np.float64)
+    # Row s = counts seen after undoing shift s
+    shifted = counts[(np.arange(26)[None, :] + np.arange(26)[:, None]) % 26]
+    expected = ENGLISH_FREQUENCIES * max(len(letters), 1)
+    return ((shifted - expected) ** 2 / expected).sum(axis=1)
+
+
+# ==================== TEXT HANDLING ====================
+
+class LetterText:
+    """Ciphertext split into letter indices plus what is needed to rebuild case and punctuation."""
+
+    __slots__ = ('text', 'positions', 'letters', 'upper')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.positions = np.array([i for i, ch in enumerate(text) if 'a' <= ch.lower() <= 'z'], dtype=np.int64)
+        raw = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        codes = raw[self.positions] if len(self.positions) else np.zeros(0, dtype=np.uint32)
+        self.upper = codes < 97
+        self.letters = (codes - np.where(self.upper, 65, 97)).astype(np.uint8)
+
+    def render(self, letters: np.ndarray) -> str:
+        """Put decrypted letter indices back into the original text."""
+        chars = list(self.text)
+        codes = letters.astype(np.uint32) + np.where(self.upper, 65, 97)
+        for position, code in zip(self.positions.tolist(), codes.tolist()):
+            chars[position] = chr(code)
+        return ''.join(chars)
+
+
+def _result(cipher: str, key, text: str, score: float) -> dict:
+    return {'cipher': cipher, 'key': key, 'plaintext': text, 'score': round(float(score), 4),
+            'flags': find_flags(text)}
+
+
+# ==================== MONOALPHABETIC ====================
+
+def solve_affine(source: LetterText) -> list:
+    """
+    Every affine key (a, b) at once, including Caesar (a = 1) and Atbash (a = b = 25).
+
+    Returns:
+        List of result dicts for all 312 keys, best first
+    """
+    letters = source.letters.astype(np.int32)
+    multipliers = np.array(AFFINE_MULTIPLIERS)
+    inverses = np.array([pow(int(a), -1, 26) for a in multipliers])
+    a_inv = np.repeat(inverses, 26)[:, None]
+    b = np.tile(np.arange(26), len(multipliers))[:, None]
+
+    # (312, 26) decryption alphabets: p = a^-1 * (c - b) mod 26
+    alphabets = (a_inv * (np.arange(26)[None, :] - b)) % 26
+    scores = quadgram_scores(alphabets[:, letters])
+
+    results = []
+    for row in np.argsort(-scores):
+        a, shift = int(multipliers[row // 26]), int(row % 26)
+        if a == 1:
+            name, key = ('rot13' if shift == 13 else 'caesar'), shift
+        elif a == 25 and shift == 25:
+            name, key = 'atbash', None
+        else:
+            name, key = 'affine', (a, shift)
+        # Monoalphabetic, so the plaintext is a plain translate of the ciphertext
+        plain = (alphabets[row] + 65).astype(np.uint8).tobytes().decode('ascii')
+        table = str.maketrans(UPPERCASE + UPPERCASE.lower(), plain + plain.lower())
+        results.append(_result(name, key, source.text.translate(table), scores[row]))
+    return results
+
+
+# ==================== VIGENERE ====================
+
+def vigenere_key_lengths(letters: np.ndarray, max_length: int = 20, top: int = 6) -> list:
+    """
+    Likely key lengths by average per-column index of coincidence.
+
+    Multiples of the true length score as well as the length itself, so
+    each length is paired with its smallest divisor that scores nearly as
+    well. Column IoC is noisy on short texts, so several lengths are
+    returned and the quadgram score decides between them.
+    """
+    # Fewer than ~6 letters per column lets the hill-climb fit noise
+    max_length = min(max_length, len(letters) // 6)
+    ioc = {}
+    for length in range(1, max_length + 1):
+        ioc[length] = np.mean([index_of_coincidence(letters[i::length]) for i in range(length)])
+
+    chosen = []
+    for length in sorted(ioc, key=ioc.get, reverse=True)[:top]:
+        divisor = next(d for d in range(1, length + 1) if length % d == 0 and ioc[d] > 0.8 * ioc[length])
+        for candidate in (divisor, length):
+            if candidate not in chosen:
+                chosen.append(candidate)
+    return chosen
+
+
+def _shortest_period(key: np.ndarray) -> np.ndarray:
+    """LEMONLEMON -> LEMON: a multiple of the key length often converges to the repeated key."""
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and np.array_equal(key, np.resize(key[:period], len(key))):
+            return key[:period]
+    return key
+
+
+def _vigenere_decrypt(letters: np.ndarray, key: np.ndarray) -> np.ndarray:
+    return (letters.astype(np.int32) - np.resize(key, len(letters))) % 26
+
+
+def solve_vigenere(source: LetterText, max_length: int = 20, rounds: int = 3) -> list:
+    """
+    Crack Vigenère: key length by IoC, key letters by chi-square, then a quadgram hill-climb.
+
+    Returns:
+        List of result dicts, one per candidate key length, best first
+    """
+    letters = source.letters
+    if len(letters) < 8:
+        return []
+
+    results = []
+    for length in vigenere_key_lengths(letters, max_length):
+        if length == 1:
+            continue  # Plain Caesar, already covered by solve_affine
+        key = np.array([int(np.argmin(chi_square_shifts(letters[i::length]))) for i in range(length)])
+
+        # Hill-climb: for each key position score all 26 letters in one batch
+        plaintext = _vigenere_decrypt(letters, key)
+        best = quadgram_scores(plaintext)[0]
+        for _ in range(rounds):
+            improved = False
+            for i in range(length):
+                column = np.arange(i, len(letters), length)
+                trials = np.repeat(plaintext[None, :], 26, axis=0)
+                trials[:, column] = (letters[column].astype(np.int32)[None, :] - np.arange(26)[:, None]) % 26
+                scores = quadgram_scores(trials)
+                choice = int(np.argmax(scores))
+                if scores[choice] > best + 1e-9:
+                    key[i], plaintext, best, improved = choice, trials[choice], scores[choice], True
+            if not improved:
+                break
+
+        key = _shortest_period(key)
+        key_text = ''.join(chr(65 + k) for k in key)
+        if len(key) == 1 or any(r['key'] == key_text for r in results):
+            continue
+        results.append(_result('vigenere', key_text, source.render(_vigenere_decrypt(letters, key)), best))
+
+    return sorted(results, key=lambda r: (r['score'], -len(r['key'])), reverse=True)
+
+
+# ==================== TRANSPOSITION ====================
+
+def rail_fence_order(length: int, rails: int) -> np.ndarray:
+    """Position in the plaintext of each ciphertext character for a rail fence."""
+    cycle = 2 * (rails - 1)
+    phase = np.arange(length) % cycle
+    rail = np.where(phase < rails, phase, cycle - phase)
+    return np.argsort(rail, kind='stable')
+
+
+def solve_rail_fence(text: str, max_rails: int = 10) -> list:
+    """Decrypt with every rail count from 2 to max_rails, transposing the whole string."""
+    text = text.strip()
+    if len(text) < 4:
+        return []
+
+    results = []
+    for rails in range(2, min(max_rails, len(text) - 1) + 1):
+        order = rail_fence_order(len(text), rails)
+        chars = [''] * len(text)
+        for source_char, position in zip(text, order.tolist()):
+            chars[position] = source_char
+        plaintext = ''.join(chars)
+        letters = LetterText(plaintext).letters
+        if len(letters):
+            results.append(_result('rail_fence', rails, plaintext, quadgram_scores(letters)[0]))
+    return sorted(results, key=lambda r: r['score'], reverse=True)
+
+
+# ==================== SOLVER ====================
+
+def solve_classical(text: str, top: int = 10, max_key_length: int = 20) -> dict:
+    """
+    Try all supported classical ciphers and rank the plaintexts.
+
+    Args:
+        text: Ciphertext (case and punctuation are preserved in the output)
+        top: Number of ranked candidates to return
+        max_key_length: Longest Vigenère key to consider
+
+    Returns:
+        Dict with 'letters', 'ioc', 'candidates' (best first: flags, then
+        quadgram score) and 'flags'
+    """
+    source = LetterText(text)
+    if len(source.letters) == 0:
+        raise ValueError("Ciphertext contains no letters")
+
+    candidates = solve_affine(source)
+    candidates += solve_vigenere(source, max_key_length)
+    candidates += solve_rail_fence(text)
+    candidates.sort(key=lambda r: (bool(r['flags']), r['score']), reverse=True)
+
+    # Near-miss keys also produce flag-shaped text; keep flags from the best-scoring decryptions only
+    flagged = [c for c in candidates if c['flags']]
+    cutoff = max((c['score'] for c in flagged), default=0) - 0.1
+    flags = [flag for c in flagged if c['score'] >= cutoff for flag in c['flags']]
+    return {
+        'letters': len(source.letters),
+        'ioc': round(index_of_coincidence(source.letters), 4),
+        'candidates': candidates[:top],
+        'flags': list(dict.fromkeys(flags)),
+    }
+
+
+def build_quadgram_table(corpus_paths: list, output_path: str = QUADGRAM_FILE, limit: int = 20000):
+    """
+    Regenerate the quadgram file from plain English text files.
+
+    Word boundaries are ignored (letters are run together), matching how
+    ciphertext is scored.
+    """
+    counts = {}
+    for path in corpus_paths:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            letters = re.sub(r'[^A-Z]', '', f.read().upper())
+        for i in range(len(letters) - 3):
+            quad = letters[i:i + 4]
+            counts[quad] = counts.get(quad, 0) + 1
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='ascii') as f:
+        for quad, count in sorted(counts.items(), key=lambda item: -item[1])[:limit]:
+            f.write(f"{quad} {count}\n")
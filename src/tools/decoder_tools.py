@@ -0,0 +1,87 @@
+"""
+Decoder tools for StegoCrew agents
+"""
+
+import os
+
+from crewai_tools import tool
+
+from . import classical_ciphers, hash_cracker
+from ..utils.tool_result import ToolResult
+
+
+@tool
+def solve_classical_cipher(text: str) -> ToolResult:
+    """
+    Crack Caesar/ROT, Atbash, affine, Vigenère and rail fence ciphers and rank the plaintexts.
+
+    Args:
+        text: Ciphertext (case and punctuation are kept)
+
+    Returns:
+        Best candidate plaintexts with cipher, key and English score, flags first
+    """
+    report = ToolResult('solve_classical_cipher')
+    try:
+        with report.timed('solve'):
+            result = classical_ciphers.solve_classical(text, top=5)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    report.summary = f"{result['letters']} letters, IoC {result['ioc']}"
+    report.add_flags(result['flags'], via='classical cipher')
+
+    for rank, candidate in enumerate(result['candidates'], 1):
+        key = f" key={candidate['key']}" if candidate['key'] is not None else ""
+        detail = f"{candidate['cipher']}{key}, score {candidate['score']}"
+        if rank == 1:
+            report.notable('candidate 1', detail, value=candidate['plaintext'])
+        else:
+            report.add(f"candidate {rank}", detail, value=candidate['plaintext'])
+
+    return report
+
+
+@tool
+def crack_found_hashes(text: str, wordlist: str = "") -> ToolResult:
+    """
+    Identify MD5/SHA1/SHA2 hashes in text and crack them against wordlists (cached in a pot file).
+
+    Args:
+        text: Any tool output or string that may contain hashes
+        wordlist: Path to a wordlist (empty = rockyou and other standard lists if present)
+
+    Returns:
+        Each hash with its likely algorithm and the recovered plaintext, if any
+    """
+    if wordlist and not os.path.exists(wordlist):
+        return ToolResult.failed('crack_found_hashes', f"File not found: {wordlist}")
+
+    report = ToolResult('crack_found_hashes')
+    try:
+        with report.timed('crack'):
+            result = hash_cracker.analyze_hashes(text, [wordlist] if wordlist else None)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    if not result['hashes']:
+        report.summary = "no hash-like tokens found"
+        return report
+
+    report.summary = f"{len(result['hashes'])} hash(es), {result['words_tried']} words tried"
+    for found in result['hashes']:
+        digest = found['hash'].lower() if found['crackable'] else found['hash']
+        algorithms = "/".join(found['algorithms'])
+        cracked = result['cracked'].get(digest)
+        if cracked:
+            plaintext = cracked['plaintext'].decode('utf-8', errors='replace')
+            report.notable('cracked', f"{digest} ({cracked['algorithm']}, from {cracked['source']}) =",
+                           value=plaintext)
+        elif found['crackable']:
+            report.add('uncracked', f"{digest} ({algorithms}) not in wordlist")
+        else:
+            report.add('uncrackable', f"{digest} ({algorithms}, needs hashcat/john)")
+
+    if result['cracked']:
+        report.add('hint', "try recovered plaintexts as steghide/ZIP passwords")
+    return report
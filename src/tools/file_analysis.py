@@ -0,0 +1,218 @@
+"""
+File analysis tools for StegoCrew agents
+"""
+
+import os
+
+from crewai_tools import tool
+
+from . import jpeg_markers, metadata, pdf_streams, png_chunks
+from ..utils.helpers import check_tool_installed, find_flags
+from ..utils.run_control import run_command
+from ..utils.tool_result import ToolResult
+
+
+# Metadata fields worth a closer look even without a flag in them
+INTERESTING_FIELDS = ('comment', 'description', 'copyright', 'author', 'artist', 'title', 'subject', 'keyword')
+
+
+def _add_field(result: ToolResult, group: str, name: str, value, offset=None):
+    kind = f"{group}:{name}"
+    if any(keyword in name.lower() for keyword in INTERESTING_FIELDS):
+        result.notable(kind, offset=offset, value=value)
+    else:
+        result.add(kind, offset=offset, value=value)
+
+
+@tool
+def extract_metadata(file_path: str) -> ToolResult:
+    """
+    Read EXIF, XMP, IPTC, comments and PNG text chunks (exiftool for other formats).
+
+    Args:
+        file_path: Path to file
+
+    Returns:
+        Every metadata field with its group and file offset, flags first
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('extract_metadata', f"File not found: {file_path}")
+
+    report = ToolResult('extract_metadata')
+    result, fast_path_error = None, None
+    try:
+        with report.timed('read'):
+            result = metadata.read_metadata(file_path)
+    except Exception as e:
+        # Malformed headers: exiftool is more forgiving, so let it try
+        fast_path_error = str(e)
+
+    if result is not None:
+        report.summary = f"{result['format']}, {len(result['fields'])} fields"
+        report.add_flags(result['flags'], via='metadata')
+        for field in result['fields']:
+            _add_field(report, field['group'], field['name'], field['value'], field['offset'])
+        return report
+
+    # Formats the in-process reader does not handle
+    if not check_tool_installed('exiftool'):
+        return report.fail(f"ERROR: {fast_path_error}" if fast_path_error else "exiftool not installed")
+
+    try:
+        with report.timed('exiftool'):
+            output = run_command(['exiftool', file_path], text=True, timeout=30)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+    if output.returncode != 0:
+        return report.fail("exiftool failed")
+
+    lines = [line for line in output.stdout.splitlines() if ': ' in line]
+    report.summary = f"exiftool, {len(lines)} fields"
+    report.add_flags(find_flags(output.stdout), via='exiftool')
+    for line in lines:
+        name, _, value = line.partition(':')
+        _add_field(report, 'exiftool', name.strip(), value.strip())
+    return report
+
+
+@tool
+def analyze_jpeg_structure(file_path: str) -> ToolResult:
+    """
+    Walk JPEG markers and report comments, APP payloads and data appended after EOI.
+
+    Args:
+        file_path: Path to JPEG file
+
+    Returns:
+        Segment summary, payload findings with offsets, trailing data and flags
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_jpeg_structure', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_jpeg_structure')
+    try:
+        with report.timed('walk'):
+            result = jpeg_markers.walk_jpeg(file_path)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    dims = result['dimensions']
+    if dims:
+        report.summary = f"{dims['width']}x{dims['height']}, {dims['components']} components"
+        report.summary += ", progressive" if dims['progressive'] else ""
+    report.add('segments', f"{len(result['segments'])}: " + " ".join(
+        f"{s['marker']}({s['type']})" if 'type' in s else s['marker'] for s in result['segments']))
+    report.add_flags(result['flags'], via='JPEG segments')
+
+    for finding in result['findings']:
+        label = finding.get('marker', finding['type'])
+        report.notable(f"{label} {finding['type']}", offset=finding['offset'], value=finding.get('detail') or None)
+
+    trailing = result['trailing']
+    if trailing:
+        report.notable('trailing_data', f"{trailing['length']} bytes after EOI", trailing['offset'],
+                       trailing['signature'])
+        for embedded in trailing['embedded']:
+            report.notable('embedded', embedded['type'], embedded['offset'])
+        for member in trailing.get('archive') or []:
+            report.notable('archive_member', f"{member['name']} ({member['size']} bytes)")
+    elif result['eoi_offset'] is not None:
+        report.add('trailing_data', "none after EOI", result['eoi_offset'])
+
+    return report
+
+
+@tool
+def analyze_png_chunks(file_path: str) -> ToolResult:
+    """
+    Walk PNG chunks: CRC check, text chunks, data after IEND and tampered dimensions.
+
+    Args:
+        file_path: Path to PNG file
+
+    Returns:
+        Chunk list, decoded text chunks, anomalies, recovered width/height and flags
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_png_chunks', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_png_chunks')
+    try:
+        with report.timed('walk'):
+            result = png_chunks.analyze_png(file_path)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    header = result['header']
+    dimensions = f"{header['width']}x{header['height']}" if header else "no IHDR"
+    report.summary = f"{dimensions}, {len(result['chunks'])} chunks"
+    report.add('chunks', " ".join(c['type'] for c in result['chunks']))
+    report.add_flags(result['flags'], via='PNG chunks')
+
+    for chunk in result['text_chunks']:
+        report.notable(f"{chunk.chunk_type} {chunk.keyword}", value=chunk.text)
+
+    for anomaly in result['anomalies']:
+        details = ", ".join(f"{k}={v}" for k, v in anomaly.items() if k not in ('type', 'offset'))
+        report.warn(anomaly['type'], details, anomaly.get('offset'))
+
+    if result['recovered_dimensions']:
+        dims = ", ".join(f"{w}x{h}" for w, h in result['recovered_dimensions'])
+        report.notable('real_dimensions', f"likely {dims} (patch IHDR to reveal the cropped area)")
+
+    trailing = result['trailing']
+    if trailing:
+        report.notable('trailing_data', f"{trailing['length']} bytes after IEND", trailing['offset'],
+                       trailing['signature'])
+
+    return report
+
+
+@tool
+def analyze_pdf_streams(file_path: str) -> ToolResult:
+    """
+    Index PDF objects, decode every stream (Flate/ASCIIHex/ASCII85) and search for flags.
+
+    Args:
+        file_path: Path to PDF file
+
+    Returns:
+        Object/stream summary, JavaScript, embedded files, incremental updates and flags
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_pdf_streams', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_pdf_streams')
+    try:
+        with report.timed('decode'):
+            result = pdf_streams.analyze_pdf(file_path)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    report.summary = (
+        f"PDF {result['version']}, {result['objects']} objects, {len(result['streams'])} streams "
+        f"(index from {result['xref']})"
+    )
+    if result['incremental_updates']:
+        report.notable('incremental_updates', f"{result['incremental_updates']}: earlier revisions may hide content")
+    report.add_flags(result['flags'], via='PDF streams')
+
+    for script in result['javascript']:
+        if script['error']:
+            report.warn('javascript', f"object {script['object']}: {script['error']}")
+        else:
+            report.notable('javascript', f"object {script['object']}", value=script['code'])
+    for embedded in result['embedded_files']:
+        detail = f"object {embedded['object']}, {embedded['length']} bytes"
+        report.notable('embedded_file', detail + (f", {embedded['signature']}" if embedded['signature'] else ""))
+
+    for stream in result['streams']:
+        if stream['error']:
+            report.warn('stream_error', f"object {stream['object']}: {stream['error']}")
+
+    trailing = result['trailing']
+    if trailing:
+        report.notable('trailing_data', f"{trailing['length']} bytes after the last %%EOF", trailing['offset'],
+                       trailing['signature'])
+
+    return report
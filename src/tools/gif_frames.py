@@ -0,0 +1,418 @@
+"""
+GIF block walker, lazy frame decoder and palette analysis for StegoCrew
+
+The block structure is enumerated without decompressing anything: image
+data is recorded as a list of sub-block spans in a memory map, while
+comment and application extensions are read directly. Frames are LZW
+decoded only when their indices are requested, so palette statistics on
+long animations decode a sample of frames instead of all of them.
+"""
+
+import contextlib
+import os
+import struct
+
+import numpy as np
+
+from ..utils.file_context import borrow
+from ..utils.helpers import find_flags, match_signature
+
+
+DISPOSAL_METHODS = {0: 'unspecified', 1: 'keep', 2: 'background', 3: 'previous'}
+
+
+def lzw_decode(data: bytes, min_code_size: int, expected: int = None) -> bytes:
+    """
+    Decode GIF LZW data (variable-width codes, LSB first).
+
+    Codes are pulled from a rolling integer bit buffer and the string table
+    is a list of bytes objects, which keeps the inner loop to a handful of
+    bytecodes per code. Decoding stops at the end code or once `expected`
+    bytes have been produced.
+    """
+    clear = 1 << min_code_size
+    end = clear + 1
+    base_table = [bytes((i,)) for i in range(clear)] + [b'', b'']
+
+    table = list(base_table)
+    code_size = min_code_size + 1
+    mask = (1 << code_size) - 1
+    previous = None
+    out = bytearray()
+    buffer = 0
+    buffered = 0
+
+    for byte in data:
+        buffer |= byte << buffered
+        buffered += 8
+        while buffered >= code_size:
+            code = buffer & mask
+            buffer >>= code_size
+            buffered -= code_size
+
+            if code == clear:
+                table = list(base_table)
+                code_size = min_code_size + 1
+                mask = (1 << code_size) - 1
+                previous = None
+                continue
+            if code == end:
+                return bytes(out)
+
+            if code < len(table):
+                entry = table[code]
+                if previous is not None:
+                    table.append(previous + entry[:1])
+            elif previous is not None and code == len(table):
+                entry = previous + previous[:1]
+                table.append(entry)
+            else:
+                raise ValueError(f"Invalid LZW code {code}")
+
+            out += entry
+            previous = entry
+            if len(table) == mask + 1 and code_size < 12:
+                code_size += 1
+                mask = (1 << code_size) - 1
+            if expected is not None and len(out) >= expected:
+                return bytes(out)
+
+    return bytes(out)
+
+
+def _deinterlace(indices: np.ndarray, height: int) -> np.ndarray:
+    # Interlaced rows are stored in four passes: every 8th from 0, every 8th from 4, every 4th from 2, odd rows
+    order = np.concatenate([np.arange(0, height, 8), np.arange(4, height, 8),
+                            np.arange(2, height, 4), np.arange(1, height, 2)])
+    rows = np.empty_like(indices)
+    rows[order] = indices
+    return rows
+
+
+class GIFFrame:
+    """One image descriptor: geometry, palette, timing and lazily decoded indices."""
+
+    def __init__(self, gif, index: int, offset: int, descriptor: bytes, palette, control, spans):
+        self._gif = gif
+        self.index = index
+        self.offset = offset
+        self.left, self.top, self.width, self.height, packed = struct.unpack('<HHHHB', descriptor)
+        self.interlaced = bool(packed & 0x40)
+        self.local_palette = palette
+        self.delay = control.get('delay', 0)
+        self.transparent = control.get('transparent')
+        self.disposal = DISPOSAL_METHODS.get(control.get('disposal', 0), 'reserved')
+        self.min_code_size = spans[0]
+        self._spans = spans[1]
+        self._indices = None
+
+    @property
+    def palette(self) -> np.ndarray:
+        return self.local_palette if self.local_palette is not None else self._gif.global_palette
+
+    @property
+    def compressed_size(self) -> int:
+        return sum(end - start for start, end in self._spans)
+
+    def indices(self) -> np.ndarray:
+        """(height, width) uint8 palette indices, decoded on first access."""
+        if self._indices is None:
+            data = b''.join(self._gif.data[start:end] for start, end in self._spans)
+            pixels = self.width * self.height
+            decoded = lzw_decode(data, self.min_code_size, pixels)
+            # Truncated frames are padded with index 0, like most viewers do
+            decoded = decoded[:pixels].ljust(pixels, b'\x00')
+            indices = np.frombuffer(decoded, dtype=np.uint8).reshape(self.height, self.width)
+            self._indices = _deinterlace(indices, self.height) if self.interlaced else indices
+        return self._indices
+
+    def rgb(self) -> np.ndarray:
+        """(height, width, 3) colors of this frame alone (no compositing)."""
+        palette = self.palette if self.palette is not None else np.zeros((256, 3), dtype=np.uint8)
+        return palette[np.minimum(self.indices(), len(palette) - 1)]
+
+    def usage(self) -> np.ndarray:
+        """Pixel count per palette entry."""
+        size = len(self.palette) if self.palette is not None else 256
+        return np.bincount(self.indices().ravel(), minlength=size)[:size]
+
+
+class GIFFile:
+    """Block-level view of a GIF: frames, extensions and trailing data."""
+
+    def __init__(self, source):
+        # source is a path or a FileContext; a shared context is not closed by close()
+        self._stack = contextlib.ExitStack()
+        self.context = self._stack.enter_context(borrow(source))
+        self.file_path = self.context.path
+        self.data = self.context.data
+
+        header = self.data[:13]
+        if header[:6] not in (b'GIF87a', b'GIF89a'):
+            self.close()
+            raise ValueError("Not a GIF file")
+        if len(header) < 13:
+            self.close()
+            raise ValueError("Truncated GIF header")
+        self.version = header[3:6].decode('ascii')
+        self.width, self.height, packed, self.background, _ = struct.unpack('<HHBBB', header[6:13])
+
+        self.global_palette = None
+        position = 13
+        if packed & 0x80:
+            self.global_palette, position = self._read_palette(position, packed)
+
+        self.frames = []
+        self.comments = []       # (offset, bytes)
+        self.applications = []   # (offset, identifier, bytes)
+        self.plain_text = []     # (offset, bytes)
+        self.trailer_offset = None
+        self._walk(position)
+
+    def close(self):
+        self._stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_palette(self, position: int, packed: int):
+        entries = 2 << (packed & 0x07)
+        raw = self.data[position:position + entries * 3]
+        palette = np.frombuffer(raw.ljust(entries * 3, b'\x00'), dtype=np.uint8).reshape(entries, 3)
+        return palette, position + entries * 3
+
+    def _sub_blocks(self, position: int):
+        """Spans of a sub-block chain and the position after its terminator."""
+        spans = []
+        size = len(self.data)
+        while position < size:
+            length = self.data[position]
+            position += 1
+            if length == 0:
+                break
+            spans.append((position, min(position + length, size)))
+            position += length
+        return spans, position
+
+    def _read_sub_blocks(self, position: int):
+        spans, position = self._sub_blocks(position)
+        return b''.join(self.data[start:end] for start, end in spans), position
+
+    def _walk(self, position: int):
+        # Every return before the trailer leaves trailer_offset as None (reported as missing)
+        control = {}
+        size = len(self.data)
+        while position < size:
+            introducer = self.data[position]
+
+            if introducer == 0x3B:
+                self.trailer_offset = position
+                return
+
+            if introducer == 0x21:
+                if position + 1 >= size:
+                    return
+                label = self.data[position + 1]
+                offset = position
+                if label == 0xF9:
+                    block, position = self._read_sub_blocks(position + 2)
+                    if len(block) >= 4:
+                        packed, delay, transparent = struct.unpack('<BHB', block[:4])
+                        control = {'delay': delay, 'disposal': (packed >> 2) & 0x07,
+                                   'transparent': transparent if packed & 0x01 else None}
+                elif label == 0xFE:
+                    block, position = self._read_sub_blocks(position + 2)
+                    self.comments.append((offset, block))
+                elif label == 0xFF:
+                    block, position = self._read_sub_blocks(position + 2)
+                    self.applications.append((offset, block[:11].decode('latin-1'), block[11:]))
+                elif label == 0x01:
+                    block, position = self._read_sub_blocks(position + 2)
+                    self.plain_text.append((offset, block[12:]))  # Skip the grid header
+                else:
+                    _, position = self._sub_blocks(position + 2)
+                continue
+
+            if introducer == 0x2C:
+                offset = position
+                descriptor = self.data[position + 1:position + 10]
+                position += 10
+                if len(descriptor) < 9:
+                    return
+                palette = None
+                if descriptor[8] & 0x80:
+                    palette, position = self._read_palette(position, descriptor[8])
+                if position >= size:
+                    return  # Cut inside the local palette, before any image data
+                min_code_size = self.data[position]
+                spans, position = self._sub_blocks(position + 1)
+                self.frames.append(GIFFrame(self, len(self.frames), offset, descriptor, palette,
+                                            control, (min_code_size, spans)))
+                control = {}
+                continue
+
+            # Anything else means a damaged stream; stop and report it as trailing data
+            return
+
+    @property
+    def trailing(self):
+        end = self.trailer_offset + 1 if self.trailer_offset is not None else None
+        if end is None or end >= len(self.data):
+            return None
+        return end, self.data[end:end + (1 << 20)]
+
+
+# ==================== ANALYSIS ====================
+
+def _delay_channels(delays) -> dict:
+    """Frame delays read as text and as a two-symbol bit string."""
+    result = {'values': delays, 'as_text': None, 'as_bits': None}
+    if len(delays) < 4:
+        return result
+
+    if all(32 <= d < 127 for d in delays):
+        result['as_text'] = bytes(delays).decode('ascii')
+
+    distinct = sorted(set(delays))
+    if len(distinct) == 2 and len(delays) >= 8:
+        bits = np.array([d == distinct[1] for d in delays], dtype=np.uint8)
+        usable = len(bits) // 8 * 8
+        result['as_bits'] = np.packbits(bits[:usable]).tobytes().decode('latin-1')
+    return result
+
+
+def palette_anomalies(palette: np.ndarray, usage: np.ndarray = None) -> dict:
+    """
+    Duplicate colors, near-duplicate pairs and data in unused entries.
+
+    Palette-based stego (EzStego, gifshuffle-like tools) needs colors that
+    look identical, and CTF authors often park ASCII in entries no pixel
+    refers to.
+    """
+    colors = palette.astype(np.int32)
+    packed = (colors[:, 0] << 16) | (colors[:, 1] << 8) | colors[:, 2]
+    _, counts = np.unique(packed, return_counts=True)
+    duplicates = int((counts - 1).sum())
+
+    # Pairwise distances are at most 256x256, cheap to do at once
+    distance = np.abs(colors[:, None, :] - colors[None, :, :]).sum(axis=2)
+    near = int(((distance > 0) & (distance <= 3)).sum() // 2)
+
+    result = {'entries': len(palette), 'duplicates': duplicates, 'near_duplicates': near,
+              'unused': None, 'unused_payload': None}
+    if usage is not None:
+        unused = np.flatnonzero(usage == 0)
+        result['unused'] = len(unused)
+        if len(unused):
+            payload = palette[unused].tobytes().rstrip(b'\x00')
+            printable = sum(32 <= b < 127 for b in payload)
+            if payload and printable / len(payload) > 0.8:
+                result['unused_payload'] = payload.decode('latin-1')
+    return result
+
+
+def _sample_indexes(count: int, sample: int) -> list:
+    if count <= sample:
+        return list(range(count))
+    return sorted(set(np.linspace(0, count - 1, sample).round().astype(int).tolist()))
+
+
+def analyze_gif(source, sample_frames: int = 16) -> dict:
+    """
+    Enumerate blocks, read extensions and triage frames and palettes.
+
+    Args:
+        source: Path to GIF file or a FileContext
+        sample_frames: Frames decoded for palette-usage statistics (evenly spaced)
+
+    Returns:
+        Dict with 'header', 'frames' (summaries), 'comments', 'applications',
+        'delays', 'palette', 'odd_frames', 'trailing' and 'flags'
+    """
+    with GIFFile(source) as gif:
+        flags = []
+        result = {
+            'header': {'version': gif.version, 'width': gif.width, 'height': gif.height,
+                       'frames': len(gif.frames),
+                       'global_palette': len(gif.global_palette) if gif.global_palette is not None else 0},
+            'frames': [], 'comments': [], 'applications': [], 'delays': None,
+            'palette': None, 'odd_frames': [], 'trailing': None, 'flags': flags,
+        }
+
+        for offset, text in gif.comments + gif.plain_text:
+            result['comments'].append({'offset': offset, 'text': text[:2000].decode('latin-1')})
+            flags.extend(find_flags(text))
+        for offset, identifier, payload in gif.applications:
+            result['applications'].append({'offset': offset, 'identifier': identifier,
+                                           'length': len(payload)})
+            if identifier not in ('NETSCAPE2.0', 'ANIMEXTS1.0'):
+                flags.extend(find_flags(payload))
+
+        for frame in gif.frames:
+            result['frames'].append({
+                'index': frame.index, 'offset': frame.offset, 'delay': frame.delay,
+                'size': (frame.width, frame.height), 'position': (frame.left, frame.top),
+                'local_palette': frame.local_palette is not None, 'disposal': frame.disposal,
+                'bytes': frame.compressed_size,
+            })
+
+        delays = [frame.delay for frame in gif.frames]
+        result['delays'] = _delay_channels(delays)
+        for decoded in (result['delays']['as_text'], result['delays']['as_bits']):
+            if decoded:
+                flags.extend(find_flags(decoded))
+
+        # Frames that are on screen for (almost) no time or sit outside the canvas
+        if len(delays) > 1:
+            typical = float(np.median(delays))
+            for frame in gif.frames:
+                outside = frame.left + frame.width > gif.width or frame.top + frame.height > gif.height
+                if outside or (typical > 2 and frame.delay <= 1):
+                    result['odd_frames'].append({'index': frame.index, 'delay': frame.delay,
+                                                 'outside_canvas': outside})
+
+        # Palette usage from a sample of frames that share the global palette
+        if gif.global_palette is not None:
+            usage = np.zeros(len(gif.global_palette), dtype=np.int64)
+            decoded_frames = 0
+            shared = [frame for frame in gif.frames if frame.local_palette is None]
+            for index in _sample_indexes(len(shared), sample_frames):
+                try:
+                    usage += shared[index].usage()
+                    decoded_frames += 1
+                except ValueError:
+                    continue
+            result['palette'] = palette_anomalies(gif.global_palette, usage if decoded_frames else None)
+            result['palette']['frames_sampled'] = decoded_frames
+            if result['palette']['unused_payload']:
+                flags.extend(find_flags(result['palette']['unused_payload']))
+
+        trailing = gif.trailing
+        if trailing:
+            offset, data = trailing
+            result['trailing'] = {'offset': offset, 'length': len(gif.data) - offset,
+                                  'signature': match_signature(data), 'preview': data[:64]}
+            flags.extend(find_flags(data))
+        elif gif.trailer_offset is None:
+            result['trailing'] = {'offset': None, 'length': 0, 'signature': None,
+                                  'preview': b'', 'missing_trailer': True}
+
+    result['flags'] = list(dict.fromkeys(flags))
+    return result
+
+
+def extract_frames(file_path: str, output_dir: str, indexes=None) -> list:
+    """Write selected frames (default: all) as standalone PNGs; returns the paths."""
+    from PIL import Image
+
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    with GIFFile(file_path) as gif:
+        for index in indexes if indexes is not None else range(len(gif.frames)):
+            path = os.path.join(output_dir, f'frame_{index:04d}.png')
+            Image.fromarray(gif.frames[index].rgb()).save(path)
+            paths.append(path)
+    return paths
@@ -0,0 +1,326 @@
+"""
+Hash identification and dictionary cracking for StegoCrew
+
+Hash-like tokens are classified by length and charset, then cracked by
+streaming wordlists through a process pool: the main process reads the
+list in batches of lines, workers apply the mangling rules and hash each
+candidate with hashlib against every target at once. Only a bounded
+number of batches is in flight, so wordlists of any size use constant
+memory. Cracked hashes go to a hashcat-style pot file and are answered
+from it on the next run without touching a wordlist.
+"""
+
+import hashlib
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ..utils.run_control import current_run
+
+
+POT_FILE = os.environ.get('STEGOCREW_POT_FILE', os.path.expanduser('~/.cache/stegocrew/hashes.pot'))
+
+DEFAULT_WORDLISTS = [
+    '/usr/share/wordlists/rockyou.txt',
+    '/usr/share/wordlists/fasttrack.txt',
+    '/usr/share/john/password.lst',
+]
+
+# Tried in-process before any wordlist; common CTF and steghide passphrases
+COMMON_PASSWORDS = [
+    '', 'password', '123456', '12345678', 'qwerty', 'admin', 'letmein', 'secret', 'hidden',
+    'stego', 'steghide', 'ctf', 'flag', 'key', 'pass', 'test', 'hello', 'welcome', 'root',
+    'password123', 'iloveyou', 'dragon', 'monkey', 'abc123', 'changeme', 'stegocrew',
+]
+
+# Hex digest length -> hashlib algorithms it could be, most common first
+HASH_LENGTHS = {
+    32: ['md5'],
+    40: ['sha1'],
+    56: ['sha224', 'sha3_224'],
+    64: ['sha256', 'sha3_256', 'blake2s'],
+    96: ['sha384', 'sha3_384'],
+    128: ['sha512', 'sha3_512', 'blake2b'],
+}
+
+# Formats recognised but not crackable with hashlib
+CRYPT_FORMATS = [
+    (re.compile(r'^\$2[abxy]?\$\d{2}\$[./A-Za-z0-9]{53}$'), 'bcrypt'),
+    (re.compile(r'^\$1\$[./A-Za-z0-9]{1,8}\$[./A-Za-z0-9]{22}$'), 'md5crypt'),
+    (re.compile(r'^\$5\$(rounds=\d+\$)?[./A-Za-z0-9]{1,16}\$[./A-Za-z0-9]{43}$'), 'sha256crypt'),
+    (re.compile(r'^\$6\$(rounds=\d+\$)?[./A-Za-z0-9]{1,16}\$[./A-Za-z0-9]{86}$'), 'sha512crypt'),
+    (re.compile(r'^\$argon2(id|i|d)\$\S+$'), 'argon2'),
+]
+CRYPT_NAMES = {name for _, name in CRYPT_FORMATS}
+
+HEX_TOKEN = re.compile(r'(?<![0-9A-Za-z])[0-9A-Fa-f]{32,128}(?![0-9A-Za-z])')
+CRYPT_TOKEN = re.compile(r'\$(?:2[abxy]?|1|5|6|argon2(?:id|i|d))\$[^\s\'"]+')
+
+RULES = ('none', 'lower', 'capitalize', 'upper', 'reverse', 'digits', 'suffixes')
+DEFAULT_RULES = ('none', 'capitalize', 'suffixes')
+SUFFIXES = [b'1', b'12', b'123', b'1234', b'!', b'2023', b'2024', b'2025']
+
+
+# ==================== IDENTIFICATION ====================
+
+def identify_hash(token: str) -> list:
+    """Candidate algorithms for a hash string ([] if it does not look like one)."""
+    for pattern, name in CRYPT_FORMATS:
+        if pattern.match(token):
+            return [name]
+    if re.fullmatch(r'[0-9A-Fa-f]+', token):
+        return list(HASH_LENGTHS.get(len(token), []))
+    return []
+
+
+def find_hashes(text: str) -> list:
+    """
+    Hash-like tokens in free text (strings, metadata output, decoded payloads).
+
+    Returns:
+        List of {'hash', 'algorithms', 'crackable'} in order of appearance
+    """
+    found = {}
+    for match in HEX_TOKEN.finditer(text):
+        token = match.group(0)
+        # Skip runs like 000...0 or ffff...f, which are padding, not digests
+        if len(token) in HASH_LENGTHS and len(set(token.lower())) > 4:
+            found.setdefault(token.lower(), identify_hash(token))
+    for match in CRYPT_TOKEN.finditer(text):
+        algorithms = identify_hash(match.group(0))
+        if algorithms:
+            found.setdefault(match.group(0), algorithms)
+
+    return [{'hash': token, 'algorithms': algorithms, 'crackable': algorithms[0] not in CRYPT_NAMES}
+            for token, algorithms in found.items()]
+
+
+# ==================== POT FILE ====================
+
+def _encode_plain(plain: bytes) -> str:
+    try:
+        text = plain.decode('utf-8')
+        if text.isprintable() and not text.startswith('$HEX['):
+            return text
+    except UnicodeDecodeError:
+        pass
+    return f"$HEX[{plain.hex()}]"
+
+
+def _decode_plain(text: str) -> bytes:
+    if text.startswith('$HEX[') and text.endswith(']'):
+        return bytes.fromhex(text[5:-1])
+    return text.encode('utf-8')
+
+
+def load_pot(pot_path: str = POT_FILE) -> dict:
+    """hash (lowercase) -> (algorithm, plaintext bytes) from a pot file."""
+    pot = {}
+    if not os.path.exists(pot_path):
+        return pot
+    with open(pot_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            # hash:algorithm:plain (the plaintext may itself contain ':')
+            parts = line.split(':', 2)
+            if len(parts) == 3:
+                pot[parts[0].lower()] = (parts[1], _decode_plain(parts[2]))
+    return pot
+
+
+def _append_pot(pot_path: str, entries: dict):
+    if not entries:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(pot_path)), exist_ok=True)
+    with open(pot_path, 'a', encoding='utf-8') as f:
+        for digest, (algorithm, plain) in entries.items():
+            f.write(f"{digest}:{algorithm}:{_encode_plain(plain)}\n")
+
+
+# ==================== CANDIDATES ====================
+
+def mangle_batch(words: list, rules) -> list:
+    """
+    Expand a batch of wordlist entries into candidates, one rule at a time.
+
+    Appending rules ('digits', 'suffixes') apply to every form produced by
+    the other rules, so 'capitalize' + 'suffixes' yields Sunshine123.
+    """
+    forms, appended = [], []
+    for rule in rules:
+        if rule == 'none':
+            forms.append(words)
+        elif rule == 'lower':
+            forms.append([w.lower() for w in words])
+        elif rule == 'capitalize':
+            forms.append([w.capitalize() for w in words])
+        elif rule == 'upper':
+            forms.append([w.upper() for w in words])
+        elif rule == 'reverse':
+            forms.append([w[::-1] for w in words])
+        elif rule == 'digits':
+            appended.extend(bytes([48 + d]) for d in range(10))
+        elif rule == 'suffixes':
+            appended.extend(SUFFIXES)
+        else:
+            raise ValueError(f"Unknown rule: {rule} (choose from {', '.join(RULES)})")
+
+    base = [form for variant in (forms or [words]) for form in variant]
+    candidates = list(base)
+    for suffix in dict.fromkeys(appended):
+        candidates.extend([form + suffix for form in base])
+    return candidates
+
+
+def mangle(word: bytes, rules) -> list:
+    """Candidates for a single word, duplicates removed."""
+    return list(dict.fromkeys(mangle_batch([word], rules)))
+
+
+def _crack_batch(words: list, targets: dict, rules) -> dict:
+    """
+    Worker: hash every mangled candidate of a batch with each needed algorithm.
+
+    Args:
+        words: Wordlist entries (bytes, no newline)
+        targets: algorithm -> set of raw digests still wanted
+
+    Returns:
+        hex digest -> (algorithm, plaintext)
+    """
+    found = {}
+    candidates = mangle_batch(words, rules)
+    for algorithm, digests in targets.items():
+        if not digests:
+            continue
+        constructor = getattr(hashlib, algorithm)
+        hashed = [constructor(candidate).digest() for candidate in candidates]
+        # One set test per batch; the rare hit is located afterwards
+        if digests.isdisjoint(hashed):
+            continue
+        for candidate, digest in zip(candidates, hashed):
+            if digest in digests:
+                found[digest.hex()] = (algorithm, candidate)
+    return found
+
+
+def iter_wordlist(path: str, batch_size: int):
+    """Stream a wordlist as batches of byte strings; line endings stripped, no decoding."""
+    with open(path, 'rb') as f:
+        batch = []
+        for line in f:
+            batch.append(line.rstrip(b'\r\n'))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+# ==================== CRACKING ====================
+
+def crack_hashes(hashes, wordlists=None, rules=DEFAULT_RULES, max_workers: int = None,
+                 batch_size: int = 20000, pot_path: str = POT_FILE, exhaustive: bool = False) -> dict:
+    """
+    Crack hex digests against the built-in list, then streamed wordlists.
+
+    Args:
+        hashes: Hex digests (crypt-style hashes are reported, not cracked)
+        wordlists: Wordlist paths (None = DEFAULT_WORDLISTS that exist)
+        rules: Mangling rules applied to every word (see RULES)
+        max_workers: Process pool size (None = CPU count)
+        batch_size: Words per task sent to a worker
+        pot_path: Pot file for cached results ('' disables it)
+        exhaustive: Try every algorithm with a matching digest length (e.g.
+            SHA3-256 and BLAKE2s for 64 hex chars), not just the usual one
+
+    Returns:
+        Dict with 'cracked' {hash: {'algorithm', 'plaintext', 'source'}},
+        'uncracked', 'skipped' (not crackable here) and 'words_tried'
+    """
+    pot = load_pot(pot_path) if pot_path else {}
+    cracked, targets, skipped = {}, {}, []
+
+    for token in dict.fromkeys(h.strip() for h in hashes):
+        algorithms = identify_hash(token)
+        if not algorithms or algorithms[0] in CRYPT_NAMES:
+            skipped.append(token)
+            continue
+        digest = token.lower()
+        if digest in pot:
+            algorithm, plain = pot[digest]
+            cracked[digest] = {'algorithm': algorithm, 'plaintext': plain, 'source': 'pot'}
+            continue
+        for algorithm in (algorithms if exhaustive else algorithms[:1]):
+            targets.setdefault(algorithm, set()).add(bytes.fromhex(digest))
+
+    def remaining():
+        return {algorithm: {d for d in digests if d.hex() not in cracked}
+                for algorithm, digests in targets.items()}
+
+    def record(found: dict, source: str):
+        new = {}
+        for digest, (algorithm, plain) in found.items():
+            if digest not in cracked:
+                cracked[digest] = {'algorithm': algorithm, 'plaintext': plain, 'source': source}
+                new[digest] = (algorithm, plain)
+        if pot_path:
+            _append_pot(pot_path, new)
+
+    words_tried = 0
+    if targets:
+        common = [word.encode() for word in COMMON_PASSWORDS]
+        record(_crack_batch(common, targets, rules), 'builtin')
+        words_tried += len(common)
+
+    if wordlists is None:
+        wordlists = [path for path in DEFAULT_WORDLISTS if os.path.exists(path)]
+
+    for path in wordlists:
+        if not any(remaining().values()) or current_run().cancelled:
+            break
+        words_tried += _crack_wordlist(path, remaining, record, rules, max_workers, batch_size)
+
+    uncracked = [d.hex() for digests in remaining().values() for d in digests]
+    return {
+        'cracked': cracked,
+        'uncracked': list(dict.fromkeys(uncracked)),
+        'skipped': skipped,
+        'words_tried': words_tried,
+    }
+
+
+def _crack_wordlist(path, remaining, record, rules, max_workers, batch_size) -> int:
+    """Fan one wordlist out over a process pool; stops once every target is cracked or the run is cancelled."""
+    words = 0
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        wanted = remaining()
+        for batch in iter_wordlist(path, batch_size):
+            words += len(batch)
+            pending.add(pool.submit(_crack_batch, batch, wanted, rules))
+            # Bounded queue: never more than two batches per worker in memory
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(future.result(), path)
+                wanted = remaining()
+                if not any(wanted.values()) or current_run().cancelled:
+                    for future in pending:
+                        future.cancel()
+                    return words
+        for future in pending:
+            record(future.result(), path)
+    return words
+
+
+def analyze_hashes(text: str, wordlists=None, **kwargs) -> dict:
+    """Find hash-like tokens in text and try to crack the crackable ones."""
+    found = find_hashes(text)
+    crackable = [h['hash'] for h in found if h['crackable']]
+    result = {'hashes': found, 'cracked': {}, 'uncracked': [], 'words_tried': 0}
+    if crackable:
+        result.update(crack_hashes(crackable, wordlists, **kwargs))
+    result['skipped'] = [h['hash'] for h in found if not h['crackable']]
+    return result
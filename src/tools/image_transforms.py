@@ -0,0 +1,309 @@
+"""
+Stegsolve-style image transforms for StegoCrew
+
+Decodes an image once (through the shared pixel cache) into an RGBA array,
+computes bit planes, channel XOR/AND views, inversion and random palettes as
+vectorized operations, and renders them as individual PNGs or a single
+contact sheet.
+Every transform also gets cheap statistics so the crew can pick the
+interesting views without opening every image. Large images are ranked by
+worker processes that attach to the cached pixels instead of copying them.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from ..utils.pixel_cache import attach, get_pixel_cache
+
+
+CHANNELS = {'red': 0, 'green': 1, 'blue': 2, 'alpha': 3}
+
+# Below this many pixels, starting worker processes costs more than ranking in-process
+PARALLEL_MIN_PIXELS = 4_000_000
+MAX_WORKERS = 4
+
+
+def load_pixels(file_path: str) -> np.ndarray:
+    """Read-only (height, width, 4) uint8 RGBA array from the shared pixel cache."""
+    return get_pixel_cache().get(file_path)
+
+
+# ==================== TRANSFORMS ====================
+
+def _bit_plane(channel: int, bit: int):
+    def transform(pixels):
+        return ((pixels[..., channel] >> bit) & 1) * np.uint8(255)
+    return transform
+
+
+def _channel(channel: int):
+    def transform(pixels):
+        return pixels[..., channel]
+    return transform
+
+
+def _channel_op(op, first: int, second: int):
+    def transform(pixels):
+        return op(pixels[..., first], pixels[..., second])
+    return transform
+
+
+def _lsb_xor(pixels):
+    lsb = pixels[..., 0] ^ pixels[..., 1] ^ pixels[..., 2]
+    return (lsb & 1) * np.uint8(255)
+
+
+def _invert(pixels):
+    return 255 - pixels[..., :3]
+
+
+def _gray_bits(pixels):
+    rgb = pixels[..., :3]
+    gray = (rgb[..., 0] == rgb[..., 1]) & (rgb[..., 1] == rgb[..., 2])
+    return gray.astype(np.uint8) * np.uint8(255)
+
+
+def _random_palette(seed: int):
+    def transform(pixels):
+        palette = np.random.default_rng(seed).integers(0, 256, size=(256, 3), dtype=np.uint8)
+        # Map each channel through its own lookup table in one gather per channel
+        return np.stack([palette[pixels[..., c], c] for c in range(3)], axis=-1)
+    return transform
+
+
+def _build_registry() -> dict:
+    registry = {}
+
+    for name, channel in CHANNELS.items():
+        registry[f'{name}'] = _channel(channel)
+        for bit in range(8):
+            registry[f'{name}_bit{bit}'] = _bit_plane(channel, bit)
+
+    for op_name, op in (('xor', np.bitwise_xor), ('and', np.bitwise_and)):
+        for first, second in (('red', 'green'), ('red', 'blue'), ('green', 'blue')):
+            registry[f'{first}_{op_name}_{second}'] = _channel_op(op, CHANNELS[first], CHANNELS[second])
+
+    registry['lsb_xor'] = _lsb_xor
+    registry['invert'] = _invert
+    registry['gray_bits'] = _gray_bits
+    for seed in range(3):
+        registry[f'random_palette{seed}'] = _random_palette(seed)
+
+    return registry
+
+
+TRANSFORMS = _build_registry()
+
+
+def compute_transforms(pixels: np.ndarray, names=None) -> dict:
+    """
+    Apply transforms to a decoded RGBA array.
+
+    Args:
+        pixels: Array returned by load_pixels()
+        names: Transform names to compute (default: all of TRANSFORMS)
+
+    Returns:
+        Dict mapping transform name to a uint8 image array
+    """
+    names = list(TRANSFORMS) if names is None else names
+
+    unknown = [name for name in names if name not in TRANSFORMS]
+    if unknown:
+        raise ValueError(f"Unknown transforms: {', '.join(unknown)}")
+
+    return {name: TRANSFORMS[name](pixels) for name in names}
+
+
+# ==================== STATISTICS ====================
+
+def plane_entropy(view: np.ndarray) -> float:
+    """Shannon entropy (bits per value) of a transformed view."""
+    counts = np.bincount(view.ravel(), minlength=256)
+    probs = counts[counts > 0] / view.size
+    return float(-(probs * np.log2(probs)).sum()) + 0.0
+
+
+def _density_score(ink: float) -> float:
+    """1.0 for ink coverage typical of text (5-35%), falling off either side."""
+    if ink < 0.05:
+        return ink / 0.05
+    if ink > 0.35:
+        return max(0.0, 1.0 - (ink - 0.35) / 0.15)
+    return 1.0
+
+
+def _structure(binary: np.ndarray) -> float:
+    """How far neighbouring pixels agree beyond chance (0 = noise, 1 = flat)."""
+    if binary.shape[0] < 2 or binary.shape[1] < 2:
+        return 0.0
+    horizontal = np.count_nonzero(binary[:, 1:] != binary[:, :-1]) / binary[:, 1:].size
+    vertical = np.count_nonzero(binary[1:, :] != binary[:-1, :]) / binary[1:, :].size
+    return float(max(0.0, 1.0 - (horizontal + vertical)))
+
+
+def text_likelihood(view: np.ndarray) -> float:
+    """
+    Heuristic score (0-1) that a view contains visible text or shapes.
+
+    Text shows up as sparse ink that is spatially coherent and clustered into
+    rows, so the score combines ink density, neighbour agreement and the
+    variation between row profiles. Pure LSB noise scores close to zero.
+    """
+    gray = view.mean(axis=-1) if view.ndim == 3 else view
+    binary = gray > gray.mean()
+
+    ink = float(binary.mean())
+    ink = min(ink, 1.0 - ink)  # Text may be light-on-dark or dark-on-light
+    if ink < 0.005:
+        return 0.0
+
+    rows = binary.mean(axis=1)
+    row_score = min(1.0, float(rows.std()) / 0.15)
+
+    return round(_density_score(ink) * _structure(binary) * (0.5 + 0.5 * row_score), 4)
+
+
+def transform_stats(name: str, view: np.ndarray) -> dict:
+    """Summarise a transformed view for ranking."""
+    entropy = plane_entropy(view)
+    # Bit planes carry at most 1 bit per pixel, everything else up to 8
+    max_entropy = 1.0 if '_bit' in name or name in ('lsb_xor', 'gray_bits') else 8.0
+    return {
+        'name': name,
+        'entropy': round(entropy, 4),
+        'normalized_entropy': round(entropy / max_entropy, 4),
+        'text_likelihood': text_likelihood(view),
+    }
+
+
+def _ranked(stats: list) -> list:
+    return sorted(stats, key=lambda s: (s['text_likelihood'], -s['normalized_entropy']), reverse=True)
+
+
+def rank_transforms(views: dict) -> list:
+    """Return stats for every view, most promising first."""
+    return _ranked([transform_stats(name, view) for name, view in views.items()])
+
+
+def _shared_stats(handle, names: list) -> list:
+    """Worker: stats for some transforms of the cached image behind handle."""
+    pixels = attach(handle)
+    return [transform_stats(name, TRANSFORMS[name](pixels)) for name in names]
+
+
+def rank_file_transforms(file_path: str, names=None, workers: int = MAX_WORKERS) -> list:
+    """
+    rank_transforms() for a cached image, split across worker processes.
+
+    Each worker attaches to the shared-memory pixels and computes its share
+    of the views itself, so neither the pixels nor the views are copied
+    between processes; only the stats come back.
+    """
+    names = list(TRANSFORMS) if names is None else names
+    unknown = [name for name in names if name not in TRANSFORMS]
+    if unknown:
+        raise ValueError(f"Unknown transforms: {', '.join(unknown)}")
+
+    handle = get_pixel_cache().share(file_path)
+    workers = max(1, min(workers, len(names)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_shared_stats, [handle] * workers, [names[i::workers] for i in range(workers)])
+        stats = {s['name']: s for part in parts for s in part}
+    return _ranked([stats[name] for name in names])  # Same tie order as rank_transforms()
+
+
+# ==================== RENDERING ====================
+
+def _save_png(view: np.ndarray, path: str) -> str:
+    from PIL import Image
+    Image.fromarray(np.ascontiguousarray(view)).save(path, compress_level=1)
+    return path
+
+
+def write_transforms(views: dict, output_dir: str, max_workers: int = 4) -> list:
+    """Write each view as <output_dir>/<name>.png using a thread pool."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_save_png, view, os.path.join(output_dir, f'{name}.png'))
+            for name, view in views.items()
+        ]
+        return [future.result() for future in futures]
+
+
+def _to_rgb(view: np.ndarray) -> np.ndarray:
+    if view.ndim == 2:
+        return np.repeat(view[..., None], 3, axis=-1)
+    return view[..., :3]
+
+
+def build_contact_sheet(views: dict, thumb_size: int = 256, columns: int = 6) -> np.ndarray:
+    """Tile downscaled views into one RGB array (labels are left to the caller)."""
+    if not views:
+        raise ValueError("No views to render")
+
+    first = next(iter(views.values()))
+    step = max(1, math.ceil(max(first.shape[:2]) / thumb_size))
+    thumbs = [_to_rgb(view[::step, ::step]) for view in views.values()]
+
+    tile_h = max(t.shape[0] for t in thumbs)
+    tile_w = max(t.shape[1] for t in thumbs)
+    rows = math.ceil(len(thumbs) / columns)
+
+    sheet = np.zeros((rows * (tile_h + 2), columns * (tile_w + 2), 3), dtype=np.uint8)
+    for index, thumb in enumerate(thumbs):
+        top = (index // columns) * (tile_h + 2)
+        left = (index % columns) * (tile_w + 2)
+        sheet[top:top + thumb.shape[0], left:left + thumb.shape[1]] = thumb
+
+    return sheet
+
+
+def write_contact_sheet(views: dict, path: str, thumb_size: int = 256, columns: int = 6) -> str:
+    """Render views into a single PNG contact sheet, in row-major order."""
+    return _save_png(build_contact_sheet(views, thumb_size, columns), path)
+
+
+def analyze_transforms(file_path: str, output_dir: str = None, names=None,
+                       contact_sheet: bool = True, top: int = 10, workers: int = None) -> dict:
+    """
+    Decode once, compute transforms, rank them and optionally write images.
+
+    Args:
+        file_path: Image to analyze
+        output_dir: Where to write PNGs (None = statistics only)
+        names: Subset of TRANSFORMS to compute
+        contact_sheet: Write one sheet instead of one PNG per transform
+        top: Number of ranked transforms to render
+        workers: Ranking processes (None = up to MAX_WORKERS for images of
+            PARALLEL_MIN_PIXELS or more, else 1)
+
+    Returns:
+        Dict with 'ranking' (list of stats) and 'written' (paths)
+    """
+    pixels = load_pixels(file_path)
+    if workers is None:
+        large = pixels.shape[0] * pixels.shape[1] >= PARALLEL_MIN_PIXELS
+        workers = min(MAX_WORKERS, os.cpu_count() or 1) if large else 1
+
+    if workers > 1 and pixels.nbytes <= get_pixel_cache().max_bytes:
+        ranking = rank_file_transforms(file_path, names, workers)
+    else:
+        ranking = rank_transforms(compute_transforms(pixels, names))
+
+    written = []
+    if output_dir:
+        selected = compute_transforms(pixels, [s['name'] for s in ranking[:top]])
+        if contact_sheet:
+            os.makedirs(output_dir, exist_ok=True)
+            sheet_path = os.path.join(output_dir, 'contact_sheet.png')
+            written.append(write_contact_sheet(selected, sheet_path))
+        else:
+            written.extend(write_transforms(selected, output_dir))
+
+    return {'ranking': ranking, 'written': written}
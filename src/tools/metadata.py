@@ -0,0 +1,317 @@
+"""
+In-process metadata reader for StegoCrew
+
+Reads EXIF (TIFF IFDs), XMP packets, IPTC records and comments from JPEG
+header segments, and text/eXIf chunks from PNG, without running exiftool.
+Only the metadata segments are read: JPEG parsing stops at the first scan
+and PNG image data is skipped with seek, so the cost does not grow with the
+size of the image. Every field carries the file offset of its value.
+"""
+
+import re
+import struct
+
+from .png_chunks import PNG_SIGNATURE, TEXT_CHUNKS, TextChunk
+from ..utils.file_context import borrow
+from ..utils.helpers import find_flags
+
+
+# Bytes per component for each TIFF field type
+TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 13: 4}
+TIFF_TYPE_FORMATS = {3: 'H', 4: 'I', 6: 'b', 8: 'h', 9: 'i', 11: 'f', 12: 'd', 13: 'I'}
+
+EXIF_TAGS = {
+    0x010E: 'ImageDescription', 0x010F: 'Make', 0x0110: 'Model', 0x0112: 'Orientation',
+    0x011A: 'XResolution', 0x011B: 'YResolution', 0x0128: 'ResolutionUnit',
+    0x0131: 'Software', 0x0132: 'DateTime', 0x013B: 'Artist', 0x013C: 'HostComputer',
+    0x0201: 'ThumbnailOffset', 0x0202: 'ThumbnailLength', 0x0213: 'YCbCrPositioning',
+    0x8298: 'Copyright', 0x8769: 'ExifIFD', 0x8825: 'GPSIFD',
+    0x829A: 'ExposureTime', 0x829D: 'FNumber', 0x8827: 'ISO', 0x9000: 'ExifVersion',
+    0x9003: 'DateTimeOriginal', 0x9004: 'CreateDate', 0x920A: 'FocalLength',
+    0x927C: 'MakerNote', 0x9286: 'UserComment', 0xA002: 'ExifImageWidth',
+    0xA003: 'ExifImageHeight', 0xA005: 'InteropIFD', 0xA420: 'ImageUniqueID',
+    0xA430: 'OwnerName', 0xA431: 'SerialNumber', 0xA434: 'LensModel',
+    0x9C9B: 'XPTitle', 0x9C9C: 'XPComment', 0x9C9D: 'XPAuthor',
+    0x9C9E: 'XPKeywords', 0x9C9F: 'XPSubject',
+}
+GPS_TAGS = {
+    0x0000: 'GPSVersionID', 0x0001: 'GPSLatitudeRef', 0x0002: 'GPSLatitude',
+    0x0003: 'GPSLongitudeRef', 0x0004: 'GPSLongitude', 0x0005: 'GPSAltitudeRef',
+    0x0006: 'GPSAltitude', 0x0007: 'GPSTimeStamp', 0x001D: 'GPSDateStamp',
+}
+SUB_IFDS = {0x8769: 'ExifIFD', 0x8825: 'GPS', 0xA005: 'InteropIFD'}
+XP_TAGS = {0x9C9B, 0x9C9C, 0x9C9D, 0x9C9E, 0x9C9F}
+
+IPTC_TAGS = {
+    5: 'ObjectName', 15: 'Category', 25: 'Keywords', 40: 'SpecialInstructions',
+    55: 'DateCreated', 80: 'By-line', 85: 'By-lineTitle', 90: 'City',
+    95: 'Province-State', 101: 'Country', 105: 'Headline', 110: 'Credit',
+    115: 'Source', 116: 'CopyrightNotice', 118: 'Contact', 120: 'Caption-Abstract',
+    122: 'Writer-Editor',
+}
+
+XMP_TOKEN = re.compile(rb'<(/?)([\w.-]+):([\w.-]+)((?:[^>"]|"[^"]*")*?)(/?)>|([^<]+)')
+XMP_ATTRIBUTE = re.compile(rb'([\w.-]+):([\w.-]+)\s*=\s*"([^"]*)"')
+XMP_CONTAINERS = {b'RDF', b'Description', b'Alt', b'Seq', b'Bag', b'li', b'xmpmeta'}
+
+MAX_IFD_ENTRIES = 1000
+MAX_VALUE_BYTES = 1 << 16
+
+
+def _field(group: str, name: str, value, offset: int) -> dict:
+    return {'group': group, 'name': name, 'value': value, 'offset': offset}
+
+
+# ==================== EXIF / TIFF ====================
+
+def _decode_tiff_value(tag: int, field_type: int, count: int, raw: bytes, order: str):
+    if field_type == 2:
+        return raw.split(b'\x00', 1)[0].decode('latin-1')
+    if tag == 0x9286 and len(raw) >= 8:
+        # UserComment: 8-byte character code, then the text
+        encoding = 'utf-16' if raw[:8].startswith(b'UNICODE') else 'latin-1'
+        return raw[8:].decode(encoding, errors='replace').rstrip('\x00 ')
+    if tag in XP_TAGS:
+        return raw.decode('utf-16-le', errors='replace').rstrip('\x00')
+    if field_type in (1, 7):
+        if field_type == 7 and raw.rstrip(b'\x00').isascii() and raw.rstrip(b'\x00'):
+            return raw.rstrip(b'\x00').decode('ascii')
+        return raw if count > 4 else list(raw)
+    if field_type in (5, 10):
+        fmt = 'I' if field_type == 5 else 'i'
+        numbers = struct.unpack(f'{order}{2 * count}{fmt}', raw)
+        values = [(n, d) for n, d in zip(numbers[::2], numbers[1::2])]
+        return values[0] if count == 1 else values
+    values = struct.unpack(f'{order}{count}{TIFF_TYPE_FORMATS[field_type]}', raw)
+    return values[0] if count == 1 else list(values)
+
+
+def parse_tiff(data: bytes, base_offset: int = 0, group: str = 'EXIF') -> list:
+    """
+    Walk every IFD of a TIFF structure (EXIF payload) and decode its tags.
+
+    Args:
+        data: TIFF bytes, starting with the II/MM byte-order mark
+        base_offset: File offset of data[0], used for field offsets
+        group: Group name for IFD0 fields
+
+    Returns:
+        List of field dicts ('group', 'name', 'value', 'offset')
+    """
+    if data[:2] == b'II':
+        order = '<'
+    elif data[:2] == b'MM':
+        order = '>'
+    else:
+        raise ValueError("Invalid TIFF byte order")
+
+    fields = []
+    first_ifd = struct.unpack(f'{order}I', data[4:8])[0]
+    pending = [(first_ifd, group)]
+    visited = set()
+
+    while pending:
+        ifd_offset, ifd_group = pending.pop(0)
+        # Loops between IFDs are a classic malformed-EXIF trick
+        if ifd_offset in visited or ifd_offset + 2 > len(data):
+            continue
+        visited.add(ifd_offset)
+
+        entries = struct.unpack(f'{order}H', data[ifd_offset:ifd_offset + 2])[0]
+        names = GPS_TAGS if ifd_group == 'GPS' else EXIF_TAGS
+        for index in range(min(entries, MAX_IFD_ENTRIES)):
+            entry = ifd_offset + 2 + index * 12
+            if entry + 12 > len(data):
+                break
+            tag, field_type, count = struct.unpack(f'{order}HHI', data[entry:entry + 8])
+            if field_type not in TIFF_TYPE_SIZES:
+                continue
+
+            size = TIFF_TYPE_SIZES[field_type] * count
+            if size <= 4:
+                value_offset = entry + 8
+            else:
+                value_offset = struct.unpack(f'{order}I', data[entry + 8:entry + 12])[0]
+            if size > MAX_VALUE_BYTES or value_offset + size > len(data):
+                continue
+
+            raw = data[value_offset:value_offset + size]
+            if tag in SUB_IFDS and field_type in (4, 13):
+                pending.append((struct.unpack(f'{order}I', raw[:4])[0], SUB_IFDS[tag]))
+                continue
+
+            name = names.get(tag, f'Tag0x{tag:04X}')
+            value = _decode_tiff_value(tag, field_type, count, raw, order)
+            fields.append(_field(ifd_group, name, value, base_offset + value_offset))
+
+        next_at = ifd_offset + 2 + entries * 12
+        if ifd_group in ('EXIF', 'IFD1') and next_at + 4 <= len(data):
+            next_ifd = struct.unpack(f'{order}I', data[next_at:next_at + 4])[0]
+            if next_ifd:
+                pending.append((next_ifd, 'IFD1'))
+
+    return fields
+
+
+# ==================== XMP ====================
+
+def parse_xmp(packet: bytes, base_offset: int = 0) -> list:
+    """
+    Properties of an XMP packet, from both attribute and element forms.
+
+    A tolerant tokenizer is used instead of an XML parser because CTF files
+    often carry deliberately broken packets.
+    """
+    fields = []
+    properties = []  # Stack of open non-container property names
+
+    for match in XMP_TOKEN.finditer(packet):
+        closing, prefix, local, attributes, self_closing, text = match.groups()
+        if text is not None:
+            text = text.strip()
+            if text and properties:
+                fields.append(_field('XMP', properties[-1], text.decode('utf-8', errors='replace'),
+                                     base_offset + match.start(6)))
+            continue
+
+        if not closing:
+            for attr in XMP_ATTRIBUTE.finditer(attributes):
+                if attr.group(1) not in (b'xmlns', b'rdf', b'x', b'xml'):
+                    name = f"{attr.group(1).decode()}:{attr.group(2).decode()}"
+                    fields.append(_field('XMP', name, attr.group(3).decode('utf-8', errors='replace'),
+                                         base_offset + match.start(4) + attr.start(3)))
+
+        if local in XMP_CONTAINERS or self_closing:
+            continue
+        name = f"{prefix.decode()}:{local.decode()}"
+        if closing:
+            if properties and properties[-1] == name:
+                properties.pop()
+        else:
+            properties.append(name)
+
+    return fields
+
+
+# ==================== IPTC ====================
+
+def parse_iptc(data: bytes, base_offset: int = 0) -> list:
+    """Records of an IPTC-IIM block (dataset markers 0x1C)."""
+    fields = []
+    position = 0
+    while position + 5 <= len(data) and data[position] == 0x1C:
+        record, dataset, size = struct.unpack('>BBH', data[position + 1:position + 5])
+        position += 5
+        if size & 0x8000:  # Extended dataset: size field holds the length of the length
+            length_bytes = size & 0x7FFF
+            size = int.from_bytes(data[position:position + length_bytes], 'big')
+            position += length_bytes
+
+        value = data[position:position + size]
+        if record == 2 and dataset != 0:  # 2:00 is the record version
+            name = IPTC_TAGS.get(dataset, f'2:{dataset}')
+            fields.append(_field('IPTC', name, value.decode('utf-8', errors='replace'),
+                                 base_offset + position))
+        position += size
+    return fields
+
+
+def parse_photoshop(data: bytes, base_offset: int = 0) -> list:
+    """IPTC fields from the 8BIM resource blocks of a Photoshop APP13 segment."""
+    fields = []
+    position = 0
+    while position + 12 <= len(data) and data[position:position + 4] == b'8BIM':
+        resource_id = struct.unpack('>H', data[position + 4:position + 6])[0]
+        name_length = data[position + 6]
+        position += 7 + name_length + ((name_length + 1) & 1)  # Pascal string padded to even
+        size = struct.unpack('>I', data[position:position + 4])[0]
+        position += 4
+        if resource_id == 0x0404:
+            fields.extend(parse_iptc(data[position:position + size], base_offset + position))
+        position += size + (size & 1)
+    return fields
+
+
+# ==================== CONTAINERS ====================
+
+def _read_jpeg(f) -> list:
+    fields = []
+    position = 2
+    while True:
+        f.seek(position)
+        header = f.read(4)
+        if len(header) < 4 or header[0] != 0xFF:
+            break
+        marker = header[1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        if marker in (0xDA, 0xD9):  # Metadata is over once the image data starts
+            break
+
+        length = struct.unpack('>H', header[2:4])[0]
+        payload_offset = position + 4
+        if marker == 0xFE or marker in (0xE1, 0xED):
+            payload = f.read(length - 2)
+            if marker == 0xFE:
+                fields.append(_field('Comment', 'Comment', payload.decode('latin-1'), payload_offset))
+            elif payload.startswith(b'Exif\x00\x00'):
+                fields.extend(parse_tiff(payload[6:], payload_offset + 6))
+            elif payload.startswith(b'http://ns.adobe.com/xap/1.0/\x00'):
+                start = payload.index(b'\x00') + 1
+                fields.extend(parse_xmp(payload[start:], payload_offset + start))
+            elif payload.startswith(b'Photoshop 3.0\x00'):
+                fields.extend(parse_photoshop(payload[14:], payload_offset + 14))
+        position += 2 + length
+    return fields
+
+
+def _read_png(f) -> list:
+    fields = []
+    position = 8
+    while True:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type == b'IEND':
+            break
+
+        if chunk_type in TEXT_CHUNKS:
+            chunk = TextChunk(chunk_type, position, f.read(length))
+            offset = position + 8 + len(chunk.keyword) + 1
+            fields.append(_field(chunk.chunk_type, chunk.keyword, chunk.text, offset))
+        elif chunk_type == b'eXIf':
+            fields.extend(parse_tiff(f.read(length), position + 8))
+        position += 12 + length  # IDAT and other chunks are skipped without reading
+    return fields
+
+
+def read_metadata(source) -> dict:
+    """
+    Read metadata fields from a JPEG or PNG file without exiftool.
+
+    Args:
+        source: Path to the file or a FileContext
+
+    Returns:
+        Dict with 'format', 'fields' (group, name, value, offset) and
+        'flags', or None when the format is not handled here
+    """
+    with borrow(source) as context, context.open() as f:
+        magic = f.read(8)
+        if magic.startswith(b'\xff\xd8'):
+            file_format, fields = 'JPEG', _read_jpeg(f)
+        elif magic == PNG_SIGNATURE:
+            file_format, fields = 'PNG', _read_png(f)
+        else:
+            return None
+
+    flags = []
+    for field in fields:
+        value = field['value']
+        if isinstance(value, (str, bytes)):
+            flags.extend(find_flags(value))
+
+    return {'format': file_format, 'fields': fields, 'flags': list(dict.fromkeys(flags))}
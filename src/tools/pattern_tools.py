@@ -0,0 +1,61 @@
+"""
+Pattern detection tools for StegoCrew agents
+"""
+
+import os
+
+from crewai_tools import tool
+
+from . import text_stego
+from ..utils.tool_result import ToolResult
+
+
+@tool
+def detect_text_stego(file_path: str) -> ToolResult:
+    """
+    Decode trailing whitespace (SNOW, space/tab bits), zero-width characters and homoglyphs in a text file.
+
+    Args:
+        file_path: Path to text file
+
+    Returns:
+        Decoded payload of each technique found, with the scheme used and flags
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('detect_text_stego', f"File not found: {file_path}")
+
+    report = ToolResult('detect_text_stego')
+    try:
+        with report.timed('decode'):
+            result = text_stego.analyze_text_stego(file_path)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    report.summary = f"{result['lines']} lines"
+    report.add_flags(result['flags'], via='text stego')
+
+    whitespace = result['whitespace']
+    if whitespace['best']:
+        best = whitespace['best']
+        report.notable('trailing_whitespace', f"{whitespace['lines']} line(s), decoded as {best['scheme']}",
+                       value=best['text'])
+
+    zero_width = result['zero_width']
+    if zero_width['count']:
+        alphabet = ", ".join(f"{name}x{count}" for name, count in zero_width['alphabet'].items())
+        report.notable('zero_width', f"{zero_width['count']} character(s): {alphabet}")
+        if zero_width['best']:
+            best = zero_width['best']
+            report.notable('zero_width_payload', f"decoded as {best['scheme']}", value=best['text'])
+
+    homoglyphs = result['homoglyphs']
+    if homoglyphs['substitutions']:
+        report.notable('homoglyphs', f"{homoglyphs['substitutions']} Cyrillic/Greek lookalike substitution(s)")
+        best = homoglyphs['best']
+        if best and best['text']:
+            report.notable('homoglyph_payload', f"decoded as {best['scheme']}", value=best['text'])
+
+    if not (whitespace['best'] or zero_width['count'] or homoglyphs['substitutions']):
+        report.add('text_stego', "no trailing whitespace, zero-width or homoglyph encoding found")
+
+    return report
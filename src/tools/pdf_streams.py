@@ -0,0 +1,441 @@
+"""
+PDF object indexer and stream scanner for StegoCrew
+
+Builds an object-number -> offset index from the xref tables or xref
+streams (following /Prev through incremental updates), or by a linear
+regex scan over a memory map when the xref is missing or broken. Streams
+are decoded only when asked for, FlateDecode output is produced in
+bounded pieces, and every decoded stream is searched for flags without
+holding the whole document or a whole stream in memory.
+"""
+
+import base64
+import binascii
+import contextlib
+import re
+import zlib
+
+import numpy as np
+
+from .png_lsb import unfilter_scanline
+from ..utils.file_context import borrow
+from ..utils.helpers import find_flags, match_signature
+
+
+OBJECT_HEADER = re.compile(rb'(?<![0-9])(\d{1,10})\s+(\d{1,5})\s+obj\b')
+XREF_SECTION = re.compile(rb'\s*(\d+)\s+(\d+)\s*[\r\n]+')
+LENGTH = re.compile(rb'/Length\s+(\d+)(?:\s+(\d+)\s+R)?')
+FILTER = re.compile(rb'/Filter\s*(\[[^\]]*\]|/[^\s/\[\]<>()]+)')
+NAME = re.compile(rb'/([^\s/\[\]<>()]+)')
+JAVASCRIPT = re.compile(rb'/JS\b|/JavaScript')  # Not /JSON and friends
+
+FILTER_ALIASES = {b'Fl': b'FlateDecode', b'AHx': b'ASCIIHexDecode', b'A85': b'ASCII85Decode'}
+
+INFLATE_STEP = 1 << 20
+MAX_DECODED_BYTES = 256 << 20
+SCAN_WINDOW = 1 << 22
+
+
+def _int_entry(dictionary: bytes, key: bytes, default=None):
+    match = re.search(rb'/' + key + rb'\s+(-?\d+)', dictionary)
+    return int(match.group(1)) if match else default
+
+
+def _array_entry(dictionary: bytes, key: bytes):
+    match = re.search(rb'/' + key + rb'\s*\[([^\]]*)\]', dictionary)
+    return [int(n) for n in match.group(1).split()] if match else None
+
+
+def inflate_chunks(chunks, max_bytes: int = MAX_DECODED_BYTES):
+    """FlateDecode a stream of compressed pieces, yielding at most INFLATE_STEP bytes at a time."""
+    decompressor = zlib.decompressobj()
+    produced = 0
+    for chunk in chunks:
+        pending = chunk
+        while pending and not decompressor.eof:
+            piece = decompressor.decompress(pending, INFLATE_STEP)
+            pending = decompressor.unconsumed_tail
+            produced += len(piece)
+            if piece:
+                yield piece
+            if produced >= max_bytes:  # Decompression bombs stop here
+                return
+        if decompressor.eof:
+            return
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def _ascii_hex(data: bytes) -> bytes:
+    data = re.sub(rb'\s', b'', data.split(b'>', 1)[0])
+    if len(data) % 2:
+        data += b'0'
+    return binascii.unhexlify(data)
+
+
+def _ascii85(data: bytes) -> bytes:
+    data = re.sub(rb'\s', b'', data)
+    if data.startswith(b'<~'):
+        data = data[2:]
+    return base64.a85decode(data.split(b'~>', 1)[0])
+
+
+class PDFDocument:
+    """Object index over a memory-mapped PDF with on-demand stream decoding."""
+
+    def __init__(self, source):
+        # source is a path or a FileContext; a shared context is not closed by close()
+        self._stack = contextlib.ExitStack()
+        self.context = self._stack.enter_context(borrow(source))
+        self.file_path = self.context.path
+        self.data = self.context.data
+        if not self.data[:1024].lstrip().startswith(b'%PDF-') and self.data.find(b'%PDF-', 0, 1024) < 0:
+            self.close()
+            raise ValueError("Not a PDF file")
+
+        self.version = self.data[self.data.find(b'%PDF-') + 5:][:3].decode('latin-1')
+        self.offsets = {}          # object number -> byte offset
+        self.compressed = {}       # object number -> (object stream number, index)
+        self.xref_source = 'scan'
+        self._object_streams = {}
+
+        try:
+            self._read_xref()
+        except (ValueError, IndexError, zlib.error):
+            self.offsets, self.compressed = {}, {}
+        if not self.offsets or not self._offsets_valid():
+            self.offsets, self.compressed = self._scan_objects(), {}
+            self.xref_source = 'scan'
+
+    def close(self):
+        self._stack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- index ----------
+
+    def _read_xref(self):
+        start = self.data.rfind(b'startxref')
+        if start < 0:
+            raise ValueError("No startxref")
+        offset = int(self.data[start + 9:start + 40].split()[0])
+        seen = set()
+
+        # Newest section first: entries already indexed win over older updates
+        while offset is not None and offset not in seen and 0 <= offset < len(self.data):
+            seen.add(offset)
+            if self.data[offset:offset + 4] == b'xref':
+                offset = self._read_xref_table(offset)
+                self.xref_source = 'table'
+            else:
+                offset = self._read_xref_stream(offset)
+                self.xref_source = 'stream'
+
+    def _read_xref_table(self, offset: int):
+        trailer = self.data.find(b'trailer', offset)
+        if trailer < 0:
+            raise ValueError("xref table without trailer")
+        table = self.data[offset + 4:trailer]
+
+        position = 0
+        while True:
+            section = XREF_SECTION.match(table, position)
+            if not section:
+                break
+            first, count = int(section.group(1)), int(section.group(2))
+            position = section.end()
+            for index in range(count):
+                entry = table[position:position + 20]
+                position += 20
+                if entry[17:18] == b'n':
+                    self.offsets.setdefault(first + index, int(entry[:10]))
+            while position < len(table) and table[position:position + 1] in b' \r\n':
+                position += 1
+
+        dictionary = self.data[trailer:trailer + 4096]
+        stream_offset = _int_entry(dictionary, b'XRefStm')
+        if stream_offset is not None:  # Hybrid files keep compressed objects in an xref stream
+            self._read_xref_stream(stream_offset)
+        return _int_entry(dictionary, b'Prev')
+
+    def _read_xref_stream(self, offset: int):
+        dictionary, stream = self._object_at(offset)
+        if stream is None or b'/XRef' not in dictionary:
+            raise ValueError("startxref does not point at an xref")
+
+        widths = _array_entry(dictionary, b'W')
+        if widths is None or len(widths) != 3 or min(widths) < 0 or sum(widths) == 0:
+            raise ValueError("xref stream without a valid /W")
+        size = _int_entry(dictionary, b'Size', 0)
+        index = _array_entry(dictionary, b'Index') or [0, size]
+        raw = self._decode_with_predictor(dictionary, b''.join(self.decode_stream_chunks(dictionary, stream)),
+                                          sum(widths))
+
+        row_size = sum(widths)
+        rows = np.frombuffer(raw[:len(raw) // row_size * row_size], dtype=np.uint8).reshape(-1, row_size)
+        fields = []
+        column = 0
+        for width in widths:
+            value = np.zeros(len(rows), dtype=np.int64)
+            for byte in range(width):
+                value = (value << 8) | rows[:, column + byte]
+            fields.append(value)
+            column += width
+        if widths[0] == 0:  # Type defaults to 1 when its width is zero
+            fields[0] = np.ones(len(rows), dtype=np.int64)
+
+        row = 0
+        for first, count in zip(index[0::2], index[1::2]):
+            for number in range(first, first + count):
+                if row >= len(rows):
+                    break
+                kind, field2, field3 = int(fields[0][row]), int(fields[1][row]), int(fields[2][row])
+                if kind == 1:
+                    self.offsets.setdefault(number, field2)
+                elif kind == 2:
+                    self.compressed.setdefault(number, (field2, field3))
+                row += 1
+        return _int_entry(dictionary, b'Prev')
+
+    @staticmethod
+    def _decode_with_predictor(dictionary: bytes, data: bytes, columns: int) -> bytes:
+        predictor = _int_entry(dictionary, b'Predictor', 1)
+        if predictor < 10:
+            return data
+        columns = _int_entry(dictionary, b'Columns', columns)
+        out = []
+        previous = np.zeros(columns, dtype=np.uint8)
+        for start in range(0, len(data) - columns, columns + 1):
+            line = bytearray(data[start + 1:start + 1 + columns])
+            previous = unfilter_scanline(data[start], line, previous, 1)
+            out.append(previous.tobytes())
+        return b''.join(out)
+
+    def _offsets_valid(self) -> bool:
+        # Spot-check a handful of entries; broken or shifted xrefs fail fast
+        sample = list(self.offsets.items())[:20]
+        return all(OBJECT_HEADER.match(self.data, offset) is not None
+                   and int(OBJECT_HEADER.match(self.data, offset).group(1)) == number
+                   for number, offset in sample)
+
+    def _scan_objects(self) -> dict:
+        offsets = {}
+        # The regex runs over the memory map directly; later definitions
+        # (incremental updates) override earlier ones
+        for match in OBJECT_HEADER.finditer(self.data):
+            offsets[int(match.group(1))] = match.start()
+        return offsets
+
+    # ---------- objects ----------
+
+    def _object_at(self, offset: int):
+        """(dictionary/body bytes, (stream_start, stream_end) or None) for the object at offset."""
+        header = OBJECT_HEADER.match(self.data, offset)
+        body_start = header.end() if header else offset
+        end = self.data.find(b'endobj', body_start)
+        end = len(self.data) if end < 0 else end
+
+        keyword = self.data.find(b'stream', body_start, end)
+        while keyword >= 0 and self.data[keyword - 3:keyword] == b'end':
+            keyword = self.data.find(b'stream', keyword + 6, end)
+        if keyword < 0:
+            return self.data[body_start:end], None
+
+        dictionary = self.data[body_start:keyword]
+        data_start = keyword + 6
+        if self.data[data_start:data_start + 2] == b'\r\n':
+            data_start += 2
+        elif self.data[data_start:data_start + 1] in (b'\n', b'\r'):
+            data_start += 1
+
+        length = self._stream_length(dictionary)
+        if length is None or self.data[data_start + length:data_start + length + 20].find(b'endstream') < 0:
+            # Wrong or missing /Length: trust the endstream keyword instead
+            data_end = self.data.find(b'endstream', data_start)
+            data_end = len(self.data) if data_end < 0 else data_end
+        else:
+            data_end = data_start + length
+        return dictionary, (data_start, data_end)
+
+    def _stream_length(self, dictionary: bytes):
+        match = LENGTH.search(dictionary)
+        if not match:
+            return None
+        if match.group(2) is None:
+            return int(match.group(1))
+        referenced = self.object_body(int(match.group(1)))  # Indirect /Length
+        try:
+            return int(referenced.split()[0]) if referenced else None
+        except ValueError:
+            return None
+
+    def object_body(self, number: int):
+        """Raw body of an object (dictionary or value), None when unknown."""
+        if number in self.offsets:
+            return self._object_at(self.offsets[number])[0]
+        if number in self.compressed:
+            return self._compressed_object(number)
+        return None
+
+    def object(self, number: int):
+        """(body, stream_span) of an uncompressed object, or (body, None)."""
+        if number in self.offsets:
+            return self._object_at(self.offsets[number])
+        return self.object_body(number), None
+
+    def _compressed_object(self, number: int):
+        stream_number, index = self.compressed[number]
+        if stream_number not in self._object_streams:
+            dictionary, span = self._object_at(self.offsets[stream_number])
+            decoded = b''.join(self.decode_stream_chunks(dictionary, span))
+            count, first = _int_entry(dictionary, b'N', 0), _int_entry(dictionary, b'First', 0)
+            numbers = [int(n) for n in decoded[:first].split()[:2 * count]]
+            table = list(zip(numbers[0::2], numbers[1::2]))
+            if len(self._object_streams) > 16:  # Keep a handful of decoded object streams
+                self._object_streams.clear()
+            self._object_streams[stream_number] = (decoded, first, table)
+
+        decoded, first, table = self._object_streams[stream_number]
+        if index >= len(table):
+            return None
+        start = first + table[index][1]
+        end = first + table[index + 1][1] if index + 1 < len(table) else len(decoded)
+        return decoded[start:end]
+
+    # ---------- streams ----------
+
+    @staticmethod
+    def stream_filters(dictionary: bytes) -> list:
+        match = FILTER.search(dictionary)
+        if not match:
+            return []
+        return [FILTER_ALIASES.get(name, name) for name in NAME.findall(match.group(1))]
+
+    def decode_stream_chunks(self, dictionary: bytes, span, max_bytes: int = MAX_DECODED_BYTES):
+        """
+        Yield the decoded bytes of a stream in pieces.
+
+        Filters are applied in order; FlateDecode streams its output and the
+        ASCII filters (at most a few times smaller than their input) decode
+        in one step. Unsupported filters (DCT, JBIG2, ...) stop the chain and
+        the data decoded so far is returned.
+        """
+        start, end = span
+        chunks = (self.data[position:min(end, position + INFLATE_STEP)]
+                  for position in range(start, end, INFLATE_STEP))
+        for name in self.stream_filters(dictionary):
+            if name == b'FlateDecode':
+                chunks = inflate_chunks(chunks, max_bytes)
+            elif name == b'ASCIIHexDecode':
+                chunks = iter([_ascii_hex(b''.join(chunks))])
+            elif name == b'ASCII85Decode':
+                chunks = iter([_ascii85(b''.join(chunks))])
+            else:
+                break
+        return chunks
+
+    def iter_objects(self):
+        """Yield (number, body, stream_span) for every indexed object."""
+        for number in sorted(set(self.offsets) | set(self.compressed)):
+            try:
+                body, span = self.object(number)
+            except (ValueError, zlib.error, KeyError):
+                continue
+            if body is not None:
+                yield number, body, span
+
+
+def _scan_chunks_for_flags(chunks, window: int = 512):
+    """Flags in a stream of byte pieces, matching across piece boundaries."""
+    flags, tail, total, head = [], b'', 0, b''
+    for chunk in chunks:
+        total += len(chunk)
+        if len(head) < 64:
+            head = (head + chunk)[:64]
+        buffer = tail + chunk
+        flags.extend(find_flags(buffer))
+        tail = buffer[-window:]
+    return flags, total, head
+
+
+def analyze_pdf(source) -> dict:
+    """
+    Index a PDF, decode every stream once and collect hiding places.
+
+    Args:
+        source: Path to PDF file or a FileContext
+
+    Returns:
+        Dict with 'version', 'xref' (table/stream/scan), 'objects',
+        'incremental_updates', 'streams', 'javascript', 'embedded_files',
+        'trailing' and 'flags'
+    """
+    result = {'version': None, 'xref': None, 'objects': 0, 'incremental_updates': 0,
+              'streams': [], 'javascript': [], 'embedded_files': [], 'trailing': None, 'flags': []}
+
+    with PDFDocument(source) as pdf:
+        data = pdf.data
+        result['version'] = pdf.version
+        result['xref'] = pdf.xref_source
+
+        # Uncompressed text anywhere in the file, window by window
+        for start in range(0, len(data), SCAN_WINDOW):
+            result['flags'].extend(find_flags(data[start:start + SCAN_WINDOW + 512]))
+
+        eof_markers = [match.end() for match in re.finditer(rb'%%EOF', data)]
+        result['incremental_updates'] = max(0, len(eof_markers) - 1)
+        if eof_markers:
+            trailing = data[eof_markers[-1]:eof_markers[-1] + (1 << 20)].strip()
+            if trailing:
+                result['trailing'] = {'offset': eof_markers[-1], 'length': len(data) - eof_markers[-1],
+                                      'signature': match_signature(trailing), 'preview': trailing[:64]}
+
+        javascript_refs = set()
+        for number, body, span in pdf.iter_objects():
+            result['objects'] += 1
+            if JAVASCRIPT.search(body):
+                reference = re.search(rb'/JS\s+(\d+)\s+\d+\s+R', body)
+                if reference:
+                    javascript_refs.add(int(reference.group(1)))
+                literal = re.search(rb'/JS\s*\((.*?)\)\s*[/>]', body, re.S)
+                if literal:
+                    result['javascript'].append({'object': number, 'code': literal.group(1)[:500].decode('latin-1'),
+                                                 'error': None})
+
+            if span is None:
+                result['flags'].extend(find_flags(body))
+                continue
+
+            filters = [name.decode('latin-1') for name in pdf.stream_filters(body)]
+            entry = {'object': number, 'filters': filters, 'raw_length': span[1] - span[0],
+                     'decoded_length': None, 'error': None}
+            try:
+                flags, decoded_length, head = _scan_chunks_for_flags(pdf.decode_stream_chunks(body, span))
+                entry['decoded_length'] = decoded_length
+                result['flags'].extend(flags)
+            except (zlib.error, ValueError, binascii.Error) as e:
+                entry['error'] = str(e)
+                head = b''
+            result['streams'].append(entry)
+
+            if b'/EmbeddedFile' in body:
+                result['embedded_files'].append({'object': number, 'length': entry['decoded_length'],
+                                                 'signature': match_signature(head)})
+
+        for number in sorted(javascript_refs):
+            body, span = pdf.object(number)
+            if span:
+                try:
+                    code = b''.join(pdf.decode_stream_chunks(body, span, max_bytes=1 << 20))
+                    script = {'object': number, 'code': code[:500].decode('latin-1'), 'error': None}
+                except (zlib.error, ValueError, binascii.Error) as e:
+                    script = {'object': number, 'code': None, 'error': str(e)}
+                result['javascript'].append(script)
+
+    result['flags'] = list(dict.fromkeys(result['flags']))
+    return result
@@ -0,0 +1,294 @@
+"""
+PNG chunk analyzer for StegoCrew
+
+Walks every chunk in a single streaming pass, validating CRCs with
+zlib.crc32 as the data goes by. Text chunks are kept and decompressed only
+when read; unknown, oversized or misplaced chunks and bytes after IEND are
+reported with offsets. When IHDR has been tampered with, the width/height
+pair that matches the stored CRC (and the amount of image data) is
+recovered by solving the CRC as a linear function of the dimension bits.
+"""
+
+import struct
+import zlib
+
+import numpy as np
+
+from ..utils.file_context import borrow
+from ..utils.helpers import find_flags, match_signature
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+KNOWN_CHUNKS = {
+    b'IHDR', b'PLTE', b'IDAT', b'IEND', b'tRNS', b'cHRM', b'gAMA', b'iCCP',
+    b'sBIT', b'sRGB', b'cICP', b'mDCv', b'cLLi', b'tEXt', b'zTXt', b'iTXt',
+    b'bKGD', b'hIST', b'pHYs', b'sPLT', b'eXIf', b'tIME', b'acTL', b'fcTL',
+    b'fdAT', b'oFFs', b'pCAL', b'sCAL', b'sTER', b'gIFg', b'gIFx', b'dSIG',
+}
+TEXT_CHUNKS = {b'tEXt', b'zTXt', b'iTXt'}
+
+# Samples per pixel for each color type
+SAMPLES = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+READ_SIZE = 1 << 16
+MAX_TEXT_BYTES = 16 << 20
+OVERSIZED_CHUNK = 1 << 20
+
+
+class TextChunk:
+    """A tEXt/zTXt/iTXt chunk whose text is decoded on first access."""
+
+    def __init__(self, chunk_type: bytes, offset: int, data: bytes):
+        self.chunk_type = chunk_type.decode('ascii')
+        self.offset = offset
+        keyword, _, rest = data.partition(b'\x00')
+        self.keyword = keyword.decode('latin-1')
+        self.language = ''
+        self.compressed = False
+
+        if chunk_type == b'zTXt':
+            self.compressed = True
+            self._raw = rest[1:]  # Skip compression method byte
+            self._encoding = 'latin-1'
+        elif chunk_type == b'iTXt':
+            flag, _method = rest[0:1], rest[1:2]
+            language, _, rest = rest[2:].partition(b'\x00')
+            _translated, _, text = rest.partition(b'\x00')
+            self.language = language.decode('latin-1')
+            self.compressed = flag == b'\x01'
+            self._raw = text
+            self._encoding = 'utf-8'
+        else:
+            self._raw = rest
+            self._encoding = 'latin-1'
+
+        self._text = None
+        self.error = None  # Set when the compressed text is corrupt
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            raw = self._raw
+            if self.compressed:
+                try:
+                    # Bound the output so a zlib bomb in a text chunk cannot exhaust memory
+                    raw = zlib.decompressobj().decompress(raw, MAX_TEXT_BYTES)
+                except zlib.error as e:
+                    self.error = str(e)
+                    raw = b''
+            self._text = raw.decode(self._encoding, errors='replace')
+        return self._text
+
+
+def _dimension_contributions(ihdr_data: bytes):
+    """Linear CRC contributions of every width and height bit in IHDR."""
+    zero = b'IHDR' + bytes(13)
+    zero_crc = zlib.crc32(zero)
+
+    def contribution(byte_index: int, bit: int) -> int:
+        message = bytearray(zero)
+        message[4 + byte_index] |= 1 << bit
+        return zlib.crc32(bytes(message)) ^ zero_crc
+
+    # Field bit k of a big-endian uint32 lives in byte 3 - k // 8
+    width_bits = [contribution(3 - k // 8, k % 8) for k in range(32)]
+    height_bits = [contribution(4 + 3 - k // 8, k % 8) for k in range(32)]
+    base = zlib.crc32(b'IHDR' + bytes(8) + ihdr_data[8:])
+    return base, width_bits, height_bits
+
+
+def _crc_table(values: np.ndarray, bit_contributions) -> np.ndarray:
+    table = np.zeros(len(values), dtype=np.uint32)
+    for k, contribution in enumerate(bit_contributions):
+        if values.max() >> k == 0:
+            break
+        table ^= np.where((values >> k) & 1, np.uint32(contribution), np.uint32(0))
+    return table
+
+
+def recover_dimensions(ihdr_data: bytes, stored_crc: int, max_dimension: int = 1 << 14) -> list:
+    """
+    Width/height pairs that make IHDR match its stored CRC.
+
+    CRC32 is affine over GF(2), so crc(w, h) = base ^ W[w] ^ H[h]. Tables of
+    W and H are built with NumPy and joined with a sorted search, checking
+    max_dimension**2 combinations in milliseconds.
+
+    Args:
+        ihdr_data: The 13-byte IHDR payload as stored
+        stored_crc: CRC value read from the file
+        max_dimension: Largest width/height to consider
+
+    Returns:
+        List of (width, height) candidates
+    """
+    base, width_bits, height_bits = _dimension_contributions(ihdr_data)
+    values = np.arange(1, max_dimension + 1, dtype=np.uint32)
+    widths = _crc_table(values, width_bits)
+    heights = _crc_table(values, height_bits)
+
+    wanted = np.uint32(stored_crc ^ base) ^ widths
+    order = np.argsort(heights)
+    sorted_heights = heights[order]
+    found = np.searchsorted(sorted_heights, wanted)
+    found = np.minimum(found, len(sorted_heights) - 1)
+    match = sorted_heights[found] == wanted
+
+    candidates = []
+    for w_index in np.flatnonzero(match):
+        # Collisions are rare but possible, so collect every equal height entry
+        h_pos = found[w_index]
+        while h_pos < len(sorted_heights) and sorted_heights[h_pos] == wanted[w_index]:
+            candidates.append((int(values[w_index]), int(values[order[h_pos]])))
+            h_pos += 1
+    return candidates
+
+
+def _image_data_size(bit_depth: int, color_type: int, width: int, height: int) -> int:
+    stride = (width * SAMPLES.get(color_type, 4) * bit_depth + 7) // 8
+    return height * (stride + 1)
+
+
+def analyze_png(source, decode_text: bool = True) -> dict:
+    """
+    Walk all chunks once, validate CRCs and collect anomalies.
+
+    Args:
+        source: Path to PNG file or a FileContext
+        decode_text: Decompress text chunks and search them for flags
+
+    Returns:
+        Dict with 'header', 'chunks', 'text_chunks', 'anomalies',
+        'trailing', 'recovered_dimensions' and 'flags'
+    """
+    result = {'header': None, 'chunks': [], 'text_chunks': [], 'anomalies': [],
+              'trailing': None, 'recovered_dimensions': [], 'flags': []}
+
+    with borrow(source) as context, context.open() as f:
+        if f.read(8) != PNG_SIGNATURE:
+            raise ValueError("Not a PNG file")
+
+        f.seek(0, 2)
+        file_size = f.tell()
+        f.seek(8)
+
+        decompressor = zlib.decompressobj()
+        idat_bytes = 0
+        idat_corrupt = False
+        idat_state = 'before'  # before -> inside -> after
+        ihdr = None
+
+        while True:
+            offset = f.tell()
+            header = f.read(8)
+            if len(header) < 8:
+                result['anomalies'].append({'type': 'missing IEND', 'offset': offset})
+                break
+
+            length, chunk_type = struct.unpack('>I4s', header)
+            name = chunk_type.decode('latin-1')
+            entry = {'type': name, 'offset': offset, 'length': length, 'crc_ok': None}
+            result['chunks'].append(entry)
+
+            if offset + 12 + length > file_size:
+                result['anomalies'].append({'type': 'chunk length past end of file',
+                                            'chunk': name, 'offset': offset})
+                break
+
+            keep = chunk_type in TEXT_CHUNKS and length <= MAX_TEXT_BYTES or chunk_type == b'IHDR'
+            crc = zlib.crc32(chunk_type)
+            kept = []
+            remaining = length
+            while remaining:
+                piece = f.read(min(READ_SIZE, remaining))
+                remaining -= len(piece)
+                crc = zlib.crc32(piece, crc)
+                if keep:
+                    kept.append(piece)
+                elif chunk_type == b'IDAT' and not idat_corrupt:
+                    # Count decompressed bytes without keeping them, in bounded steps
+                    pending = piece
+                    try:
+                        while pending:
+                            idat_bytes += len(decompressor.decompress(pending, READ_SIZE * 16))
+                            pending = decompressor.unconsumed_tail
+                    except zlib.error as e:
+                        result['anomalies'].append({'type': 'corrupt IDAT stream', 'offset': offset,
+                                                    'error': str(e)})
+                        idat_corrupt = True
+                        idat_bytes = 0  # A partial count would misreport the image size
+
+            stored_crc = struct.unpack('>I', f.read(4))[0]
+            entry['crc_ok'] = crc == stored_crc
+            data = b''.join(kept)
+
+            if not entry['crc_ok']:
+                result['anomalies'].append({'type': 'bad CRC', 'chunk': name, 'offset': offset,
+                                            'stored': f'{stored_crc:08x}', 'computed': f'{crc:08x}'})
+            if chunk_type not in KNOWN_CHUNKS:
+                result['anomalies'].append({'type': 'unknown chunk', 'chunk': name, 'offset': offset,
+                                            'length': length})
+            if chunk_type != b'IDAT' and length > OVERSIZED_CHUNK:
+                result['anomalies'].append({'type': 'oversized chunk', 'chunk': name, 'offset': offset,
+                                            'length': length})
+
+            if chunk_type == b'IDAT':
+                if idat_state == 'after':
+                    result['anomalies'].append({'type': 'non-consecutive IDAT', 'offset': offset})
+                idat_state = 'inside'
+            elif idat_state == 'inside':
+                idat_state = 'after'
+
+            if chunk_type == b'IHDR':
+                if length != 13:
+                    result['anomalies'].append({'type': 'malformed IHDR', 'offset': offset})
+                    continue
+                ihdr = (data, stored_crc, entry['crc_ok'])
+                width, height, depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data)
+                result['header'] = {'width': width, 'height': height, 'bit_depth': depth,
+                                    'color_type': color_type, 'interlace': interlace}
+            elif chunk_type in TEXT_CHUNKS and keep:
+                result['text_chunks'].append(TextChunk(chunk_type, offset, data))
+            elif chunk_type == b'IEND':
+                break
+
+        end = f.tell()
+        if end < file_size:
+            trailing = f.read(min(file_size - end, 1 << 24))
+            result['trailing'] = {'offset': end, 'length': file_size - end,
+                                  'signature': match_signature(trailing), 'preview': trailing[:64]}
+            result['flags'].extend(find_flags(trailing))
+
+    if ihdr and result['header']['interlace'] == 0:
+        data, stored_crc, crc_ok = ihdr
+        header = result['header']
+        expected = _image_data_size(header['bit_depth'], header['color_type'],
+                                    header['width'], header['height'])
+        if idat_bytes and idat_bytes != expected:
+            result['anomalies'].append({'type': 'IDAT size does not match IHDR dimensions',
+                                        'expected': expected, 'actual': idat_bytes})
+
+        if not crc_ok:
+            candidates = recover_dimensions(data, stored_crc)
+            if idat_bytes:
+                # Prefer candidates that also explain the amount of image data
+                fitting = [c for c in candidates
+                           if _image_data_size(header['bit_depth'], header['color_type'], *c) == idat_bytes]
+                candidates = fitting or candidates
+            result['recovered_dimensions'] = candidates[:10]
+        elif idat_bytes and idat_bytes != expected:
+            # CRC was patched along with the size: derive the height from the data
+            row_size = _image_data_size(header['bit_depth'], header['color_type'], header['width'], 1)
+            if idat_bytes % row_size == 0:
+                result['recovered_dimensions'] = [(header['width'], idat_bytes // row_size)]
+
+    if decode_text:
+        for chunk in result['text_chunks']:
+            result['flags'].extend(find_flags(chunk.keyword + ' ' + chunk.text))
+            if chunk.error:
+                result['anomalies'].append({'type': 'corrupt text chunk', 'chunk': chunk.chunk_type,
+                                            'offset': chunk.offset, 'error': chunk.error})
+
+    result['flags'] = list(dict.fromkeys(result['flags']))
+    return result
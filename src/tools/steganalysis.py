@@ -0,0 +1,188 @@
+"""
+Format-independent steganalysis helpers for StegoCrew
+
+Bitstream scanning with early exit and the chi-square (pairs of values)
+attack, shared by the PNG, BMP and audio analyzers. Everything here works
+on streams of chunks so callers stay in bounded memory.
+"""
+
+import math
+
+import numpy as np
+
+from ..utils.helpers import FLAG_FORMAT, match_signature
+
+
+# ==================== BITSTREAM SCANNING ====================
+
+def scan_stream(chunks, max_bytes: int = None, window: int = 512) -> dict:
+    """
+    Consume extracted bytes until a flag or payload signature appears.
+
+    File signatures are only checked at the start of the stream (and after
+    a 4-byte length prefix) because short magic numbers appear by chance in
+    long noise streams; flags are matched anywhere.
+
+    Args:
+        chunks: Iterable of bytes objects (e.g. one per scanline)
+        max_bytes: Stop after this many bytes (None = exhaust the stream)
+        window: Bytes of trailing context kept to match flags across chunks
+
+    Returns:
+        Dict with 'flag', 'flag_offset', 'signature', 'bytes_scanned',
+        'stopped_early' and 'preview' (first 64 bytes)
+    """
+    result = {'flag': None, 'flag_offset': None, 'signature': None,
+              'bytes_scanned': 0, 'stopped_early': False, 'preview': b''}
+    tail = b''
+
+    for chunk in chunks:
+        start = result['bytes_scanned']
+        result['bytes_scanned'] += len(chunk)
+
+        if len(result['preview']) < 64:
+            result['preview'] = (result['preview'] + chunk)[:64]
+            for offset in (0, 4):
+                name = match_signature(result['preview'][offset:])
+                if name and len(result['preview']) >= offset + 8:
+                    result['signature'] = {'type': name, 'offset': offset}
+                    result['stopped_early'] = True
+                    return result
+
+        buffer = tail + chunk
+        match = FLAG_FORMAT.search(buffer.decode('latin-1'))
+        if match:
+            result['flag'] = match.group(0)
+            result['flag_offset'] = start - len(tail) + match.start()
+            result['stopped_early'] = True
+            return result
+        tail = buffer[-window:]
+
+        if max_bytes and result['bytes_scanned'] >= max_bytes:
+            result['stopped_early'] = True
+            break
+
+    return result
+
+
+def pack_bits(bit_chunks):
+    """Pack a stream of 0/1 arrays MSB-first, carrying leftover bits between chunks."""
+    carry = np.zeros(0, dtype=np.uint8)
+    for bits in bit_chunks:
+        bits = np.concatenate((carry, bits.astype(np.uint8, copy=False).ravel()))
+        whole = len(bits) // 8 * 8
+        carry = bits[whole:]
+        if whole:
+            yield np.packbits(bits[:whole]).tobytes()
+
+
+# ==================== CHI-SQUARE ATTACK ====================
+
+def _lower_gamma_series(a: float, x: float) -> float:
+    term = total = 1.0 / a
+    n = a
+    for _ in range(1000):
+        n += 1
+        term *= x / n
+        total += term
+        if abs(term) < abs(total) * 1e-12:
+            break
+    return total * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def _upper_gamma_fraction(a: float, x: float) -> float:
+    # Lentz's method for the continued fraction of Q(a, x)
+    tiny = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h * math.exp(-x + a * math.log(x) - math.lgamma(a))
+
+
+def chi2_sf(statistic: float, dof: int) -> float:
+    """Survival function (1 - CDF) of the chi-square distribution."""
+    if statistic <= 0:
+        return 1.0
+    a, x = dof / 2.0, statistic / 2.0
+    if x < a + 1.0:
+        return max(0.0, 1.0 - _lower_gamma_series(a, x))
+    return min(1.0, _upper_gamma_fraction(a, x))
+
+
+def chi_square_pairs(histogram: np.ndarray) -> float:
+    """
+    Westfeld-Pfitzmann chi-square test on a value histogram.
+
+    LSB replacement equalizes the counts of each pair of values (2k, 2k+1),
+    so a probability close to 1.0 means the LSBs are likely carrying data.
+
+    Args:
+        histogram: Counts per sample value (length must be even)
+
+    Returns:
+        Probability of embedding (0.0 - 1.0)
+    """
+    histogram = np.asarray(histogram, dtype=np.float64)
+    even, odd = histogram[0::2], histogram[1::2]
+    expected = (even + odd) / 2.0
+
+    # Sparse pairs make the statistic meaningless, so they are left out
+    valid = expected > 4
+    if valid.sum() < 2:
+        return 0.0
+
+    statistic = float((((even - expected) ** 2)[valid] / expected[valid]).sum())
+    return chi2_sf(statistic, int(valid.sum()) - 1)
+
+
+def chi_square_profile(value_blocks, total: int, bins: int = 256, steps: int = 10) -> list:
+    """
+    Chi-square embedding probability over growing prefixes of a stream.
+
+    Sequential LSB embedding shows up as a high probability for the first
+    part of the data that drops once the payload ends, which also estimates
+    the payload length. Only a running histogram is kept in memory.
+
+    Args:
+        value_blocks: Iterable of non-negative integer arrays in stream order
+        total: Total number of values across all blocks
+        bins: Number of possible sample values (256 for 8-bit samples)
+        steps: Number of equally spaced prefixes to report
+
+    Returns:
+        List of (fraction_of_stream, probability) tuples
+    """
+    if total == 0:
+        return []
+
+    marks = [math.ceil(total * k / steps) for k in range(1, steps + 1)]
+    histogram = np.zeros(bins, dtype=np.int64)
+    profile = []
+    seen = 0
+
+    for block in value_blocks:
+        block = np.asarray(block).ravel()
+        start = 0
+        while start < len(block) and len(profile) < steps:
+            end = min(len(block), start + marks[len(profile)] - seen)
+            histogram += np.bincount(block[start:end], minlength=bins)[:bins]
+            seen += end - start
+            start = end
+            if seen >= marks[len(profile)]:
+                fraction = (len(profile) + 1) / steps
+                profile.append((fraction, round(chi_square_pairs(histogram), 4)))
+
+    return profile
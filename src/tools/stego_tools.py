@@ -0,0 +1,338 @@
+"""
+Steganography tools for StegoCrew agents
+"""
+
+import os
+
+from crewai_tools import tool
+
+from . import audio_analysis, audio_signals, bmp_reader, gif_frames, image_transforms, jpeg_dct, png_lsb
+from ..utils.tool_result import ToolResult
+
+
+def _add_lsb_scan(report: ToolResult, scan: dict, via: str):
+    """Flag, file signature or nothing from an LSB bitstream scan."""
+    if scan['flag']:
+        report.add_flag(scan['flag'], scan['flag_offset'], via)
+    elif scan['signature']:
+        signature = scan['signature']
+        report.notable('lsb_signature', f"{signature['type']} in {via} (dump the bitstream to a file)",
+                       signature.get('offset'))
+    else:
+        report.add('lsb_scan', f"no flag in {scan['bytes_scanned']} bytes of {via}")
+
+
+@tool
+def render_image_transforms(file_path: str, output_dir: str = "") -> ToolResult:
+    """
+    Stegsolve-style bit plane, XOR/AND, inversion and palette views of an image.
+
+    Args:
+        file_path: Path to image (PNG, BMP, GIF, JPEG)
+        output_dir: Where to write a contact sheet of the top views (empty = stats only)
+
+    Returns:
+        Ranked transforms with entropy and visible-text likelihood
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('render_image_transforms', f"File not found: {file_path}")
+
+    report = ToolResult('render_image_transforms')
+    try:
+        with report.timed('transforms'):
+            result = image_transforms.analyze_transforms(file_path, output_dir or None)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    # The top ten views plus any others likely to show text; the rest are noise
+    shown = [stats for rank, stats in enumerate(result['ranking'])
+             if rank < 10 or stats['text_likelihood'] > 0.3]
+    report.summary = f"{len(result['ranking'])} views ranked by visible-text likelihood, top {len(shown)} listed"
+    for stats in shown:
+        detail = f"text={stats['text_likelihood']:.2f} entropy={stats['entropy']:.2f}"
+        if stats['text_likelihood'] > 0.3:
+            report.notable(stats['name'], detail)
+        else:
+            report.add(stats['name'], detail)
+
+    for path in result['written']:
+        report.add_artifact(path, 'image', 'contact sheet')
+
+    return report
+
+
+@tool
+def scan_png_lsb(file_path: str, channels: str = "rgb", bit: int = 0) -> ToolResult:
+    """
+    Stream LSB bits out of a PNG scanline by scanline (safe for huge images).
+
+    Args:
+        file_path: Path to PNG file
+        channels: Channel order to read bits from, e.g. 'rgb', 'bgr', 'a'
+        bit: Bit plane (0 = least significant)
+
+    Returns:
+        Flag or embedded file signature found in the bitstream, with a preview
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('scan_png_lsb', f"File not found: {file_path}")
+
+    report = ToolResult('scan_png_lsb', f"channels {channels}, bit {bit}")
+    try:
+        with report.timed('scan'):
+            result = png_lsb.scan_png_lsb(file_path, channels or None, bit)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    _add_lsb_scan(report, result, f"LSB {channels} bit {bit}")
+    if not (result['flag'] or result['signature']):
+        report.add('preview', value=result['preview'][:32])
+    return report
+
+
+@tool
+def analyze_bmp(file_path: str) -> ToolResult:
+    """
+    Memory-mapped BMP analysis: header, chi-square LSB test and LSB flag scan.
+
+    Args:
+        file_path: Path to BMP file (8, 24 or 32-bit uncompressed)
+
+    Returns:
+        Header summary, per-channel embedding probability and any LSB flag
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_bmp', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_bmp')
+    try:
+        with report.timed('analyze'):
+            result = bmp_reader.analyze_bmp(file_path)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    header = result['header']
+    report.summary = (
+        f"BMP {header['width']}x{header['height']}, {header['bits']}-bit, "
+        f"{'top-down' if header['top_down'] else 'bottom-up'}"
+    )
+    for letter, profile in result['chi_square'].items():
+        if not profile:
+            continue  # No pixels to test
+        detail = f"embedding probability {profile[0][1]:.3f} (first 10%) / {profile[-1][1]:.3f} (whole image)"
+        if profile[0][1] > 0.95:
+            report.notable(f"chi_square {letter}", detail)
+        else:
+            report.add(f"chi_square {letter}", detail)
+
+    _add_lsb_scan(report, result['lsb'], 'pixel LSB')
+    return report
+
+
+@tool
+def analyze_audio_lsb(file_path: str, bits: int = 1) -> ToolResult:
+    """
+    Memory-mapped WAV/AU analysis: header, chi-square test and LSB flag scan.
+
+    Args:
+        file_path: Path to WAV or AU file
+        bits: Low bits per sample to extract (try 1, then 2)
+
+    Returns:
+        Audio summary, per-channel embedding probability and any LSB flag
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_audio_lsb', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_audio_lsb')
+    try:
+        with report.timed('analyze'):
+            result = audio_analysis.analyze_audio(file_path, bits)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    header = result['header']
+    report.summary = (
+        f"{header['format'].upper()} {header['channels']}ch, {header['sample_rate']} Hz, "
+        f"{header['bits']}-bit{' mu-law' if header['encoding'] == 'mulaw' else ''}, {header['duration']}s"
+    )
+
+    if result['lsb'] is None:
+        report.add('lsb_scan', "float samples: LSB analysis skipped")
+        return report
+
+    for channel, profile in result['chi_square'].items():
+        if not profile:
+            continue  # No samples to test
+        detail = f"embedding probability {profile[0][1]:.3f} (first 10%) / {profile[-1][1]:.3f} (whole file)"
+        if profile[0][1] > 0.95:
+            report.notable(f"chi_square channel {channel}", detail)
+        else:
+            report.add(f"chi_square channel {channel}", detail)
+
+    _add_lsb_scan(report, result['lsb'], f"{bits}-bit sample LSB")
+    return report
+
+
+@tool
+def analyze_audio_signals(file_path: str, spectrogram_path: str = "") -> ToolResult:
+    """
+    Spectrogram rendering plus DTMF and Morse decoding in a single pass over the audio.
+
+    Args:
+        file_path: Path to WAV or AU file
+        spectrogram_path: Where to save the spectrogram PNG (empty = don't render)
+
+    Returns:
+        Decoded DTMF digits, Morse text and spectrogram summary
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_audio_signals', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_audio_signals')
+    try:
+        with report.timed('analyze'):
+            result = audio_signals.analyze_audio_signals(file_path, spectrogram_path or None)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    spec = result['spectrogram']
+    report.summary = f"dominant frequency {spec['dominant_hz']} Hz"
+
+    digits = result['dtmf']['digits']
+    if digits:
+        report.notable('dtmf', value=digits)
+    else:
+        report.add('dtmf', "none detected")
+
+    morse = result['morse']
+    if morse['text']:
+        report.notable('morse', value=morse['text'])
+        report.add('morse_symbols', value=morse['symbols'])
+    else:
+        report.add('morse', "no on/off keying detected")
+
+    if spec['path']:
+        report.add_artifact(spec['path'], 'spectrogram', "look for text in the image")
+
+    return report
+
+
+@tool
+def analyze_jpeg_dct(file_path: str) -> ToolResult:
+    """
+    Decode JPEG DCT coefficients and check for jsteg, OutGuess and F5 embedding.
+
+    Args:
+        file_path: Path to baseline JPEG file
+
+    Returns:
+        Detector scores, estimated payload size and any jsteg-extracted flag
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_jpeg_dct', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_jpeg_dct')
+    try:
+        with report.timed('decode'):
+            result = jpeg_dct.analyze_jpeg_dct(file_path)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    width, height = result['dimensions']
+    detectors = result['detectors']
+    report.summary = f"{width}x{height}, {result['blocks']} blocks"
+    scores = [
+        ('jsteg', detectors['jsteg']['score'],
+         f"payload ~{detectors['jsteg']['payload_fraction']:.0%} of capacity"),
+        ('outguess', detectors['outguess']['score'],
+         f"LSB change rate {detectors['outguess']['embedding_rate']:.2f}"),
+        ('f5', detectors['f5']['score'], f"beta {detectors['f5']['beta']:.2f}"),
+    ]
+    for name, score, detail in scores:
+        if score > 0.5:
+            report.notable(name, f"score {score:.2f} ({detail})")
+        else:
+            report.add(name, f"score {score:.2f} ({detail})")
+    for evidence in detectors['f5']['evidence']:
+        report.notable('f5_evidence', evidence)
+
+    jsteg = result['jsteg']
+    if jsteg['scan']['flag'] or jsteg['scan']['signature']:
+        _add_lsb_scan(report, jsteg['scan'], 'jsteg stream')
+    elif jsteg['payload'] and detectors['jsteg']['score'] > 0.5:
+        report.notable('jsteg_payload', f"{len(jsteg['payload'])} bytes", value=jsteg['payload'])
+
+    return report
+
+
+@tool
+def analyze_gif_frames(file_path: str, output_dir: str = "") -> ToolResult:
+    """
+    Walk GIF blocks: comments, application extensions, frame delays, palette anomalies.
+
+    Args:
+        file_path: Path to GIF file
+        output_dir: Where to write suspicious frames as PNG (empty = don't write)
+
+    Returns:
+        Frame/timing summary, decoded delay messages, palette findings and flags
+    """
+    if not os.path.exists(file_path):
+        return ToolResult.failed('analyze_gif_frames', f"File not found: {file_path}")
+
+    report = ToolResult('analyze_gif_frames')
+    try:
+        with report.timed('analyze'):
+            result = gif_frames.analyze_gif(file_path)
+        written = []
+        if output_dir and result['odd_frames']:
+            indexes = [frame['index'] for frame in result['odd_frames']]
+            with report.timed('extract'):
+                written = gif_frames.extract_frames(file_path, output_dir, indexes)
+    except Exception as e:
+        return report.fail(f"ERROR: {str(e)}")
+
+    header = result['header']
+    report.summary = (
+        f"GIF{header['version']} {header['width']}x{header['height']}, {header['frames']} frame(s), "
+        f"global palette {header['global_palette']}"
+    )
+    report.add_flags(result['flags'], via='GIF blocks')
+
+    for comment in result['comments']:
+        report.notable('comment', offset=comment['offset'], value=comment['text'])
+    for app in result['applications']:
+        report.add('application_extension', f"{app['identifier']} ({app['length']} bytes)")
+
+    delays = result['delays']
+    if len(set(delays['values'])) > 1:
+        report.add('delays', value=delays['values'])
+        if delays['as_text']:
+            report.notable('delays_as_ascii', value=delays['as_text'])
+        if delays['as_bits']:
+            report.notable('delays_as_bits', value=delays['as_bits'])
+
+    for frame in result['odd_frames']:
+        reason = "outside canvas" if frame['outside_canvas'] else f"delay {frame['delay']}"
+        report.warn(f"frame {frame['index']}", reason)
+    for path in written:
+        report.add_artifact(path, 'frame')
+
+    palette = result['palette']
+    if palette:
+        detail = f"{palette['duplicates']} duplicate, {palette['near_duplicates']} near-duplicate"
+        if palette['unused'] is not None:
+            detail += f", {palette['unused']} unused (from {palette['frames_sampled']} frames)"
+        report.add('palette', detail)
+        if palette['unused_payload']:
+            report.notable('unused_palette_text', value=palette['unused_payload'])
+
+    trailing = result['trailing']
+    if trailing and trailing.get('missing_trailer'):
+        report.warn('missing_trailer', "file is truncated or damaged")
+    elif trailing:
+        report.notable('trailing_data', f"{trailing['length']} bytes after trailer", trailing['offset'],
+                       trailing['signature'])
+
+    return report
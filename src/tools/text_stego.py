@@ -0,0 +1,308 @@
+"""
+Text steganography decoders for StegoCrew
+
+Trailing whitespace (SNOW and plain space/tab bits), zero-width Unicode
+characters and homoglyph substitution. The file is read in batches of
+lines and each decoder only keeps the hidden bits it has collected, packed
+into bytes as they arrive, so very large text files are processed in
+constant memory apart from the payload itself.
+"""
+
+import io
+import itertools
+import re
+
+from ..utils.file_context import borrow
+from ..utils.helpers import find_flags
+
+
+MAX_PAYLOAD_BYTES = 1 << 20
+BATCH_CHARS = 1 << 20
+
+ZERO_WIDTH = {
+    '\u200b': 'ZWSP', '\u200c': 'ZWNJ', '\u200d': 'ZWJ', '\u2060': 'WJ',
+    '\ufeff': 'ZWNBSP', '\u180e': 'MVS', '\u200e': 'LRM', '\u200f': 'RLM',
+    '\u202a': 'LRE', '\u202b': 'RLE', '\u202c': 'PDF', '\u202d': 'LRO', '\u202e': 'RLO',
+    '\u2061': 'FA', '\u2062': 'IT', '\u2063': 'IS', '\u2064': 'IP', '\u034f': 'CGJ',
+}
+
+# Lookalike -> Latin letter (Cyrillic and Greek)
+HOMOGLYPHS = {
+    '\u0430': 'a', '\u0435': 'e', '\u043e': 'o', '\u0440': 'p', '\u0441': 'c',
+    '\u0443': 'y', '\u0445': 'x', '\u0456': 'i', '\u0458': 'j', '\u0455': 's',
+    '\u0501': 'd', '\u04bb': 'h', '\u0410': 'A', '\u0412': 'B', '\u0415': 'E',
+    '\u041a': 'K', '\u041c': 'M', '\u041d': 'H', '\u041e': 'O', '\u0420': 'P',
+    '\u0421': 'C', '\u0422': 'T', '\u0425': 'X', '\u0406': 'I', '\u0408': 'J',
+    '\u0405': 'S', '\u03bf': 'o', '\u03bd': 'v', '\u0391': 'A', '\u0392': 'B',
+    '\u0395': 'E', '\u0396': 'Z', '\u0397': 'H', '\u0399': 'I', '\u039a': 'K',
+    '\u039c': 'M', '\u039d': 'N', '\u039f': 'O', '\u03a1': 'P', '\u03a4': 'T',
+    '\u03a7': 'X', '\u03a5': 'Y',
+}
+ZERO_WIDTH_PATTERN = re.compile('[' + ''.join(ZERO_WIDTH) + ']')
+HOMOGLYPH_TABLE = str.maketrans(HOMOGLYPHS)
+CARRIER_LETTERS = set(HOMOGLYPHS.values())
+HOMOGLYPH_PATTERN = re.compile('[' + ''.join(HOMOGLYPHS) + ']')
+CARRIER_PATTERN = re.compile('[' + ''.join(sorted(CARRIER_LETTERS)) + ''.join(HOMOGLYPHS) + ']')
+# Carrier letter -> bit: '0' for Latin, '1' for a lookalike
+CARRIER_BITS = str.maketrans({**{ch: '0' for ch in CARRIER_LETTERS}, **{ch: '1' for ch in HOMOGLYPHS}})
+WHITESPACE_BITS = str.maketrans({' ': '0', '\t': '1'})
+
+
+class BitSink:
+    """Collect '0'/'1' bit strings MSB-first into bytes as they arrive, up to a byte cap."""
+
+    def __init__(self, max_bytes: int = MAX_PAYLOAD_BYTES):
+        self.data = bytearray()
+        self.max_bytes = max_bytes
+        self.bits = 0
+        self._pending = ''
+
+    @property
+    def full(self) -> bool:
+        return len(self.data) >= self.max_bytes
+
+    def push(self, bits: str):
+        if not bits or self.full:
+            return
+        self.bits += len(bits)
+        pending = self._pending + bits
+        whole = len(pending) - len(pending) % 8
+        if whole:
+            self.data += int(pending[:whole], 2).to_bytes(whole // 8, 'big')
+            del self.data[self.max_bytes:]
+        self._pending = pending[whole:]
+
+
+def printable_ratio(data) -> float:
+    if not data:
+        return 0.0
+    if isinstance(data, str):
+        return sum(ch.isprintable() or ch in '\r\n\t' for ch in data) / len(data)
+    return sum(32 <= b < 127 or b in (9, 10, 13) for b in data) / len(data)
+
+
+def _candidate(name: str, data: bytes) -> dict:
+    text = bytes(data).decode('utf-8', errors='replace')
+    return {'scheme': name, 'text': text, 'printable': round(printable_ratio(data), 3),
+            'flags': find_flags(text)}
+
+
+def _best(candidates: list):
+    """Flags first, then the most printable decoding."""
+    candidates = [c for c in candidates if c['text']]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda c: (bool(c['flags']), c['printable'], len(c['text'])))
+
+
+# ==================== TRAILING WHITESPACE ====================
+
+class WhitespaceDecoder:
+    """
+    Trailing space/tab payloads.
+
+    Three layouts are collected side by side: SNOW (each line's hidden part
+    starts with a tab, then runs of 0-7 spaces closed by a tab carry 3 bits
+    each), one bit per whitespace character (space/tab), and one bit per
+    line (trailing whitespace present or not).
+    """
+
+    def __init__(self):
+        self.lines_with_whitespace = 0
+        self.snow = BitSink()
+        self.char_bits = BitSink()
+        self.line_bits = BitSink()
+
+    def feed(self, lines: list):
+        line_bits = []
+        for line in lines:
+            body = line.rstrip('\r\n')
+            if body[-1:] not in (' ', '\t') or not body:
+                line_bits.append('0')
+                continue
+            line_bits.append('1')
+            self._feed_trailing(body[len(body.rstrip(' \t')):])
+        self.line_bits.push(''.join(line_bits))
+
+    def _feed_trailing(self, trailing: str):
+        self.lines_with_whitespace += 1
+        self.char_bits.push(trailing.translate(WHITESPACE_BITS))
+
+        # SNOW: a leading tab separates the cover text from the hidden runs
+        runs = (trailing[1:] if trailing.startswith('\t') else trailing).split('\t')
+        if not runs[-1]:
+            runs.pop()  # Closing tab of the last run; a final run without one still carries bits
+        self.snow.push(''.join(format(min(len(run), 7), '03b') for run in runs))
+
+    def finish(self) -> dict:
+        if not self.lines_with_whitespace:
+            return {'lines': 0, 'best': None, 'candidates': []}
+
+        inverted = bytes(b ^ 0xFF for b in self.char_bits.data)
+        candidates = [
+            _candidate('snow', self.snow.data.rstrip(b'\x00')),
+            _candidate('space=0 tab=1', self.char_bits.data),
+            _candidate('space=1 tab=0', inverted),
+            _candidate('line has trailing whitespace', self.line_bits.data),
+        ]
+        return {'lines': self.lines_with_whitespace, 'best': _best(candidates), 'candidates': candidates}
+
+
+# ==================== ZERO-WIDTH CHARACTERS ====================
+
+class ZeroWidthDecoder:
+    """
+    Zero-width character payloads of any alphabet size.
+
+    The hidden characters are collected in order; at the end every symbol
+    ordering is tried as binary (2 symbols), base-3 or base-4 digits, plus
+    the common "bits separated by a third character" layout.
+    """
+
+    def __init__(self, max_symbols: int = 8 * MAX_PAYLOAD_BYTES):
+        self._pieces = []
+        self._collected = 0
+        self.counts = {}
+        self.max_symbols = max_symbols
+
+    def feed(self, text: str):
+        hidden = ''.join(ZERO_WIDTH_PATTERN.findall(text))
+        if not hidden:
+            return
+        for ch in hidden:
+            self.counts[ch] = self.counts.get(ch, 0) + 1
+        if self._collected < self.max_symbols:
+            self._pieces.append(hidden)
+            self._collected += len(hidden)
+
+    @staticmethod
+    def _digits_to_bytes(digits, base: int) -> bytes:
+        width = {2: 8, 3: 6, 4: 4}[base]
+        out = bytearray()
+        for start in range(0, len(digits) - width + 1, width):
+            value = 0
+            for digit in digits[start:start + width]:
+                value = value * base + digit
+            out.append(value & 0xFF)
+        return bytes(out)
+
+    def finish(self) -> dict:
+        symbols = ''.join(self._pieces)[:self.max_symbols]
+        alphabet = sorted(self.counts, key=self.counts.get, reverse=True)
+        result = {'count': sum(self.counts.values()),
+                  'alphabet': {ZERO_WIDTH[ch]: self.counts[ch] for ch in alphabet},
+                  'best': None, 'candidates': []}
+        if len(symbols) < 8:
+            return result
+
+        candidates = []
+        for base in (2, 3, 4):
+            if len(alphabet) < base:
+                continue
+            for order in itertools.permutations(alphabet[:base]):
+                mapping = {ch: digit for digit, ch in enumerate(order)}
+                digits = [mapping[ch] for ch in symbols if ch in mapping]
+                name = f"base{base} " + ' '.join(ZERO_WIDTH[ch] for ch in order)
+                candidates.append(_candidate(name, self._digits_to_bytes(digits, base)))
+
+        # Variable-length binary characters separated by a third symbol
+        if len(alphabet) >= 3:
+            for separator in alphabet[:3]:
+                bits_symbols = [ch for ch in alphabet[:3] if ch != separator]
+                for zero, one in (bits_symbols, bits_symbols[::-1]):
+                    groups = symbols.split(separator)
+                    values = bytearray()
+                    for group in groups:
+                        bits = ''.join('0' if ch == zero else '1' for ch in group if ch in (zero, one))
+                        if bits:
+                            values.append(int(bits, 2) & 0xFF)
+                    name = f"{ZERO_WIDTH[zero]}=0 {ZERO_WIDTH[one]}=1 split by {ZERO_WIDTH[separator]}"
+                    candidates.append(_candidate(name, bytes(values)))
+
+        result['best'] = _best(candidates)
+        result['candidates'] = sorted(candidates, key=lambda c: (bool(c['flags']), c['printable']),
+                                      reverse=True)[:5]
+        return result
+
+
+# ==================== HOMOGLYPHS ====================
+
+class HomoglyphDecoder:
+    """
+    Latin/lookalike substitution: every carrier letter is one bit
+    (0 = Latin, 1 = Cyrillic/Greek lookalike). The normalized text is kept
+    only as a short preview.
+    """
+
+    def __init__(self, preview_chars: int = 2000):
+        self.bits = BitSink()
+        self.substitutions = 0
+        self.preview = []
+        self._preview_left = preview_chars
+
+    def feed(self, text: str):
+        if self.bits.full:
+            self.substitutions += len(HOMOGLYPH_PATTERN.findall(text))
+        else:
+            bits = ''.join(CARRIER_PATTERN.findall(text)).translate(CARRIER_BITS)
+            self.substitutions += bits.count('1')
+            self.bits.push(bits)
+        if self._preview_left > 0:
+            normalized = text.translate(HOMOGLYPH_TABLE)[:self._preview_left]
+            self.preview.append(normalized)
+            self._preview_left -= len(normalized)
+
+    def finish(self) -> dict:
+        result = {'substitutions': self.substitutions, 'normalized_preview': ''.join(self.preview),
+                  'best': None}
+        if self.substitutions:
+            payload = bytes(self.bits.data)
+            # The payload ends where substitutions stop, so trailing zero bytes are padding
+            result['best'] = _candidate('latin=0 lookalike=1', payload.rstrip(b'\x00'))
+        return result
+
+
+# ==================== SINGLE PASS ====================
+
+def analyze_text_stego(source, encoding: str = 'utf-8') -> dict:
+    """
+    Stream a text file once through the whitespace, zero-width and homoglyph decoders.
+
+    Args:
+        source: Path to text file or a FileContext
+        encoding: Text encoding (undecodable bytes are kept as surrogates)
+
+    Returns:
+        Dict with 'lines', 'whitespace', 'zero_width', 'homoglyphs' and 'flags'
+    """
+    whitespace = WhitespaceDecoder()
+    zero_width = ZeroWidthDecoder()
+    homoglyphs = HomoglyphDecoder()
+    flags = []
+    lines = 0
+
+    # newline='' keeps '\r' so CRLF files do not turn into trailing whitespace.
+    # Lines are fed in ~1 MB batches: whitespace is per line, the rest per batch.
+    with borrow(source) as context, \
+            io.TextIOWrapper(context.open(), encoding=encoding, errors='surrogateescape', newline='') as f:
+        for batch in iter(lambda: f.readlines(BATCH_CHARS), []):
+            lines += len(batch)
+            text = ''.join(batch)
+            whitespace.feed(batch)
+            zero_width.feed(text)
+            homoglyphs.feed(text)
+            flags.extend(find_flags(text.translate(HOMOGLYPH_TABLE)))
+
+    result = {
+        'lines': lines,
+        'whitespace': whitespace.finish(),
+        'zero_width': zero_width.finish(),
+        'homoglyphs': homoglyphs.finish(),
+    }
+    for key in ('whitespace', 'zero_width', 'homoglyphs'):
+        best = result[key]['best']
+        if best:
+            flags.extend(best['flags'])
+
+    result['flags'] = list(dict.fromkeys(flags))
+    return result
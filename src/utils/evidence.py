@@ -0,0 +1,134 @@
+"""
+Evidence store and token-budgeted digests for task context
+
+Every tool result and task conclusion of a run goes into one store. Each
+flag, finding and summary becomes an item with a stable ID. An item seen
+by several tools is stored once and lists all of them. Downstream tasks
+do not get the raw output of earlier tasks. They get digest(): a ranked
+list of one-line items, flags first, cut to a token budget. Agents pass
+an ID to get() (the get_evidence tool) to read the full detail of any
+item.
+"""
+
+import math
+import os
+
+from .tool_result import ERROR, INFO, NOTABLE, WARNING, ToolResult
+
+
+CONTEXT_BUDGET = int(os.environ.get('STEGOCREW_CONTEXT_BUDGET', 1500))  # tokens per digest
+CHARS_PER_TOKEN = 4  # Rough ratio for English and tool output; no tokenizer needed
+
+LINE_WIDTH = 160  # Value width in digest lines; get() shows everything
+
+# Digest order: lower rank first
+RANK_FLAG = 0
+RANK_LEVEL = {NOTABLE: 1, WARNING: 2, INFO: 4}
+RANK_SUMMARY = 3  # Tool summaries and task conclusions
+RANK_ERROR = 5
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class EvidenceItem:
+    __slots__ = ('id', 'rank', 'line', 'detail', 'sources')
+
+    def __init__(self, item_id: str, rank: int, line: str, detail: str, source: str):
+        self.id = item_id
+        self.rank = rank
+        self.line = line
+        self.detail = detail
+        self.sources = [source]
+
+    def render(self) -> str:
+        also = f" (also {', '.join(self.sources[1:])})" if len(self.sources) > 1 else ""
+        return f"[{self.id}] {self.line}{also}"
+
+
+class EvidenceStore:
+    """Deduplicated, ID-addressable evidence for one run."""
+
+    def __init__(self):
+        self.items = {}  # id -> EvidenceItem, in insertion order
+        self.results = {}  # result id -> ToolResult
+        self._keys = {}  # dedup key -> EvidenceItem
+        self._notes = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def _add(self, key, item_id: str, rank: int, line: str, detail: str, source: str):
+        existing = self._keys.get(key)
+        if existing is not None:
+            if source not in existing.sources:
+                existing.sources.append(source)
+            existing.rank = min(existing.rank, rank)
+            return existing
+        item = EvidenceItem(item_id, rank, line, detail, source)
+        self.items[item_id] = item
+        self._keys[key] = item
+        return item
+
+    def add_result(self, result: ToolResult) -> str:
+        """Store a tool result; returns its ID (R<n>). Its findings get IDs R<n>.<i>."""
+        result_id = f"R{len(self.results) + 1}"
+        self.results[result_id] = result
+        source = result.tool
+
+        for index, flag in enumerate(result.flags, 1):
+            self._add(('flag', flag.value), f"{result_id}.f{index}", RANK_FLAG,
+                      flag.render(), flag.render(), source)
+
+        header = f"{source}: {result.status}" + (f" | {result.summary}" if result.summary else "")
+        self._add(('result', source, result.status, result.summary), result_id, RANK_ERROR if result.status == ERROR else RANK_SUMMARY,
+                  header, result.render(max_findings=len(result.findings), width=1 << 20), source)
+
+        for index, finding in enumerate(result.findings, 1):
+            key = ('finding', finding.kind, finding.message, repr(finding.value))
+            self._add(key, f"{result_id}.{index}", RANK_LEVEL.get(finding.level, RANK_LEVEL[INFO]),
+                      finding.render(LINE_WIDTH), finding.render(1 << 20), source)
+        return result_id
+
+    def add_note(self, source: str, text: str) -> str:
+        """Store a task's conclusion; returns its ID (T<n>)."""
+        self._notes += 1
+        note_id = f"T{self._notes}"
+        text = str(text).strip()
+        line = text if len(text) <= 2 * LINE_WIDTH else f"{text[:2 * LINE_WIDTH]}...(+{len(text) - 2 * LINE_WIDTH} chars)"
+        self._add(('note', note_id), note_id, RANK_SUMMARY, f"{source} concluded: {' '.join(line.split())}",
+                  text, source)
+        return note_id
+
+    def get(self, item_id: str):
+        """Full detail of an item, or None for an unknown ID."""
+        item_id = item_id.strip().strip('[]')
+        item = self.items.get(item_id)
+        if item is not None:
+            return f"[{item.id}] from {', '.join(item.sources)}\n{item.detail}"
+        result = self.results.get(item_id)  # A repeated call whose output was all duplicates
+        if result is not None:
+            return f"[{item_id}]\n{result.render(max_findings=len(result.findings), width=1 << 20)}"
+        return None
+
+    def digest(self, budget: int = None) -> str:
+        """
+        Ranked one-line items within a token budget. Flags are always
+        included, even past the budget; a footer counts what was left out.
+        """
+        budget = CONTEXT_BUDGET if budget is None else budget
+        ordered = sorted(self.items.values(), key=lambda item: item.rank)  # Stable: insertion order within a rank
+
+        lines, used = [], 0
+        for item in ordered:
+            line = item.render()
+            cost = estimate_tokens(line) + 1
+            if item.rank != RANK_FLAG and used + cost > budget:
+                break
+            lines.append(line)
+            used += cost
+        omitted = len(ordered) - len(lines)
+        if omitted:
+            lines.append(f"... {omitted} lower-ranked item(s) omitted; call get_evidence with an ID for full detail")
+        return "\n".join(lines)
@@ -0,0 +1,216 @@
+"""
+Shared, memory-mapped view of the file under analysis
+
+A FileContext maps the file once and hands every in-process tool the same
+pages: the raw mapping, a zero-copy head view, a seekable reader for
+parsers that want a file object, and lazily computed derived data (content
+hash, type, byte histogram, entropy, printable strings) that is calculated
+at most once per analysis. While a context is open it is registered under its path, so
+tools that are only given a path (as the LLM passes them) pick up the
+shared mapping instead of opening the file again.
+"""
+
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from functools import cached_property
+
+import numpy as np
+
+from .helpers import match_signature
+
+
+HISTOGRAM_CHUNK = 16 * 1024 * 1024
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class _MemoryReader(io.RawIOBase):
+    """Seekable binary reader over a memoryview; reads copy only what is asked for."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer) -> int:
+        chunk = self._view[self._position:self._position + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+class FileContext:
+    """
+    One read-only mapping of a file plus lazily derived data.
+
+    Use as a context manager, or call close(); views handed out by head()
+    must not outlive it.
+    """
+
+    def __init__(self, file_path: str):
+        self.path = os.path.realpath(file_path)
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self._signature = (stat.st_size, stat.st_mtime_ns)
+        self._file = open(self.path, 'rb')
+        # mmap cannot map an empty file
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.view = memoryview(self.data)
+
+    def close(self):
+        with _registry_lock:
+            if _registry.get(self.path) is self:
+                del _registry[self.path]
+        self.view.release()
+        if isinstance(self.data, mmap.mmap):
+            try:
+                self.data.close()
+            except BufferError:
+                pass  # A caller still holds a view; the mapping goes when it does
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_current(self) -> bool:
+        """False once the file on disk has been replaced or modified."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns) == self._signature
+
+    # ---------- views ----------
+
+    def head(self, length: int = 4096) -> memoryview:
+        return self.view[:length]
+
+    def open(self) -> io.BufferedReader:
+        """A fresh seekable file object over the mapping, for parsers written against files."""
+        return io.BufferedReader(_MemoryReader(self.view[:]))
+
+    # ---------- derived data ----------
+
+    @cached_property
+    def sha256(self) -> str:
+        return hashlib.sha256(self.view).hexdigest()
+
+    @cached_property
+    def file_type(self) -> str:
+        """Signature name from helpers.FILE_SIGNATURES (refined for BMP, WAV and PDF), else 'text' or 'data'."""
+        head = bytes(self.head(1024))
+        if not head:
+            return 'empty'
+        if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+            return 'WAV audio'
+        signature = match_signature(head)
+        if signature:
+            return signature
+        # Too short or loose for FILE_SIGNATURES, which also labels embedded data
+        if head[:2] == b'BM' and len(head) >= 26:
+            return 'BMP image'
+        if b'%PDF-' in head:
+            return 'PDF document'
+
+        try:
+            text = head.decode('utf-8')
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut off at the end of the sample is still text
+            text = head[:e.start].decode('utf-8') if e.start >= len(head) - 3 else ''
+        # Format characters (zero-width joiners, BOM) and whitespace are what text stego hides in
+        textual = sum(ch.isprintable() or ch.isspace() or unicodedata.category(ch) == 'Cf' for ch in text)
+        if text and textual / len(text) > 0.95:
+            return 'text'
+        return 'data'
+
+    @cached_property
+    def histogram(self) -> np.ndarray:
+        """Byte value counts, shape (256,). Counted in chunks to bound temporaries."""
+        counts = np.zeros(256, dtype=np.int64)
+        for offset in range(0, self.size, HISTOGRAM_CHUNK):
+            chunk = np.frombuffer(self.view[offset:offset + HISTOGRAM_CHUNK], dtype=np.uint8)
+            counts += np.bincount(chunk, minlength=256)
+        return counts
+
+    @cached_property
+    def entropy(self) -> float:
+        """Shannon entropy in bits per byte (0-8)."""
+        if not self.size:
+            return 0.0
+        p = self.histogram[self.histogram > 0] / self.size
+        return max(float(-(p * np.log2(p)).sum()), 0.0)
+
+    def strings(self, min_length: int = 4):
+        """(offset, bytes) for every run of printable ASCII, like strings(1), read from the mapping."""
+        if not self.size:
+            return
+        pattern = re.compile(rb'[\x20-\x7e\t]{%d,}' % min_length)
+        for match in pattern.finditer(self.data):
+            yield match.start(), match.group()
+
+
+# ==================== REGISTRY ====================
+
+def open_context(file_path: str) -> FileContext:
+    """Open a context and register it so path-based tools share it until it is closed."""
+    context = FileContext(file_path)
+    with _registry_lock:
+        _registry[context.path] = context
+    return context
+
+
+def get_context(file_path: str):
+    """The registered context for a path, or None (also None if the file changed since)."""
+    with _registry_lock:
+        context = _registry.get(os.path.realpath(file_path))
+    if context is not None and context.is_current():
+        return context
+    return None
+
+
+@contextlib.contextmanager
+def borrow(source):
+    """
+    Yield a FileContext for a path or an existing context.
+
+    A registered context is reused; otherwise a private one is opened and
+    closed on exit. Contexts passed in or borrowed are never closed here.
+    """
+    if isinstance(source, FileContext):
+        yield source
+        return
+    context = get_context(source)
+    if context is not None:
+        yield context
+        return
+    with FileContext(source) as context:
+        yield context
+
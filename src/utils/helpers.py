@@ -2,9 +2,35 @@
 Helper utilities for StegoCrew
 """
 
+import os
+import re
 import subprocess
 
 
+FLAG_PATTERN = re.compile(r'(?:CTF|FLAG|flag)\{[^{}\n]{1,200}\}')
+
+# Override with a regex for events that use their own prefix, e.g. 'picoCTF\{[^}]+\}'
+FLAG_FORMAT = (re.compile(os.environ['STEGOCREW_FLAG_FORMAT'])
+               if os.environ.get('STEGOCREW_FLAG_FORMAT') else FLAG_PATTERN)
+
+# Magic numbers worth stopping for when they show up in extracted data
+FILE_SIGNATURES = {
+    b'\x89PNG\r\n\x1a\n': 'PNG image',
+    b'\xff\xd8\xff': 'JPEG image',
+    b'GIF87a': 'GIF image',
+    b'GIF89a': 'GIF image',
+    b'PK\x03\x04': 'ZIP archive',
+    b'%PDF-': 'PDF document',
+    b'7z\xbc\xaf\x27\x1c': '7-Zip archive',
+    b'Rar!\x1a\x07': 'RAR archive',
+    b'\x1f\x8b\x08': 'gzip data',
+    b'BZh': 'bzip2 data',
+    b'\x7fELF': 'ELF executable',
+    b'RIFF': 'RIFF (WAV/AVI) data',
+    b'.snd': 'AU audio',
+}
+
+
 def check_tool_installed(tool_name: str) -> bool:
     """Check if a system tool is installed."""
     try:
@@ -33,3 +59,18 @@ def get_install_command(tool_name: str) -> str:
         'file': 'sudo apt install file'
     }
     return install_commands.get(tool_name, f'Install {tool_name} manually')
+
+
+def find_flags(text) -> list:
+    """Return every flag matching FLAG_FORMAT in a str or bytes object, in order."""
+    if isinstance(text, (bytes, bytearray, memoryview)):
+        text = bytes(text).decode('latin-1')
+    return [match.group(0) for match in FLAG_FORMAT.finditer(text)]
+
+
+def match_signature(data: bytes):
+    """Name of the file type whose magic number starts data, or None."""
+    for magic, name in FILE_SIGNATURES.items():
+        if data.startswith(magic):
+            return name
+    return None
@@ -0,0 +1,187 @@
+"""
+Local LLM response cache for StegoCrew
+
+With temperature=0, re-running a challenge sends the same prompts again.
+LLMCache plugs into LangChain's cache hook (ChatAnthropic(cache=...)) and
+answers those prompts from SQLite instead of the API. The key hashes the
+normalized messages together with LangChain's llm_string, which holds the
+model name, the sampling parameters and any bound tool schemas. Entries
+expire after a TTL, the least recently used are evicted above a size cap,
+and hits and misses are counted so every run can report its hit rate.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+
+CACHE_PATH = os.environ.get('STEGOCREW_LLM_CACHE', os.path.expanduser('~/.cache/stegocrew/llm_cache.sqlite'))
+DEFAULT_TTL = int(os.environ.get('STEGOCREW_LLM_CACHE_TTL', 7 * 24 * 3600))  # seconds
+DEFAULT_MAX_BYTES = int(os.environ.get('STEGOCREW_LLM_CACHE_BYTES', 256 * 1024 * 1024))
+
+# Serialized message fields that differ between otherwise identical runs
+VOLATILE_KEYS = {'id', 'response_metadata', 'usage_metadata'}
+
+
+# ==================== KEYS ====================
+
+def _normalize(value):
+    if isinstance(value, str):
+        lines = value.replace('\r\n', '\n').split('\n')
+        return '\n'.join(line.rstrip() for line in lines).strip()
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()
+                # 'id' is also the class path of a serialized object; only string ids are per-run
+                if not (key in VOLATILE_KEYS and (key != 'id' or isinstance(item, str)))}
+    return value
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Canonical form of a serialized prompt: line endings and trailing
+    whitespace unified, per-run message ids and usage metadata dropped.
+    """
+    try:
+        data = json.loads(prompt)
+    except ValueError:
+        return _normalize(prompt)  # Plain string prompt
+    return json.dumps(_normalize(data), sort_keys=True, separators=(',', ':'))
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    digest = hashlib.sha256(normalize_prompt(prompt).encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update(llm_string.encode('utf-8'))
+    return digest.hexdigest()
+
+
+# ==================== STORE ====================
+
+class ResponseCache:
+    """SQLite key/value store with TTL expiry, LRU size eviction and hit counting."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Agents may run on worker threads; every statement is serialized by the lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+
+    def get(self, key: str):
+        """Stored value, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode('utf-8')), now, now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def _evict(self, now: float):
+        self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest access first, until the total fits
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'entries': entries, 'bytes': size}
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (f"{stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                f"{stats['entries']} entries, {stats['bytes'] / 1024 / 1024:.1f} MB")
+
+
+# ==================== LANGCHAIN ADAPTER ====================
+
+class LLMCache(BaseCache):
+    """LangChain cache backed by ResponseCache; pass as ChatAnthropic(cache=...)."""
+
+    def __init__(self, store: ResponseCache = None):
+        self.store = store or ResponseCache()
+
+    def lookup(self, prompt: str, llm_string: str):
+        value = self.store.get(cache_key(prompt, llm_string))
+        if value is None:
+            return None
+        try:
+            return [loads(generation) for generation in json.loads(value)]
+        except Exception:
+            return None  # Written by an incompatible LangChain version; treated as a miss
+
+    def update(self, prompt: str, llm_string: str, return_val):
+        self.store.put(cache_key(prompt, llm_string), json.dumps([dumps(generation) for generation in return_val]))
+
+    def clear(self, **kwargs):
+        self.store.clear()
+
+
+_cache = None
+
+
+def get_llm_cache():
+    """The process-wide cache, opened on first use; None when STEGOCREW_LLM_CACHE is set empty."""
+    global _cache
+    if _cache is None and CACHE_PATH:
+        _cache = LLMCache(ResponseCache(CACHE_PATH))
+    return _cache
@@ -0,0 +1,141 @@
+"""
+Tiered model routing for StegoCrew
+
+Most agent calls are routine: choose the next tool, read its result, pass
+the findings on. Those go to a small, fast model. The large model handles
+the orchestrator's synthesis and escalation. When a task on the fast
+model stalls, it is run once more on the large model. A task stalls when
+it returns no answer, hits CrewAI's iteration limit, or none of its tools
+ran successfully. Every API call records the tier that served it
+(UsageLedger.calls), and tier_report() estimates how much time the fast
+tier saved.
+"""
+
+import os
+from collections import OrderedDict
+
+from .tool_result import ERROR
+
+
+FAST = 'fast'
+STRONG = 'strong'
+
+TIER_MODELS = {
+    FAST: os.environ.get('STEGOCREW_FAST_MODEL', 'claude-3-5-haiku-20241022'),
+    STRONG: os.environ.get('STEGOCREW_STRONG_MODEL', 'claude-3-5-sonnet-20241022'),
+}
+
+# Default tier per agent; the orchestrator synthesizes the final report
+AGENT_TIERS = {'recon': FAST, 'stego': FAST, 'pattern': FAST, 'decoder': FAST, 'orchestrator': STRONG}
+
+# Used when the run has no calls on one of the tiers to compare against
+DEFAULT_SPEEDUP = 2.0  # Strong-tier seconds per fast-tier second
+
+# CrewAI's final answer when an agent runs out of iterations or time
+GAVE_UP = "Agent stopped due to iteration limit or time limit"
+
+
+def parse_agent_tiers(spec: str) -> dict:
+    """
+    AGENT_TIERS with overrides from a spec such as 'decoder=strong,recon=fast'
+    (the STEGOCREW_AGENT_TIERS format).
+
+    Raises:
+        ValueError: An entry is not agent=tier or names an unknown tier
+    """
+    tiers = dict(AGENT_TIERS)
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        agent, sep, tier = (part.strip() for part in entry.partition('='))
+        if not sep or not agent:
+            raise ValueError(f"Expected agent=tier, got {entry!r}")
+        if tier not in TIER_MODELS:
+            raise ValueError(f"Unknown tier {tier!r} for {agent}; expected one of {', '.join(TIER_MODELS)}")
+        tiers[agent] = tier
+    return tiers
+
+
+def stalled(output, results: list, uses_tools: bool = True):
+    """Why a task made no progress, or None if it did. results are the ToolResults of its calls."""
+    text = str(output or '').strip()
+    if not text:
+        return "no answer"
+    if GAVE_UP in text:
+        return "iteration limit"
+    if uses_tools and not any(result.status != ERROR for result in results):
+        return "no tool ran successfully" if results else "no tools called"
+    return None
+
+
+class ModelRouter:
+    """One chat model per tier, built on first use; agents are switched between them."""
+
+    def __init__(self, factory, models: dict = None, agent_tiers: dict = None):
+        self.factory = factory  # factory(model=..., tier=...) -> chat model
+        self.models = dict(models or TIER_MODELS)
+        self.agent_tiers = dict(agent_tiers or AGENT_TIERS)
+        self.escalations = []  # (agent role, reason)
+        self._llms = {}
+
+    def llm(self, tier: str):
+        if tier not in self._llms:
+            self._llms[tier] = self.factory(model=self.models[tier], tier=tier)
+        return self._llms[tier]
+
+    def for_agent(self, key: str):
+        """Model for an agent key from AGENT_TIERS; unlisted agents get the strong tier."""
+        return self.llm(self.agent_tiers.get(key, STRONG))
+
+    def tier_of(self, agent):
+        return next((tier for tier, llm in self._llms.items() if llm is agent.llm), None)
+
+    def escalate(self, agent, reason: str) -> bool:
+        """Move agent to the strong tier; False if it is already there (or not routed here)."""
+        if self.tier_of(agent) in (None, STRONG):
+            return False
+        agent.llm = self.llm(STRONG)
+        self.escalations.append((agent.role, reason))
+        return True
+
+    def reset(self):
+        self.escalations.clear()
+
+    def tier_report(self, calls: list) -> str:
+        """
+        Calls, time and output per task and tier (from UsageLedger.calls),
+        then escalations and the estimated time saved on the fast tier.
+        """
+        groups = OrderedDict()
+        for call in calls:
+            group = groups.setdefault((call.label, call.tier or '?'), [0, 0.0, 0])
+            group[0] += 1
+            group[1] += call.seconds
+            group[2] += call.output_tokens
+
+        speedup, measured = _speedup(calls)
+        lines, saved = [], 0.0
+        for (label, tier), (count, seconds, tokens) in groups.items():
+            line = f"{label[:40]:40} {tier:6} {count:3} calls  {seconds:7.1f}s  output {tokens:6}"
+            if tier == FAST:
+                task_saved = seconds * (speedup - 1)
+                saved += task_saved
+                line += f"  saved ~{task_saved:.1f}s"
+            lines.append(line)
+        for role, reason in self.escalations:
+            lines.append(f"escalated {role} to {self.models[STRONG]}: {reason}")
+        basis = "measured this run" if measured else "assumed"
+        lines.append(f"~{saved:.1f}s saved on {self.models[FAST]} "
+                     f"({self.models[STRONG]} ~{speedup:.1f}x slower per output token, {basis})")
+        return "\n".join(lines)
+
+
+def _speedup(calls: list):
+    """(strong/fast seconds per output token, True) from this run's calls, or (DEFAULT_SPEEDUP, False)."""
+    rates = {}
+    for tier in (FAST, STRONG):
+        seconds = sum(call.seconds for call in calls if call.tier == tier)
+        tokens = sum(call.output_tokens for call in calls if call.tier == tier)
+        if seconds and tokens:
+            rates[tier] = seconds / tokens
+    if len(rates) == 2:
+        return rates[STRONG] / rates[FAST], True
+    return DEFAULT_SPEEDUP, False
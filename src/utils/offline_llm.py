@@ -0,0 +1,218 @@
+"""
+Offline, deterministic chat model for StegoCrew
+
+ScriptedChatModel is a LangChain chat model that makes no API calls. Each
+reply comes from a policy: a function from the prompt text to the reply
+text. It plugs in wherever ChatAnthropic does, so the crew runs end to end
+on air-gapped machines and in CI. Its replies are deterministic, and
+benchmarks see tool and CrewAI cost without model latency.
+
+Two policies are included. tool_sweep() reads the ReAct prompt that CrewAI
+builds. It calls every tool it can fill in, once each, with the task's
+file, then gives a final answer with the flags found in the observations.
+ReplayPolicy answers from a recorded transcript, matched on the prompt
+text.
+
+STEGOCREW_OFFLINE_LLM selects the backend: 'scripted' or 'replay:<path>'.
+When it is empty (the default), the crew uses the Anthropic API.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from .evidence import estimate_tokens
+from .helpers import find_flags
+from .llm_cache import normalize_prompt
+from .prompt_cache import usage_ledger
+
+
+OFFLINE_LLM = os.environ.get('STEGOCREW_OFFLINE_LLM', '')
+
+# Replayed replies (and tool outputs, see session_trace) wait for their recorded duration
+REPLAY_PACE = os.environ.get('STEGOCREW_REPLAY_PACE', '') == '1'
+
+# Where CrewAI's task text and scratchpad start in the agent prompt
+TASK_MARKER = "Current Task:"
+
+# Arguments tool_sweep() can fill with the task's file
+PATH_ARGS = ('file_path', 'path', 'image_path', 'audio_path')
+
+# A tool that says this ends the sweep (run_control's stop notice)
+STOP_NOTICE = "Give your final answer now"
+
+OBSERVATION_WIDTH = 200  # Per tool, in the scripted final answer
+
+
+def prompt_text(messages: list) -> str:
+    """All message contents as one string, text blocks joined."""
+    parts = []
+    for message in messages:
+        content = message.content
+        if not isinstance(content, str):
+            content = "".join(block.get('text', '') if isinstance(block, dict) else str(block) for block in content)
+        parts.append(f"{getattr(message, 'type', 'message')}: {content}")
+    return "\n\n".join(parts)
+
+
+def prompt_key(text: str) -> str:
+    """Transcript key of a prompt; insensitive to line endings and trailing whitespace."""
+    return hashlib.sha256(normalize_prompt(text).encode('utf-8')).hexdigest()
+
+
+# ==================== POLICIES ====================
+
+def _tool_names(text: str) -> list:
+    # CrewAI: "Action: the action to take, only one name of [a, b, c], just the name..."
+    match = re.search(r"only one name of \[([^\]]*)\]", text)
+    return [name.strip() for name in match.group(1).split(',') if name.strip()] if match else []
+
+
+def _tool_args(text: str, name: str):
+    """(required, optional) argument names from the tool's signature in the prompt."""
+    match = re.search(rf"\b{re.escape(name)}\(([^)]*)\)", text)
+    required, optional = [], []
+    for param in (match.group(1).split(',') if match else []):
+        arg = param.split(':')[0].split('=')[0].strip()
+        if arg and arg not in ('self', '*args', '**kwargs'):
+            (optional if '=' in param else required).append(arg)
+    return required, optional
+
+
+def _task_file(task: str):
+    for token in re.findall(r"[\w./~-]+\.\w+", task):
+        if os.path.isfile(os.path.expanduser(token)):
+            return token
+    return None
+
+
+def _scratchpad(task: str) -> list:
+    """(tool, observation) for every action already taken in this task."""
+    steps = re.findall(r"Action:\s*(\S+)\s*\nAction Input:.*?\nObservation:\s*(.*?)(?=\nThought:|\nAction:|\Z)",
+                       task, re.S)
+    return [(name, observation.strip()) for name, observation in steps]
+
+
+def _final_answer(steps: list) -> str:
+    flags = []
+    for _, observation in steps:
+        for flag in find_flags(observation):
+            if flag not in flags:
+                flags.append(flag)
+    lines = [f"FLAG: {flag}" for flag in flags] or ["No flag found."]
+    for name, observation in steps:
+        first = observation.splitlines()[0] if observation else ""
+        lines.append(f"- {name}: {first[:OBSERVATION_WIDTH]}")
+    return "Thought: I now know the final answer\nFinal Answer: " + "\n".join(lines)
+
+
+def tool_sweep(text: str) -> str:
+    """
+    Call each listed tool once, in listed order, skipping tools whose
+    required arguments are not a file path; then answer with the flags
+    seen in the observations. Stops early on run_control's stop notice.
+    """
+    start = text.find(TASK_MARKER)
+    task = text[start:] if start >= 0 else text
+    steps = _scratchpad(task)
+    if any(STOP_NOTICE in observation for _, observation in steps):
+        return _final_answer(steps)
+
+    file_path = _task_file(task)
+    done = {name for name, _ in steps}
+    for name in _tool_names(text):
+        if name in done:
+            continue
+        required, optional = _tool_args(text, name)
+        path_arg = next((arg for arg in required + optional if arg in PATH_ARGS), None)
+        if file_path is None or path_arg is None or any(arg != path_arg for arg in required):
+            continue
+        return (f"Thought: Run {name} on the file\nAction: {name}\n"
+                f"Action Input: {json.dumps({path_arg: file_path})}")
+    return _final_answer(steps)
+
+
+class ReplayPolicy:
+    """
+    Replies from a recorded transcript: JSON lines with 'key' (prompt_key)
+    and 'response', optionally 'seconds'; other lines are ignored. A
+    session_trace recording is such a transcript. Prompts not in the
+    transcript go to the fallback policy and are counted as misses. With
+    pace, each reply waits for its recorded duration.
+    """
+
+    def __init__(self, path: str, fallback=tool_sweep, pace: bool = REPLAY_PACE):
+        self.path = path
+        self.fallback = fallback
+        self.pace = pace
+        self.responses = {}  # key -> (response, seconds)
+        self.hits = 0
+        self.misses = 0
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if 'key' in entry and 'response' in entry and entry['key'] not in self.responses:  # First reply wins
+                    self.responses[entry['key']] = (entry['response'], entry.get('seconds', 0.0))
+
+    def __call__(self, text: str) -> str:
+        recorded = self.responses.get(prompt_key(text))
+        if recorded is None:
+            self.misses += 1
+            return self.fallback(text)
+        self.hits += 1
+        response, seconds = recorded
+        if self.pace:
+            time.sleep(seconds)
+        return response
+
+
+# ==================== MODEL ====================
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model whose replies come from policy(prompt text); usage is recorded like a real call."""
+
+    policy: Any = tool_sweep
+    tier: str = ''
+
+    @property
+    def _llm_type(self) -> str:
+        return 'stegocrew-scripted'
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        start = time.perf_counter()
+        text = prompt_text(messages)
+        reply = self.policy(text)
+        for marker in stop or ():
+            index = reply.find(marker)
+            if index >= 0:
+                reply = reply[:index]
+        usage = {'input_tokens': estimate_tokens(text), 'output_tokens': estimate_tokens(reply)}
+        usage_ledger.record(usage, self.tier, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))], llm_output={'usage': usage})
+
+
+def offline_model(spec: str = None, **kwargs) -> ScriptedChatModel:
+    """
+    Model for an STEGOCREW_OFFLINE_LLM spec: 'scripted' or 'replay:<path>'.
+    Extra kwargs (model, tier, ...) are accepted so it can stand in for a
+    ChatAnthropic factory; the model name is ignored.
+
+    Raises:
+        ValueError: Unknown spec
+    """
+    spec = OFFLINE_LLM if spec is None else spec
+    kwargs.pop('model', None)
+    if spec == 'scripted':
+        return ScriptedChatModel(**kwargs)
+    if spec.startswith('replay:'):
+        return ScriptedChatModel(policy=ReplayPolicy(spec[len('replay:'):]), **kwargs)
+    raise ValueError(f"Unknown offline LLM {spec!r}; expected 'scripted' or 'replay:<path>'")
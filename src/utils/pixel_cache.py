@@ -0,0 +1,225 @@
+"""
+Decoded-pixel cache shared across image analyzers
+
+Images are decoded once per run and stored in POSIX shared memory, keyed by
+the SHA-256 of the file content (FileContext.sha256, so a registered context
+hashes the file only once). Callers get read-only NumPy views; worker
+processes attach to the same segment by name instead of decoding or copying
+the pixels again (image_transforms ranks large images that way). Entries are
+evicted least-recently-used once the total size goes over the byte budget.
+"""
+
+import atexit
+import os
+import sys
+import threading
+from collections import OrderedDict, namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .file_context import borrow
+
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Picklable handle a worker process needs to attach to a cached image
+SharedPixels = namedtuple('SharedPixels', ['name', 'shape', 'dtype'])
+
+
+def decode_rgba(file_path: str) -> np.ndarray:
+    """Decode an image into a (height, width, 4) uint8 RGBA array."""
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError("Pillow not installed (pip install Pillow)")
+
+    with Image.open(file_path) as img:
+        return np.asarray(img.convert('RGBA'))
+
+
+def _readonly_view(shm, shape, dtype) -> np.ndarray:
+    # frombuffer holds a buffer export, so the segment cannot be closed under a live view
+    view = np.frombuffer(shm.buf, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+    view.setflags(write=False)
+    return view
+
+
+class PixelCache:
+    """LRU cache of decoded images held in shared memory."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, decoder=decode_rgba):
+        self.max_bytes = max_bytes
+        self.decoder = decoder
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # digest -> (SharedMemory, shape, dtype)
+        self._digests = {}              # (path, mtime_ns, size) -> digest
+        self._retired = []              # Unlinked segments still referenced by views
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(file_path: str) -> tuple:
+        stat = os.stat(file_path)
+        return os.path.realpath(file_path), stat.st_mtime_ns, stat.st_size
+
+    def digest(self, file_path: str) -> str:
+        """Content hash of a file, memoized on path, mtime and size."""
+        key = self._stat_key(file_path)
+        if key not in self._digests:
+            with borrow(file_path) as context:
+                self._digests[key] = context.sha256
+        return self._digests[key]
+
+    def get(self, file_path: str) -> np.ndarray:
+        """Return a read-only pixel array, decoding only on a cache miss."""
+        entry = self._lookup(file_path)
+        if isinstance(entry, np.ndarray):
+            return entry
+        return _readonly_view(*entry)
+
+    def peek(self, file_path: str):
+        """
+        Read-only pixel array if this file is already cached, else None.
+        Never decodes or hashes, so streaming readers can check it for free.
+        """
+        digest = self._digests.get(self._stat_key(file_path))
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+        return _readonly_view(*entry)
+
+    def share(self, file_path: str) -> SharedPixels:
+        """Make sure an image is cached and return a handle for attach()."""
+        entry = self._lookup(file_path)
+        if isinstance(entry, np.ndarray):
+            raise ValueError(f"Image larger than cache budget ({self.max_bytes} bytes): {file_path}")
+        shm, shape, dtype = entry
+        return SharedPixels(shm.name, shape, np.dtype(dtype).str)
+
+    def _lookup(self, file_path: str):
+        """Cached (SharedMemory, shape, dtype) entry, or a private array if too large."""
+        key = self.digest(file_path)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        pixels = self.decoder(file_path)
+        if pixels.nbytes > self.max_bytes:
+            pixels.setflags(write=False)
+            return pixels
+
+        shm = shared_memory.SharedMemory(create=True, size=max(1, pixels.nbytes))
+        np.ndarray(pixels.shape, dtype=pixels.dtype, buffer=shm.buf)[...] = pixels
+        entry = (shm, pixels.shape, pixels.dtype)
+
+        with self._lock:
+            if key in self._entries:
+                # Another thread decoded the same file first; keep theirs
+                self._release(shm)
+                return self._entries[key]
+            self._entries[key] = entry
+            self.total_bytes += shm.size
+            self._evict()
+
+        return entry
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (shm, _, _) = self._entries.popitem(last=False)
+            self.total_bytes -= shm.size
+            self._release(shm)
+
+    def _release(self, shm):
+        shm.unlink()
+        self._retired.append(shm)
+        still_referenced = []
+        for segment in self._retired:
+            try:
+                segment.close()
+            except BufferError:
+                still_referenced.append(segment)
+        self._retired = still_referenced
+
+    def clear(self):
+        """Drop every entry and unlink the shared memory segments."""
+        with self._lock:
+            while self._entries:
+                _, (shm, _, _) = self._entries.popitem(last=False)
+                self._release(shm)
+            self.total_bytes = 0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current memory usage."""
+        return {
+            'entries': len(self._entries),
+            'total_bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+# ==================== WORKER SIDE ====================
+
+_attached = {}
+_attach_lock = threading.Lock()
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Open an existing segment without registering it with this process's
+    resource tracker. Before Python 3.13 every open registers the name, and a
+    tracker that is not the creator's unlinks it when its process exits,
+    pulling the segment out from under the cache. Unregistering afterwards
+    is not an option: forked and spawned workers share the creator's
+    tracker, so that would drop the creator's own registration.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _attach_lock:
+        register = resource_tracker.register
+        # Only this name is skipped, so segments other threads create meanwhile stay tracked
+        resource_tracker.register = lambda resource, rtype: (
+            None if resource.lstrip('/') == name.lstrip('/') else register(resource, rtype))
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def attach(handle: SharedPixels) -> np.ndarray:
+    """Read-only view of a cached image from any process, without copying."""
+    if handle.name not in _attached:
+        _attached[handle.name] = _open_untracked(handle.name)
+    return _readonly_view(_attached[handle.name], tuple(handle.shape), np.dtype(handle.dtype))
+
+
+def detach(handle: SharedPixels):
+    """Close a worker's mapping (raises BufferError while views are still alive)."""
+    shm = _attached.pop(handle.name, None)
+    if shm is not None:
+        shm.close()
+
+
+# ==================== PER-RUN CACHE ====================
+
+_cache = None
+
+
+def get_pixel_cache() -> PixelCache:
+    """The process-wide cache, created on first use and cleared at exit."""
+    global _cache
+    if _cache is None:
+        max_bytes = int(os.environ.get('STEGOCREW_PIXEL_CACHE_BYTES', DEFAULT_MAX_BYTES))
+        _cache = PixelCache(max_bytes)
+        atexit.register(_cache.clear)
+    return _cache
@@ -0,0 +1,169 @@
+"""
+Anthropic prompt caching for StegoCrew agents
+
+Every agent call starts with the same text: role, goal, backstory, tool
+descriptions and format instructions. The per-call part follows it: the
+current task and the scratchpad. CachingChatAnthropic puts cache_control
+breakpoints at the end of that static prefix. It also marks system
+messages and the last bound tool schema. Repeat calls then read the
+prefix from Anthropic's prompt cache instead of paying for it as fresh
+input. The provider reports cache reads, cache writes and uncached input
+tokens on each response, and UsageLedger adds them up per task.
+
+Anthropic only caches prefixes above a minimum length (1024 tokens for
+Sonnet). Shorter prefixes are still marked but are billed, and counted
+here, as uncached input.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import HumanMessage, SystemMessage
+
+
+# Where CrewAI's per-call text starts; everything before it is the agent's static prefix
+DYNAMIC_MARKERS = ("\nCurrent Task:",)
+
+MAX_BREAKPOINTS = 4  # Anthropic limit per request
+EPHEMERAL = {'type': 'ephemeral'}
+
+# Needed by models from before prompt caching became generally available
+PROMPT_CACHING_HEADERS = {'anthropic-beta': 'prompt-caching-2024-07-31'}
+
+
+def _blocks(content) -> list:
+    if isinstance(content, str):
+        return [{'type': 'text', 'text': content}]
+    return [dict(block) if isinstance(block, dict) else {'type': 'text', 'text': str(block)} for block in content]
+
+
+def _split_static(text: str):
+    """(static prefix, rest) at the first dynamic marker, or None if there is none."""
+    for marker in DYNAMIC_MARKERS:
+        index = text.find(marker)
+        if index > 0:
+            return text[:index], text[index:]
+    return None
+
+
+def add_cache_breakpoints(messages: list) -> list:
+    """
+    Copy of messages with cache_control on the end of every system message
+    and of the static prefix of the first human message, up to the limit.
+    """
+    marked, breakpoints, prefix_done = [], 0, False
+    for message in messages:
+        if breakpoints >= MAX_BREAKPOINTS:
+            marked.append(message)
+        elif isinstance(message, SystemMessage) and message.content:
+            blocks = _blocks(message.content)
+            blocks[-1]['cache_control'] = EPHEMERAL
+            marked.append(SystemMessage(content=blocks))
+            breakpoints += 1
+        elif isinstance(message, HumanMessage) and not prefix_done and isinstance(message.content, str):
+            prefix_done = True
+            split = _split_static(message.content)
+            if split is None:
+                marked.append(message)
+                continue
+            static, rest = split
+            marked.append(HumanMessage(content=[
+                {'type': 'text', 'text': static, 'cache_control': EPHEMERAL},
+                {'type': 'text', 'text': rest},
+            ]))
+            breakpoints += 1
+        else:
+            marked.append(message)
+    return marked
+
+
+def _mark_tools(tools: list) -> list:
+    """Tool schemas are sent before the messages; a breakpoint on the last one caches them all."""
+    tools = [dict(tool) for tool in tools]
+    tools[-1]['cache_control'] = EPHEMERAL
+    return tools
+
+
+# ==================== USAGE ====================
+
+# One API call: the task it served, the model tier, wall time and output size
+CallRecord = namedtuple('CallRecord', ['label', 'tier', 'seconds', 'output_tokens'])
+
+
+class UsageLedger:
+    """Input tokens per task, split into cache reads, cache writes and uncached input."""
+
+    FIELDS = ('calls', 'uncached', 'cache_write', 'cache_read', 'output')
+
+    def __init__(self):
+        self.label = 'other'
+        self.totals = OrderedDict()  # label -> {field: count}
+        self.calls = []  # CallRecord per API call, in order
+        self._lock = threading.Lock()
+
+    def begin(self, label: str):
+        """Attribute the following calls to label (e.g. the task's agent role)."""
+        self.label = label
+
+    def record(self, usage: dict, tier: str = '', seconds: float = 0.0):
+        with self._lock:
+            self.calls.append(CallRecord(self.label, tier, seconds, usage.get('output_tokens') or 0))
+            counts = self.totals.setdefault(self.label, dict.fromkeys(self.FIELDS, 0))
+            counts['calls'] += 1
+            counts['uncached'] += usage.get('input_tokens') or 0
+            counts['cache_write'] += usage.get('cache_creation_input_tokens') or 0
+            counts['cache_read'] += usage.get('cache_read_input_tokens') or 0
+            counts['output'] += usage.get('output_tokens') or 0
+
+    def reset(self):
+        with self._lock:
+            self.totals.clear()
+            self.calls.clear()
+            self.label = 'other'
+
+    def report(self) -> str:
+        lines = []
+        for label, counts in list(self.totals.items()) + [('TOTAL', self._sum())]:
+            prompt = counts['uncached'] + counts['cache_write'] + counts['cache_read']
+            cached = counts['cache_read'] / prompt if prompt else 0.0
+            lines.append(
+                f"{label[:40]:40} {counts['calls']:3} calls  input {prompt:7}  "
+                f"cached {counts['cache_read']:7} ({cached:4.0%})  written {counts['cache_write']:6}  "
+                f"uncached {counts['uncached']:6}  output {counts['output']:6}"
+            )
+        return "\n".join(lines)
+
+    def _sum(self) -> dict:
+        return {field: sum(counts[field] for counts in self.totals.values()) for field in self.FIELDS}
+
+
+usage_ledger = UsageLedger()
+
+
+def _usage_of(result) -> dict:
+    usage = (result.llm_output or {}).get('usage')
+    if usage is not None:
+        return usage if isinstance(usage, dict) else dict(usage)
+    return {}
+
+
+# ==================== MODEL ====================
+
+class CachingChatAnthropic(ChatAnthropic):
+    """ChatAnthropic that marks the static prompt prefix for caching and records token usage."""
+
+    tier: str = ''  # Routing tier this instance serves (see model_router), recorded with each call
+
+    def __init__(self, **kwargs):
+        kwargs['default_headers'] = {**PROMPT_CACHING_HEADERS, **(kwargs.get('default_headers') or {})}
+        super().__init__(**kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if kwargs.get('tools'):
+            kwargs['tools'] = _mark_tools(kwargs['tools'])
+        start = time.perf_counter()
+        result = super()._generate(add_cache_breakpoints(messages), stop=stop, run_manager=run_manager, **kwargs)
+        usage_ledger.record(_usage_of(result), self.tier, time.perf_counter() - start)
+        return result
@@ -0,0 +1,201 @@
+"""
+Run-level cancellation for StegoCrew
+
+One RunControl is active per analysis. Tool output is reported to it, and
+the first output containing a verified flag (one matching the configured
+flag format) cancels the run: external programs started through
+run_command() are killed, long loops that call check() stop, tools invoked
+afterwards return at once, and the remaining tasks are skipped. On easy
+challenges the answer is ready after a single task.
+"""
+
+import functools
+import subprocess
+import threading
+import time
+
+from .evidence import EvidenceStore
+from .helpers import FLAG_FORMAT
+from .tool_result import ToolResult
+
+
+# Flag bodies that appear in hints and templates rather than in challenges
+PLACEHOLDERS = {'example', 'flag_here', 'your_flag_here', 'xxx', 'xxxx', 'redacted'}
+
+
+class RunCancelled(Exception):
+    """Raised by check() and run_command() once the run has been cancelled."""
+
+
+class RunControl:
+    """Cancellation signal, evidence, verified flags and tracked subprocesses of one analysis run."""
+
+    def __init__(self, flag_format=None):
+        self.flag_format = flag_format or FLAG_FORMAT
+        self.flags = []  # (flag, source) in the order found
+        self.results = []  # ToolResult of every guarded tool call, in call order
+        self.evidence = EvidenceStore()
+        self.reason = None
+        self.started = time.monotonic()
+        self.cancelled_at = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def time_to_answer(self):
+        """Seconds from the start of the run to cancellation, or None."""
+        return None if self.cancelled_at is None else self.cancelled_at - self.started
+
+    def verify(self, text) -> list:
+        """Distinct flags in text that match the flag format and are not placeholders."""
+        if isinstance(text, (bytes, bytearray, memoryview)):
+            text = bytes(text).decode('latin-1')
+        flags = []
+        for match in self.flag_format.finditer(str(text)):
+            flag = match.group(0)
+            body = flag[flag.find('{') + 1:].rstrip('}')
+            if any(ch.isalnum() for ch in body) and body.lower() not in PLACEHOLDERS and flag not in flags:
+                flags.append(flag)
+        return flags
+
+    def report(self, text, source: str) -> list:
+        """Record verified flags found in a tool's output; the first one cancels the run."""
+        flags = self.verify(text)
+        if flags:
+            with self._lock:
+                known = {flag for flag, _ in self.flags}
+                self.flags.extend((flag, source) for flag in flags if flag not in known)
+            self.cancel(f"verified flag found by {source}")
+        return flags
+
+    def record(self, result: ToolResult) -> list:
+        """
+        Keep a tool's structured result as evidence and report its flags.
+
+        Finding messages and full (unclipped) values are searched too, so a
+        tool that only knows the default flag prefixes still surfaces a flag
+        in the configured format.
+        """
+        with self._lock:
+            self.results.append(result)
+            self.evidence.add_result(result)
+        texts = result.flag_values + [result.summary]
+        for finding in result.findings:
+            texts.append(finding.message)
+            if isinstance(finding.value, (bytes, bytearray)):
+                texts.append(bytes(finding.value).decode('latin-1'))
+            elif finding.value is not None:
+                texts.append(str(finding.value))
+        return self.report("\n".join(texts), result.tool)
+
+    def cancel(self, reason: str = "cancelled"):
+        """Set the signal and kill every tracked subprocess. Only the first call has an effect."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self.cancelled_at = time.monotonic()
+            self._event.set()
+            processes = list(self._processes)
+        for process in processes:
+            _kill(process)
+
+    def check(self):
+        """Raise RunCancelled if the run has been cancelled; for long-running loops."""
+        if self._event.is_set():
+            raise RunCancelled(self.reason)
+
+    def run_command(self, cmd, timeout: float = None, text: bool = False, **kwargs) -> subprocess.CompletedProcess:
+        """
+        subprocess.run(cmd, capture_output=True) that is killed when the run is cancelled.
+
+        Raises:
+            RunCancelled: The run was cancelled before or while the command ran
+            subprocess.TimeoutExpired: The command outlived timeout (it is killed first)
+        """
+        self.check()
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text, **kwargs)
+        with self._lock:
+            self._processes.add(process)
+            cancelled = self._event.is_set()
+        if cancelled:
+            _kill(process)  # Cancelled between check() and registration
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            process.communicate()
+            raise
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+        if self._event.is_set() and process.returncode < 0:
+            raise RunCancelled(self.reason)
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def _kill(process):
+    try:
+        process.kill()
+    except OSError:
+        pass  # Already exited
+
+
+# ==================== CURRENT RUN ====================
+
+_current = RunControl()
+
+
+def start_run(flag_format=None) -> RunControl:
+    """Begin a new analysis run; earlier cancellation no longer applies."""
+    global _current
+    _current = RunControl(flag_format)
+    return _current
+
+
+def current_run() -> RunControl:
+    return _current
+
+
+def run_command(cmd, timeout: float = None, text: bool = False, **kwargs) -> subprocess.CompletedProcess:
+    """run_command() on the current run."""
+    return _current.run_command(cmd, timeout=timeout, text=text, **kwargs)
+
+
+def guard_tool(tool):
+    """
+    Route a crewai_tools tool through the current run.
+
+    Once the run is cancelled the tool returns a one-line notice instead of
+    working. Otherwise a ToolResult is recorded on the run and rendered for
+    the LLM (plain string output is scanned as is), and the first verified
+    flag cancels the run and tells the agent to finish.
+    """
+    func = tool.func
+    name = tool.name
+
+    @functools.wraps(func)
+    def guarded(*args, **kwargs):
+        run = current_run()
+        if run.cancelled:
+            return f"⏹️ Skipped {name}: {run.reason}. Give your final answer now."
+        try:
+            result = func(*args, **kwargs)
+        except RunCancelled:
+            return f"⏹️ {name} stopped: {run.reason}. Give your final answer now."
+        if isinstance(result, ToolResult):
+            flags = run.record(result)
+            result = result.render()
+        else:
+            flags = run.report(result, name)
+        if flags:
+            result = f"{result}\n\n⏹️ Verified flag: {', '.join(flags)}. The run is stopping; give your final answer now."
+        return result
+
+    tool.func = guarded
+    return tool
@@ -0,0 +1,296 @@
+"""
+Record and replay of StegoCrew sessions
+
+A trace is a JSON-lines file covering one run. It holds every model call
+(prompt, reply, model, task, start time and duration) and every tool call
+(arguments, output, start time and duration). Prompts are stored
+compactly: a prompt that extends the same task's previous prompt (the
+ReAct scratchpad growing) keeps only the new text and the seq of the
+prompt it extends.
+
+A recording can be replayed in either direction:
+- STEGOCREW_OFFLINE_LLM=replay:<trace> runs real tools with the recorded
+  model replies (see offline_llm.ReplayPolicy).
+- STEGOCREW_REPLAY_TOOLS=<trace> runs a live model with the recorded tool
+  outputs.
+With STEGOCREW_REPLAY_PACE=1, replayed steps take as long as they did
+when recorded. trace_report() splits a run's wall time into model, tools
+and framework overhead, and compares it against a baseline trace:
+
+    python -m src.utils.session_trace new.jsonl [baseline.jsonl]
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from .offline_llm import REPLAY_PACE, prompt_key, prompt_text
+from .prompt_cache import usage_ledger
+from .tool_result import ToolResult
+
+
+TRACE_PATH = os.environ.get('STEGOCREW_TRACE', '')  # Record each run here
+REPLAY_TOOLS = os.environ.get('STEGOCREW_REPLAY_TOOLS', '')  # Tool outputs from this trace
+
+
+def _json(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _call_key(name: str, args: tuple, kwargs: dict) -> str:
+    return _json([name, list(args), dict(sorted(kwargs.items()))])
+
+
+# ==================== RECORDING ====================
+
+class TraceRecorder:
+    """Writes one run's events to a JSON-lines file as they happen."""
+
+    def __init__(self, path: str, **header):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._seq = 0
+        self._prompts = {}  # task label -> (seq, prompt) of its latest model call
+        self.write('run', 0.0, started=time.time(), **header)
+
+    def now(self) -> float:
+        """Seconds since the recording started; the 't' of every event."""
+        return time.perf_counter() - self._start
+
+    def write(self, kind: str, t: float, **fields) -> int:
+        with self._lock:
+            self._seq += 1
+            self._file.write(_json({'seq': self._seq, 'type': kind, 't': round(t, 6), **fields}) + "\n")
+            return self._seq
+
+    def llm(self, label: str, model: str, prompt: str, response: str, t: float, seconds: float):
+        with self._lock:
+            previous = self._prompts.get(label)
+        if previous is not None and prompt.startswith(previous[1]):
+            stored = {'base': previous[0], 'prompt': prompt[len(previous[1]):]}
+        else:
+            stored = {'prompt': prompt}
+        seq = self.write('llm', t, seconds=round(seconds, 6), label=label, model=model,
+                         key=prompt_key(prompt), response=response, **stored)
+        with self._lock:
+            self._prompts[label] = (seq, prompt)
+
+    def tool(self, name: str, args: tuple, kwargs: dict, output, t: float, seconds: float, replayed: bool = False):
+        stored = {'result': output.to_dict()} if isinstance(output, ToolResult) else {'output': str(output)}
+        self.write('tool', t, seconds=round(seconds, 6), tool=name, args=list(args), kwargs=kwargs,
+                   replayed=replayed, **stored)
+
+    def close(self, **fields):
+        self.write('end', self.now(), **fields)
+        with self._lock:
+            self._file.close()
+
+
+class TraceCallback(BaseCallbackHandler):
+    """LangChain callback that records every chat model call to the active trace."""
+
+    def __init__(self):
+        self._pending = {}  # run_id -> (t, prompt, label, model)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return
+        params = kwargs.get('invocation_params') or {}
+        model = params.get('model') or params.get('model_name') or params.get('_type', '')
+        self._pending[run_id] = (recorder.now(), prompt_text(messages[0]), usage_ledger.label, model)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        pending = self._pending.pop(run_id, None)
+        recorder = _recorder
+        if pending is None or recorder is None:
+            return
+        t, prompt, label, model = pending
+        generation = response.generations[0][0]
+        reply = generation.text or str(getattr(getattr(generation, 'message', None), 'content', ''))
+        recorder.llm(label, model, prompt, reply, t, recorder.now() - t)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        pending = self._pending.pop(run_id, None)
+        recorder = _recorder
+        if pending is not None and recorder is not None:
+            t, _, label, model = pending
+            recorder.write('llm_error', t, seconds=round(recorder.now() - t, 6), label=label, model=model,
+                           error=f"{type(error).__name__}: {error}")
+
+
+# Pass as callbacks=[tracer] to every chat model; it only writes while a trace is active
+tracer = TraceCallback()
+
+
+# ==================== TOOL REPLAY ====================
+
+class ToolReplay:
+    """Recorded tool outputs by tool and arguments, handed out in recorded order."""
+
+    def __init__(self, path: str, pace: bool = REPLAY_PACE):
+        self.path = path
+        self.pace = pace
+        self.outputs = {}  # call key -> deque of (output, seconds)
+        self.hits = 0
+        self.misses = 0
+        for event in read_trace(path):
+            if event['type'] != 'tool' or event.get('replayed'):
+                continue
+            output = ToolResult.from_dict(event['result']) if 'result' in event else event['output']
+            key = _call_key(event['tool'], tuple(event['args']), event['kwargs'])
+            self.outputs.setdefault(key, deque()).append((output, event['seconds']))
+
+    def take(self, name: str, args: tuple, kwargs: dict):
+        """(output, seconds) of the next recorded identical call, or None."""
+        queue = self.outputs.get(_call_key(name, args, kwargs))
+        if not queue:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return queue.popleft()
+
+
+def trace_tool(tool):
+    """
+    Record a crewai_tools tool's calls on the active trace, and answer from
+    the tool replay when one is loaded. Apply inside guard_tool so replayed
+    results still reach the run's evidence and flag checks. Calls missing
+    from the replay run the real tool.
+    """
+    func = tool.func
+    name = tool.name
+
+    @functools.wraps(func)
+    def traced(*args, **kwargs):
+        recorder, replay = _recorder, _tool_replay
+        t = recorder.now() if recorder is not None else 0.0
+        start = time.perf_counter()
+        recorded = replay.take(name, args, kwargs) if replay is not None else None
+        if recorded is not None:
+            output, seconds = recorded
+            if replay.pace:
+                time.sleep(seconds)
+        else:
+            output = func(*args, **kwargs)
+        if recorder is not None:
+            recorder.tool(name, args, kwargs, output, t, time.perf_counter() - start, recorded is not None)
+        return output
+
+    tool.func = traced
+    return tool
+
+
+# ==================== CURRENT TRACE ====================
+
+_recorder = None
+_tool_replay = ToolReplay(REPLAY_TOOLS) if REPLAY_TOOLS else None
+
+
+def start_trace(path: str = None, **header):
+    """Start recording to path (default STEGOCREW_TRACE); returns the recorder, or None if unset."""
+    global _recorder
+    path = TRACE_PATH if path is None else path
+    stop_trace()
+    _recorder = TraceRecorder(path, **header) if path else None
+    return _recorder
+
+
+def stop_trace(**fields):
+    """Close the active recording, if any, with an 'end' event holding fields."""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.close(**fields)
+    return recorder
+
+
+def current_trace():
+    return _recorder
+
+
+def tool_replay():
+    return _tool_replay
+
+
+# ==================== ANALYSIS ====================
+
+def read_trace(path: str) -> list:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def full_prompt(events: list, seq: int) -> str:
+    """The complete prompt of an llm event, following its 'base' chain."""
+    by_seq = {event['seq']: event for event in events}
+    parts = []
+    while seq is not None:
+        event = by_seq[seq]
+        parts.append(event['prompt'])
+        seq = event.get('base')
+    return "".join(reversed(parts))
+
+
+def summarize(events: list) -> dict:
+    """Wall time split into model, tool and framework seconds, with per-task and per-tool totals."""
+    end = next((event for event in reversed(events) if event['type'] == 'end'), None)
+    wall = end['t'] if end else max((event['t'] + event.get('seconds', 0.0) for event in events), default=0.0)
+    models, tools = OrderedDict(), OrderedDict()
+    for event in events:
+        if event['type'] in ('llm', 'llm_error'):
+            totals = models.setdefault(event['label'], [0, 0.0])
+        elif event['type'] == 'tool':
+            totals = tools.setdefault(event['tool'], [0, 0.0])
+        else:
+            continue
+        totals[0] += 1
+        totals[1] += event['seconds']
+    model = sum(seconds for _, seconds in models.values())
+    tool = sum(seconds for _, seconds in tools.values())
+    return {'wall': wall, 'model': model, 'tools': tool, 'framework': wall - model - tool,
+            'by_task': models, 'by_tool': tools}
+
+
+def trace_report(path: str, baseline: str = None) -> str:
+    """Where the run's time went, per task and per tool; with a baseline, each line shows the change."""
+    summary = summarize(read_trace(path))
+    base = summarize(read_trace(baseline)) if baseline else None
+
+    def seconds(value, was=None):
+        text = f"{value:8.2f}s"
+        if was is not None:
+            text += f"  (was {was:7.2f}s, {value - was:+7.2f}s)"
+        return text
+
+    def was(section, key=None):
+        if base is None:
+            return None
+        if key is None:
+            return base[section]
+        return base[section].get(key, (0, 0.0))[1]
+
+    lines = [f"{part:40}      {seconds(summary[part], was(part))}"
+             for part in ('wall', 'model', 'tools', 'framework')]
+    for section, title in (('by_task', 'model by task'), ('by_tool', 'tools')):
+        lines.append(f"{title}:")
+        keys = list(summary[section]) + [key for key in (base or {}).get(section, ()) if key not in summary[section]]
+        for key in keys:
+            count, total = summary[section].get(key, (0, 0.0))
+            lines.append(f"  {key[:38]:38} {count:3}x {seconds(total, was(section, key))}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python -m src.utils.session_trace <trace.jsonl> [baseline.jsonl]")
+        sys.exit(2)
+    print(trace_report(*sys.argv[1:]))
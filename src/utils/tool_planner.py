@@ -0,0 +1,173 @@
+"""
+Type-aware tool routing for StegoCrew
+
+Each tool is described once by the agent that owns it, the file kinds it
+can do anything useful with, the external binary it needs (if any) and a
+relative cost. plan_tools() turns a file kind and size into an ordered
+per-agent plan, cheapest first, and records why every other tool was left
+out, so agents are never handed tools that are guaranteed to fail (steghide
+on a PNG, PNG chunk analysis on a PDF, binwalk on plain text).
+"""
+
+import functools
+from collections import namedtuple
+
+from .file_context import borrow
+from .helpers import check_tool_installed
+
+
+IMAGE_KINDS = frozenset({'jpeg', 'png', 'gif', 'bmp'})
+AUDIO_KINDS = frozenset({'wav', 'au'})
+BINARY_KINDS = frozenset(IMAGE_KINDS | AUDIO_KINDS | {'pdf', 'archive', 'elf', 'data'})
+ALL_KINDS = None  # Any kind, including text and empty files
+
+ToolSpec = namedtuple('ToolSpec', ['agent', 'kinds', 'binary', 'native', 'cost', 'max_size', 'step'],
+                      defaults=(None, frozenset(), 1, None, ''))
+# agent: recon / stego / pattern / decoder
+# kinds: file kinds the tool applies to (None = all)
+# binary: external program the tool shells out to
+# native: kinds handled in-process, where the binary is not needed
+# cost: relative run time, used for ordering
+# max_size: skip above this many bytes
+
+TOOL_SPECS = {
+    # Reconnaissance
+    'get_file_type': ToolSpec('recon', ALL_KINDS, 'file', cost=1, step="Identify file type and size"),
+    'calculate_entropy': ToolSpec('recon', ALL_KINDS, cost=1, step="Calculate entropy to detect anomalies"),
+    'extract_metadata': ToolSpec('recon', ALL_KINDS, 'exiftool', native=frozenset({'jpeg', 'png'}), cost=2,
+                                 step="Extract all metadata"),
+    'analyze_jpeg_structure': ToolSpec('recon', frozenset({'jpeg'}), cost=1,
+                                       step="Walk JPEG markers for comments, APP payloads and data after EOI"),
+    'analyze_png_chunks': ToolSpec('recon', frozenset({'png'}), cost=1,
+                                   step="Check PNG chunks, CRCs, text chunks and data after IEND"),
+    'analyze_pdf_streams': ToolSpec('recon', frozenset({'pdf'}), cost=3,
+                                    step="Decode PDF streams and look for JavaScript and embedded files"),
+
+    # Steganography
+    'extract_with_steghide': ToolSpec('stego', frozenset({'jpeg', 'bmp', 'wav', 'au'}), 'steghide', cost=3,
+                                      step="Try steghide extraction (with empty password first)"),
+    'analyze_with_binwalk': ToolSpec('stego', BINARY_KINDS, 'binwalk', cost=5,
+                                     step="Scan with binwalk for embedded files"),
+    'scan_png_lsb': ToolSpec('stego', frozenset({'png'}), cost=4, max_size=256 << 20,
+                             step="Scan PNG LSB planes for hidden text"),
+    'analyze_jpeg_dct': ToolSpec('stego', frozenset({'jpeg'}), cost=4, max_size=64 << 20,
+                                 step="Check DCT coefficients for jsteg/F5/OutGuess embedding"),
+    'analyze_bmp': ToolSpec('stego', frozenset({'bmp'}), cost=3, step="Analyze BMP pixel LSBs"),
+    'analyze_gif_frames': ToolSpec('stego', frozenset({'gif'}), cost=3,
+                                   step="Check GIF frames, delays, comments and palette"),
+    'analyze_audio_lsb': ToolSpec('stego', AUDIO_KINDS, cost=3, step="Extract audio sample LSBs"),
+    'analyze_audio_signals': ToolSpec('stego', AUDIO_KINDS, cost=6, max_size=512 << 20,
+                                      step="Look for spectrogram images, DTMF tones and Morse code"),
+    'render_image_transforms': ToolSpec('stego', IMAGE_KINDS, cost=8, max_size=64 << 20,
+                                        step="Render bit planes and color transforms"),
+
+    # Pattern detection
+    'extract_strings': ToolSpec('pattern', ALL_KINDS, cost=2, step="Extract strings from the original file"),
+    'detect_text_stego': ToolSpec('pattern', frozenset({'text'}), cost=2,
+                                  step="Decode whitespace, zero-width and homoglyph stego"),
+    'detect_encoding_type': ToolSpec('pattern', ALL_KINDS, cost=2,
+                                     step="Identify encoding patterns (base64, hex, etc.)"),
+
+    # Decoding (these take text found by other agents, so they apply to every file)
+    'decode_base64': ToolSpec('decoder', ALL_KINDS, cost=0, step="Decode any base64 strings found"),
+    'decode_hex': ToolSpec('decoder', ALL_KINDS, cost=0, step="Decode any hex data found"),
+    'try_common_decodings': ToolSpec('decoder', ALL_KINDS, cost=0, step="Try other common encodings"),
+    'solve_classical_cipher': ToolSpec('decoder', ALL_KINDS, cost=1,
+                                       step="Crack Caesar, Vigenère and other classical ciphers"),
+    'crack_found_hashes': ToolSpec('decoder', ALL_KINDS, cost=7,
+                                   step="Crack any MD5/SHA hashes found (possible passwords)"),
+}
+
+AGENTS = ('recon', 'stego', 'pattern', 'decoder')
+
+
+# FileContext.file_type -> planner kind (anything else is 'data')
+FILE_KINDS = {
+    'JPEG image': 'jpeg',
+    'PNG image': 'png',
+    'GIF image': 'gif',
+    'BMP image': 'bmp',
+    'WAV audio': 'wav',
+    'AU audio': 'au',
+    'PDF document': 'pdf',
+    'ELF executable': 'elf',
+    'ZIP archive': 'archive',
+    '7-Zip archive': 'archive',
+    'RAR archive': 'archive',
+    'gzip data': 'archive',
+    'bzip2 data': 'archive',
+    'text': 'text',
+    'empty': 'empty',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _installed(binary: str) -> bool:
+    return check_tool_installed(binary)
+
+
+class ToolPlan:
+    """Ordered tool names per agent plus the tools left out and why."""
+
+    def __init__(self, kind: str, size: int):
+        self.kind = kind
+        self.size = size
+        self.tools = {agent: [] for agent in AGENTS}
+        self.skipped = []  # (tool, reason)
+
+    def for_agent(self, agent: str) -> list:
+        return list(self.tools.get(agent, []))
+
+    def steps(self, agent: str) -> list:
+        return [TOOL_SPECS[name].step for name in self.tools.get(agent, [])]
+
+    def summary(self) -> str:
+        lines = [f"Tool plan for {self.kind} ({self.size} bytes):"]
+        for agent in AGENTS:
+            lines.append(f"  {agent:8} {', '.join(self.tools[agent]) or '-'}")
+        for name, reason in self.skipped:
+            lines.append(f"  skip {name}: {reason}")
+        return "\n".join(lines)
+
+
+def plan_tools(kind: str, size: int, available_binaries=None, specs=None) -> ToolPlan:
+    """
+    Build the tool plan for a file kind and size.
+
+    Args:
+        kind: Planner file kind (see FILE_KINDS)
+        size: File size in bytes
+        available_binaries: Installed external programs (None = check with check_tool_installed)
+        specs: Tool table to plan from (default TOOL_SPECS)
+
+    Returns:
+        ToolPlan with each agent's tools ordered cheapest first
+    """
+    specs = TOOL_SPECS if specs is None else specs
+    plan = ToolPlan(kind, size)
+
+    def installed(binary):
+        return binary in available_binaries if available_binaries is not None else _installed(binary)
+
+    chosen = []
+    for name, spec in specs.items():
+        if spec.kinds is not None and kind not in spec.kinds:
+            plan.skipped.append((name, f"not applicable to {kind}"))
+        elif spec.max_size is not None and size > spec.max_size:
+            plan.skipped.append((name, f"file larger than {spec.max_size} bytes"))
+        elif spec.binary and kind not in spec.native and not installed(spec.binary):
+            plan.skipped.append((name, f"{spec.binary} not installed"))
+        else:
+            chosen.append((spec.cost, name, spec.agent))
+
+    # sorted() is stable, so equal-cost tools keep their table order
+    for _, name, agent in sorted(chosen, key=lambda item: item[0]):
+        plan.tools.setdefault(agent, []).append(name)
+    return plan
+
+
+def plan_for_file(source, available_binaries=None) -> ToolPlan:
+    """Detect the kind of a file (path or FileContext) and plan its tools."""
+    with borrow(source) as context:
+        kind = FILE_KINDS.get(context.file_type, 'data')
+        return plan_tools(kind, context.size, available_binaries)
@@ -0,0 +1,230 @@
+"""
+Structured tool results for StegoCrew
+
+Tools build a ToolResult instead of an emoji report: a status, a one-line
+summary, findings with file offsets, flags, artifacts written to disk and
+per-phase timings. Code can aggregate flags and evidence across tools
+without a model call, and render() turns a result into the compact text
+the LLM reads.
+
+render() is deterministic: the same result always renders to the same
+text. Timings are kept out of it by default so repeated runs produce
+identical prompts. Nothing is cut from the object itself, and whenever
+render() leaves findings out or shortens a value it says by how much.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+# Status values
+OK = 'ok'              # Ran; nothing notable
+FINDINGS = 'findings'  # Ran; notable findings, warnings or artifacts
+FLAG = 'flag'          # Ran and found at least one flag
+ERROR = 'error'        # Could not run (missing file or tool, parse failure)
+
+# Finding levels, most important first; also their render markers
+NOTABLE = '!'
+WARNING = '~'
+INFO = '-'
+LEVELS = (NOTABLE, WARNING, INFO)
+
+VALUE_WIDTH = 200
+MAX_FINDINGS = 40
+
+
+def _clip(text: str, width: int) -> str:
+    if len(text) <= width:
+        return text
+    return f"{text[:width]}...(+{len(text) - width} chars)"
+
+
+def _show(value) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        value = bytes(value)
+        return repr(value) if value.isascii() and len(value) <= VALUE_WIDTH else value.hex()
+    if isinstance(value, str):
+        return repr(value)
+    return str(value)
+
+
+class Flag:
+    __slots__ = ('value', 'offset', 'via')
+
+    def __init__(self, value: str, offset: int = None, via: str = None):
+        self.value = value
+        self.offset = offset
+        self.via = via  # e.g. 'LSB rgb bit 0', 'Flate stream 12'
+
+    def render(self) -> str:
+        where = f" @{self.offset}" if self.offset is not None else ""
+        how = f" ({self.via})" if self.via else ""
+        return f"FLAG {self.value}{where}{how}"
+
+    def to_dict(self) -> dict:
+        return {'value': self.value, 'offset': self.offset, 'via': self.via}
+
+
+class Finding:
+    __slots__ = ('kind', 'message', 'offset', 'value', 'level')
+
+    def __init__(self, kind: str, message: str = "", offset: int = None, value=None, level: str = INFO):
+        self.kind = kind
+        self.message = message
+        self.offset = offset
+        self.value = value
+        self.level = level
+
+    def render(self, width: int = VALUE_WIDTH) -> str:
+        line = f"{self.level} {self.kind}"
+        if self.offset is not None:
+            line += f" @{self.offset}"
+        if self.message:
+            line += f": {self.message}"
+        if self.value is not None:
+            line += (" " if self.message else ": ") + _clip(_show(self.value), width)
+        return line
+
+    def to_dict(self) -> dict:
+        value = self.value.hex() if isinstance(self.value, (bytes, bytearray)) else self.value
+        return {'kind': self.kind, 'message': self.message, 'offset': self.offset,
+                'value': value, 'level': self.level}
+
+
+class Artifact:
+    __slots__ = ('path', 'kind', 'description')
+
+    def __init__(self, path: str, kind: str, description: str = ""):
+        self.path = path
+        self.kind = kind  # 'image', 'frame', 'spectrogram', 'extracted', ...
+        self.description = description
+
+    def render(self) -> str:
+        return f"+ {self.kind} {self.path}" + (f" ({self.description})" if self.description else "")
+
+    def to_dict(self) -> dict:
+        return {'path': self.path, 'kind': self.kind, 'description': self.description}
+
+
+class ToolResult:
+    """Outcome of one tool call. Add to it with the add_* methods, then render() for the LLM."""
+
+    __slots__ = ('tool', 'status', 'summary', 'findings', 'flags', 'artifacts', 'timings')
+
+    def __init__(self, tool: str, summary: str = ""):
+        self.tool = tool
+        self.status = OK
+        self.summary = summary
+        self.findings = []
+        self.flags = []
+        self.artifacts = []
+        self.timings = {}  # phase -> seconds
+
+    @classmethod
+    def failed(cls, tool: str, message: str) -> 'ToolResult':
+        result = cls(tool, message)
+        result.status = ERROR
+        return result
+
+    def fail(self, message: str) -> 'ToolResult':
+        self.status = ERROR
+        self.summary = f"{self.summary}; {message}" if self.summary else message
+        return self
+
+    # ---------- building ----------
+
+    def add(self, kind: str, message: str = "", offset: int = None, value=None, level: str = INFO) -> Finding:
+        finding = Finding(kind, message, offset, value, level)
+        self.findings.append(finding)
+        if self.status == OK and level != INFO:
+            self.status = FINDINGS
+        return finding
+
+    def notable(self, kind: str, message: str = "", offset: int = None, value=None) -> Finding:
+        return self.add(kind, message, offset, value, NOTABLE)
+
+    def warn(self, kind: str, message: str = "", offset: int = None, value=None) -> Finding:
+        return self.add(kind, message, offset, value, WARNING)
+
+    def add_flag(self, value: str, offset: int = None, via: str = None):
+        if any(flag.value == value for flag in self.flags):
+            return
+        self.flags.append(Flag(value, offset, via))
+        if self.status != ERROR:
+            self.status = FLAG
+
+    def add_flags(self, values, via: str = None):
+        for value in values:
+            self.add_flag(value, via=via)
+
+    def add_artifact(self, path: str, kind: str, description: str = "") -> Artifact:
+        artifact = Artifact(path, kind, description)
+        self.artifacts.append(artifact)
+        if self.status == OK:
+            self.status = FINDINGS
+        return artifact
+
+    @contextmanager
+    def timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+
+    # ---------- reading ----------
+
+    @property
+    def flag_values(self) -> list:
+        return [flag.value for flag in self.flags]
+
+    def by_kind(self, kind: str) -> list:
+        return [finding for finding in self.findings if finding.kind == kind]
+
+    def render(self, max_findings: int = MAX_FINDINGS, width: int = VALUE_WIDTH, timings: bool = False) -> str:
+        """
+        Compact text for the LLM: header, every flag, findings most important
+        first (insertion order within a level), then artifacts.
+        """
+        header = f"[{self.tool}] {self.status}"
+        if self.summary:
+            header += f" | {self.summary}"
+        if timings and self.timings:
+            header += " | " + " ".join(f"{phase}={seconds:.3f}s" for phase, seconds in self.timings.items())
+        lines = [header]
+        lines.extend(flag.render() for flag in self.flags)
+
+        ordered = sorted(self.findings, key=lambda finding: LEVELS.index(finding.level))
+        lines.extend(finding.render(width) for finding in ordered[:max_findings])
+        omitted = ordered[max_findings:]
+        if omitted:
+            notable = sum(finding.level != INFO for finding in omitted)
+            lines.append(f"... {len(omitted)} more finding(s) not shown ({notable} notable)")
+
+        lines.extend(artifact.render() for artifact in self.artifacts)
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.render()
+
+    def to_dict(self) -> dict:
+        return {
+            'tool': self.tool,
+            'status': self.status,
+            'summary': self.summary,
+            'flags': [flag.to_dict() for flag in self.flags],
+            'findings': [finding.to_dict() for finding in self.findings],
+            'artifacts': [artifact.to_dict() for artifact in self.artifacts],
+            'timings': dict(self.timings),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'ToolResult':
+        """Inverse of to_dict(); byte values come back as their hex strings."""
+        result = cls(data['tool'], data.get('summary', ""))
+        result.status = data.get('status', OK)
+        result.flags = [Flag(**flag) for flag in data.get('flags', ())]
+        result.findings = [Finding(**finding) for finding in data.get('findings', ())]
+        result.artifacts = [Artifact(**artifact) for artifact in data.get('artifacts', ())]
+        result.timings = dict(data.get('timings', {}))
+        return result
@@ -0,0 +1,15 @@
+"""
+pytest configuration for the StegoCrew unit tests
+
+The unit tests (test_<module>.py) build small synthetic files in tmp_path
+and run the src/ engines directly; they need no API key or external tools.
+test_challenges.py and benchmark.py are scripts that drive the full crew
+and are run by hand, so pytest does not collect them.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+collect_ignore = ['test_challenges.py', 'benchmark.py']
@@ -0,0 +1,110 @@
+"""Tests for src/tools/audio_analysis.py"""
+
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from src.tools.audio_analysis import MULAW_TABLE, AudioFile, analyze_audio
+
+FLAG = b'CTF{audio_lsb}'
+
+# Sample width in bytes -> range of the values wave writes
+RANGES = {1: (0, 256), 2: (-(1 << 15), 1 << 15), 3: (-(1 << 23), 1 << 23), 4: (-(1 << 31), 1 << 31)}
+
+
+def write_wav(path, samples: np.ndarray, width: int, rate: int = 8000) -> str:
+    """PCM WAV of (frames, channels) integer samples; 8-bit samples are unsigned."""
+    frames = samples.astype('<i8').view('u1').reshape(samples.shape + (8,))[..., :width]
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(samples.shape[1])
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(frames.tobytes())
+    return str(path)
+
+
+def write_au(path, data: bytes, encoding: int, channels: int = 1, rate: int = 8000) -> str:
+    path.write_bytes(b'.snd' + struct.pack('>IIIII', 24, len(data), encoding, rate, channels) + data)
+    return str(path)
+
+
+def embed(samples: np.ndarray, message: bytes) -> np.ndarray:
+    """LSB-replace samples in frame order with message bits."""
+    bits = np.unpackbits(np.frombuffer(message, dtype=np.uint8)).astype(samples.dtype)
+    flat = samples.reshape(-1).copy()
+    flat[:len(bits)] = flat[:len(bits)] - (flat[:len(bits)] & 1) + bits
+    return flat.reshape(samples.shape)
+
+
+def random_samples(width: int, frames: int = 500, channels: int = 2) -> np.ndarray:
+    low, high = RANGES[width]
+    return np.random.default_rng(width).integers(low, high, size=(frames, channels), dtype=np.int64)
+
+
+@pytest.mark.parametrize('width', [1, 2, 3, 4])
+def test_pcm_samples(tmp_path, width):
+    samples = random_samples(width)
+    audio = AudioFile(write_wav(tmp_path / 'a.wav', samples, width))
+    assert (audio.bits, audio.channels, audio.frames, audio.encoding) == (8 * width, 2, 500, 'pcm')
+    decoded = np.concatenate(list(audio.iter_blocks(block_frames=64)))
+    assert np.array_equal(decoded, samples)
+
+
+@pytest.mark.parametrize('width', [1, 2, 3, 4])
+def test_lsb_flag_round_trip(tmp_path, width):
+    path = write_wav(tmp_path / 's.wav', embed(random_samples(width), FLAG), width)
+    result = analyze_audio(path)
+    assert result['lsb']['flag'] == FLAG.decode()
+    assert result['header']['bits'] == 8 * width
+    assert sorted(result['chi_square']) == [0, 1]
+
+
+def test_24_bit_linear_scaling(tmp_path):
+    samples = np.array([[-(1 << 23)], [0], [(1 << 22)], [(1 << 23) - 1]])
+    audio = AudioFile(write_wav(tmp_path / 'a.wav', samples, 3))
+    linear = np.concatenate(list(audio.iter_linear()))[:, 0]
+    assert linear[:3].tolist() == [-1.0, 0.0, 0.5]
+    assert 0.99 < linear[3] < 1.0
+
+
+def test_mulaw_table():
+    assert MULAW_TABLE[0xFF] == 0 and MULAW_TABLE[0x7F] == 0
+    assert MULAW_TABLE[0x00] == -32124 and MULAW_TABLE[0x80] == 32124
+    # Codes 0x80..0xFF run from the loudest positive sample down to zero
+    assert np.all(np.diff(MULAW_TABLE[0x80:].astype(np.int32)) < 0)
+    assert np.array_equal(MULAW_TABLE[:0x80], -MULAW_TABLE[0x80:])
+
+
+def test_mulaw_au(tmp_path):
+    codes = np.random.default_rng(7).integers(0, 256, size=400, dtype=np.uint8)
+    path = write_au(tmp_path / 's.au', embed(codes[:, None], FLAG).tobytes(), encoding=1)
+    audio = AudioFile(path)
+    assert (audio.format, audio.encoding, audio.bits) == ('au', 'mulaw', 8)
+    linear = np.concatenate(list(audio.iter_linear()))
+    assert np.array_equal(linear * 32768, MULAW_TABLE[embed(codes[:, None], FLAG)])
+
+    result = analyze_audio(path)
+    assert result['lsb']['flag'] == FLAG.decode()
+    assert result['header']['encoding'] == 'mulaw'
+
+
+def test_au_pcm_is_big_endian(tmp_path):
+    samples = np.array([1, -2, 300], dtype='>i2')
+    audio = AudioFile(write_au(tmp_path / 'a.au', samples.tobytes(), encoding=3))
+    assert audio.samples[:, 0].tolist() == [1, -2, 300]
+
+
+def test_truncated_data_chunk(tmp_path):
+    path = write_wav(tmp_path / 't.wav', random_samples(3, frames=10), 3)
+    with open(path, 'r+b') as f:
+        f.truncate(44 + 3 * 2 * 7 + 4)  # Seven whole frames and part of the eighth
+    assert AudioFile(path).frames == 7
+
+
+def test_unsupported_encodings(tmp_path):
+    with pytest.raises(ValueError, match='AU encoding 27'):
+        AudioFile(write_au(tmp_path / 'alaw.au', bytes(16), encoding=27))
+    with pytest.raises(ValueError, match='no sample data'):
+        AudioFile(write_wav(tmp_path / 'empty.wav', np.zeros((0, 1), dtype=np.int64), 2))
@@ -0,0 +1,120 @@
+"""Tests for src/tools/audio_signals.py"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools.audio_signals import (DTMF_COLS, DTMF_KEYS, DTMF_ROWS, MORSE_CODE, DTMFDetector,
+                                     MorseDecoder, Spectrogram, _Framer, analyze_audio_signals,
+                                     goertzel_power)
+from test_audio_analysis import write_wav
+
+RATE = 8000
+
+
+def tone(seconds: float, *frequencies) -> np.ndarray:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return sum(np.sin(2 * np.pi * f * t) for f in frequencies) / max(1, len(frequencies))
+
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(RATE * seconds))
+
+
+def dtmf(digits: str) -> np.ndarray:
+    parts = []
+    for digit in digits:
+        row = next(i for i, keys in enumerate(DTMF_KEYS) if digit in keys)
+        parts += [tone(0.1, DTMF_ROWS[row], DTMF_COLS[DTMF_KEYS[row].index(digit)]), silence(0.05)]
+    return np.concatenate(parts)
+
+
+def morse(text: str, unit: float = 0.06) -> np.ndarray:
+    letters = {letter: code for code, letter in MORSE_CODE.items()}
+    parts = [silence(unit * 3)]
+    for w, word in enumerate(text.split()):
+        if w:
+            parts.append(silence(unit * 4))  # 3 after the letter + 4 = word gap of 7
+        for letter in word:
+            for symbol in letters[letter]:
+                parts += [tone(unit * (1 if symbol == '.' else 3), 700), silence(unit)]
+            parts.append(silence(unit * 2))
+    return np.concatenate(parts)
+
+
+def to_pcm(signal: np.ndarray) -> np.ndarray:
+    return np.round(signal * 20000).astype(np.int64)[:, None]
+
+
+def test_framer_keeps_partial_frames():
+    framer = _Framer(4, 2)
+    frames = np.concatenate((framer.feed(np.arange(5, dtype=np.float32)),
+                             framer.feed(np.arange(5, 9, dtype=np.float32))))
+    assert frames.tolist() == [[0, 1, 2, 3], [2, 3, 4, 5], [4, 5, 6, 7]]
+    assert framer._carry.tolist() == [6, 7, 8]
+
+
+def test_goertzel_matches_fft():
+    frame = tone(0.025, 1000)  # 200 samples; 1000 Hz is bin 25
+    power = goertzel_power(frame[None, :], [1000], RATE)[0, 0]
+    assert power == pytest.approx(np.abs(np.fft.fft(frame)[25]) ** 2, rel=1e-6)
+
+
+def test_dtmf_digits_across_blocks():
+    detector = DTMFDetector(RATE)
+    signal = dtmf('159#*0D')
+    for start in range(0, len(signal), 777):  # Block edges fall inside frames
+        detector.feed(signal[start:start + 777].astype(np.float32))
+    assert detector.finish() == '159#*0D'
+    assert detector.keys[0] == ('1', 0.0)
+
+
+def test_dtmf_ignores_single_tones():
+    detector = DTMFDetector(RATE)
+    detector.feed(tone(0.5, 697).astype(np.float32))
+    assert detector.finish() == ''
+
+
+def test_morse_decodes_words():
+    decoder = MorseDecoder(RATE)
+    decoder.feed(morse('SOS CTF 42').astype(np.float32))
+    result = decoder.finish()
+    assert result['text'] == 'SOS CTF 42'
+    assert result['unit_seconds'] == pytest.approx(0.06, abs=0.006)
+
+
+def test_morse_envelope_is_capped_for_long_inputs():
+    signal = morse('SOS CTF 42').astype(np.float32)
+    decoder = MorseDecoder(RATE, len(signal), max_frames=400)
+    for start in range(0, len(signal), 1000):
+        decoder.feed(signal[start:start + 1000])
+    assert sum(len(chunk) for chunk in decoder._envelope) <= 400
+    result = decoder.finish()
+    assert result['text'] == 'SOS CTF 42'
+    assert result['unit_seconds'] == pytest.approx(0.06, abs=decoder.frame_seconds)
+
+
+def test_morse_without_keying():
+    decoder = MorseDecoder(RATE)
+    decoder.feed(tone(1.0, 700).astype(np.float32))
+    assert decoder.finish()['text'] == ''
+
+
+def test_spectrogram_pools_to_max_columns():
+    signal = tone(2.0, 1500).astype(np.float32)
+    spectrogram = Spectrogram(RATE, len(signal), n_fft=256, hop=128, max_columns=20)
+    for start in range(0, len(signal), 1000):
+        spectrogram.feed(signal[start:start + 1000])
+    magnitudes = spectrogram.finish()
+    assert magnitudes.shape[0] == 129 and magnitudes.shape[1] <= 20
+    assert magnitudes.mean(axis=1).argmax() == 1500 * 256 // RATE
+
+
+def test_analyze_audio_signals(tmp_path):
+    signal = np.concatenate((dtmf('42'), silence(0.2), morse('HI')))
+    path = write_wav(tmp_path / 'mixed.wav', to_pcm(signal), 2, RATE)
+    png = str(tmp_path / 'spec.png')
+    result = analyze_audio_signals(path, png, n_fft=512)
+    assert result['dtmf']['digits'] == '42'
+    assert result['morse']['text'].endswith('HI')
+    assert Image.open(png).size == (result['spectrogram']['shape'][1], 257)
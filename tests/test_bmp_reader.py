@@ -0,0 +1,90 @@
+"""Tests for src/tools/bmp_reader.py"""
+
+import struct
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools.bmp_reader import BMPImage, analyze_bmp
+
+
+def write_bmp(path, pixels: np.ndarray, top_down: bool = False) -> str:
+    """24-bit BMP of (height, width, 3) RGB pixels, top row first."""
+    height, width = pixels.shape[:2]
+    stride = ((24 * width + 31) // 32) * 4
+    rows = pixels if top_down else pixels[::-1]
+    body = b''.join(row[:, ::-1].tobytes().ljust(stride, b'\0') for row in rows)
+    dib = struct.pack('<IiiHHIIiiII', 40, width, -height if top_down else height, 1, 24, 0,
+                      len(body), 2835, 2835, 0, 0)
+    header = b'BM' + struct.pack('<IHHI', 14 + len(dib) + len(body), 0, 0, 14 + len(dib))
+    path.write_bytes(header + dib + body)
+    return str(path)
+
+
+def _embed(pixels: np.ndarray, message: bytes, fraction: float = None) -> np.ndarray:
+    """LSB-replace pixels in file order (bottom row first, BGR) with message or random bits."""
+    file_order = pixels[::-1, :, ::-1].copy()
+    flat = file_order.reshape(-1)
+    if message:
+        bits = np.unpackbits(np.frombuffer(message, dtype=np.uint8))
+    else:
+        bits = np.random.default_rng(9).integers(0, 2, int(len(flat) * fraction), dtype=np.uint8)
+    flat[:len(bits)] = (flat[:len(bits)] & 0xFE) | bits
+    return file_order[::-1, :, ::-1]
+
+
+@pytest.fixture
+def cover():
+    # Even values only: every (2k, 2k+1) pair is lopsided until LSBs are replaced
+    y, x = np.mgrid[0:64, 0:60]
+    return (100 + 2 * np.stack([x % 8, y % 8, (x + y) % 8], axis=-1)).astype(np.uint8)
+
+
+@pytest.mark.parametrize('top_down', [False, True])
+def test_pixels_match_pil(tmp_path, top_down):
+    pixels = np.random.default_rng(1).integers(0, 256, size=(7, 5, 3), dtype=np.uint8)  # Padded rows
+    path = write_bmp(tmp_path / 'a.bmp', pixels, top_down)
+    bmp = BMPImage(path)
+    assert (bmp.width, bmp.height, bmp.bits, bmp.top_down, bmp.stride) == (5, 7, 24, top_down, 16)
+    assert np.array_equal(bmp.pixels[..., ::-1], np.asarray(Image.open(path).convert('RGB')))
+    assert np.array_equal(bmp.channel('r'), pixels[..., 0])
+
+
+def test_pil_written_palette_and_32_bit(tmp_path):
+    pixels = np.random.default_rng(2).integers(0, 256, size=(6, 6, 3), dtype=np.uint8)
+    indexed = tmp_path / 'p.bmp'
+    Image.fromarray(pixels).quantize(16).save(indexed)
+    bmp = BMPImage(str(indexed))
+    assert bmp.bits == 8 and bmp.channels == 'i'
+    decoded = np.asarray(Image.open(indexed).convert('RGB'))
+    assert np.array_equal(bmp.palette[bmp.channel('i')], decoded)
+
+
+def test_flag_round_trip(tmp_path, cover):
+    path = write_bmp(tmp_path / 's.bmp', _embed(cover, b'CTF{bmp_lsb}'))
+    result = analyze_bmp(path)
+    assert result['lsb']['flag'] == 'CTF{bmp_lsb}'
+    assert result['lsb']['flag_offset'] == 0
+
+
+def test_chi_square_detects_sequential_embedding(tmp_path, cover):
+    clean = analyze_bmp(write_bmp(tmp_path / 'c.bmp', cover))['chi_square']
+    stego = analyze_bmp(write_bmp(tmp_path / 's.bmp', _embed(cover, b'', fraction=0.5)))['chi_square']
+    assert stego['b'][0][1] > 0.95
+    assert clean['b'][0][1] < 0.5
+    assert len(stego['b']) == 10
+
+
+def test_empty_image_has_empty_profile(tmp_path):
+    path = write_bmp(tmp_path / 'e.bmp', np.zeros((0, 0, 3), dtype=np.uint8))
+    result = analyze_bmp(path)
+    assert result['chi_square'] == {'b': [], 'g': [], 'r': []}
+    assert result['lsb']['bytes_scanned'] == 0
+
+
+def test_rejects_non_bmp(tmp_path):
+    path = tmp_path / 'x.bmp'
+    path.write_bytes(b'PK\x03\x04' + bytes(60))
+    with pytest.raises(ValueError):
+        BMPImage(str(path))
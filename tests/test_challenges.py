@@ -10,7 +10,12 @@ import sys
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# --offline: scripted local model instead of the Anthropic API (read when the analyzer is imported)
+if '--offline' in sys.argv:
+    os.environ.setdefault('STEGOCREW_OFFLINE_LLM', 'scripted')
+
 from examples.my_stego_analyzer import analyze_file
+from src.utils.llm_cache import get_llm_cache
 
 # Define test challenges
 CHALLENGES = [
@@ -117,6 +122,10 @@ def main():
         success_rate = (passed / (len(CHALLENGES) - skipped)) * 100
         print(f"\n🎯 Success Rate: {success_rate:.1f}%")
 
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        print(f"💾 LLM cache: {llm_cache.store.summary()}")
+
     print("="*70)
 
     # Exit code
@@ -0,0 +1,96 @@
+"""Tests for src/tools/classical_ciphers.py"""
+
+import numpy as np
+import pytest
+
+from src.tools.classical_ciphers import (
+    LetterText, build_quadgram_table, index_of_coincidence, load_quadgrams, quadgram_scores,
+    rail_fence_order, solve_classical, vigenere_key_lengths,
+)
+
+PLAINTEXT = ("It was the best of times, it was the worst of times, it was the age of wisdom, "
+             "it was the age of foolishness, it was the epoch of belief, it was the epoch of "
+             "incredulity. The flag is CTF{classical}.")
+
+
+def transform(text: str, function) -> str:
+    """Apply function(index, letter 0-25) to every letter, keeping case and punctuation."""
+    out, i = [], 0
+    for ch in text:
+        if ch.isascii() and ch.isalpha():
+            base = 65 if ch.isupper() else 97
+            out.append(chr(base + function(i, ord(ch) - base) % 26))
+            i += 1
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+
+def rail_fence(text: str, rails: int) -> str:
+    order = rail_fence_order(len(text), rails)
+    return ''.join(text[p] for p in order.tolist())
+
+
+def test_letter_text_round_trip():
+    source = LetterText("Hi, World!")
+    assert source.letters.tolist() == [7, 8, 22, 14, 17, 11, 3]
+    assert source.render(source.letters) == "Hi, World!"
+    assert source.render((source.letters + 1) % 26) == "Ij, Xpsme!"
+
+
+def test_quadgram_table_is_cached_and_ranks_english():
+    assert load_quadgrams() is load_quadgrams()
+    english = LetterText("thequickbrownfoxjumpsoverthelazydog").letters
+    noise = LetterText("xqzvjkwpqzxvbnmqwzxkjqvzpxwqkzjvqxz").letters
+    scores = quadgram_scores(np.stack([english, noise]))
+    assert scores[0] > scores[1]
+
+
+def test_index_of_coincidence():
+    assert index_of_coincidence(np.zeros(10, dtype=np.uint8)) == 1.0
+    assert index_of_coincidence(np.arange(26, dtype=np.uint8)) == 0.0
+    assert index_of_coincidence(np.zeros(1, dtype=np.uint8)) == 0.0
+
+
+@pytest.mark.parametrize('cipher, key, function', [
+    ('caesar', 3, lambda i, p: p + 3),
+    ('rot13', 13, lambda i, p: p + 13),
+    ('atbash', None, lambda i, p: 25 - p),
+    ('affine', (5, 8), lambda i, p: 5 * p + 8),
+])
+def test_monoalphabetic(cipher, key, function):
+    result = solve_classical(transform(PLAINTEXT, function))
+    best = result['candidates'][0]
+    assert (best['cipher'], best['key'], best['plaintext']) == (cipher, key, PLAINTEXT)
+    assert result['flags'] == ['CTF{classical}']
+
+
+def test_vigenere():
+    key = [ord(ch) - 65 for ch in 'LEMON']
+    ciphertext = transform(PLAINTEXT, lambda i, p: p + key[i % len(key)])
+    assert 5 in vigenere_key_lengths(LetterText(ciphertext).letters)
+
+    result = solve_classical(ciphertext)
+    best = result['candidates'][0]
+    assert (best['cipher'], best['key'], best['plaintext']) == ('vigenere', 'LEMON', PLAINTEXT)
+    assert result['flags'] == ['CTF{classical}']
+
+
+def test_rail_fence():
+    result = solve_classical(rail_fence(PLAINTEXT, 3))
+    best = result['candidates'][0]
+    assert (best['cipher'], best['key'], best['plaintext']) == ('rail_fence', 3, PLAINTEXT)
+    assert result['flags'] == ['CTF{classical}']
+
+
+def test_no_letters():
+    with pytest.raises(ValueError):
+        solve_classical("1234 !?")
+
+
+def test_build_quadgram_table(tmp_path):
+    corpus = tmp_path / 'corpus.txt'
+    corpus.write_text("abab ab, ABAB")
+    output = tmp_path / 'quads.txt'
+    build_quadgram_table([str(corpus)], str(output))
+    assert output.read_text().splitlines() == ['ABAB 4', 'BABA 3']
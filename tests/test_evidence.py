@@ -0,0 +1,54 @@
+"""Tests for src/utils/evidence.py"""
+
+from src.utils.evidence import EvidenceStore, estimate_tokens
+from src.utils.tool_result import ToolResult
+
+
+def result(tool: str, flag: str = None, findings: int = 0) -> ToolResult:
+    report = ToolResult(tool, f"{tool} summary")
+    if flag:
+        report.add_flag(flag, via='test')
+    for i in range(findings):
+        report.add('string', value=f"{tool} string number {i:03d} " + 'x' * 40)
+    report.notable('keyword', value='password')
+    return report
+
+
+def test_ids_and_deduplication():
+    store = EvidenceStore()
+    assert store.add_result(result('extract_strings', 'CTF{one}')) == 'R1'
+    assert store.add_result(result('analyze_png_chunks', 'CTF{one}')) == 'R2'
+    flag_items = [item for item in store.items.values() if item.line.startswith('FLAG')]
+    assert len(flag_items) == 1 and flag_items[0].sources == ['extract_strings', 'analyze_png_chunks']
+    assert 'also analyze_png_chunks' in store.digest()
+    # The shared 'keyword' finding is stored once as well
+    assert sum(item.line == "! keyword: 'password'" for item in store.items.values()) == 1
+
+
+def test_digest_ranks_and_keeps_flags_past_the_budget():
+    store = EvidenceStore()
+    store.add_result(result('extract_strings', findings=50))
+    store.add_result(result('scan_png_lsb', 'CTF{late_flag}'))
+    store.add_note('recon', "Looks like a PNG with LSB data.")
+
+    lines = store.digest(budget=0).splitlines()
+    assert lines[0].startswith('[R2.f1] FLAG CTF{late_flag}')
+    assert lines[-1].startswith(f"... {len(store) - 1} lower-ranked item(s) omitted")
+
+    lines = store.digest(budget=120).splitlines()
+    assert lines[1] == "[R1.51] ! keyword: 'password' (also scan_png_lsb)"
+    assert sum(estimate_tokens(line) + 1 for line in lines[:-1]) <= 120
+    assert any('recon concluded: Looks like a PNG' in line for line in lines)
+
+
+def test_get_returns_full_detail():
+    store = EvidenceStore()
+    report = ToolResult('extract_strings')
+    report.add('string', value='y' * 1000)
+    store.add_result(report)
+    assert store.get('[R1.1]').endswith('y' * 1000 + "'")
+    assert store.get('R1').startswith('[R1] from extract_strings')
+    assert store.get('R9') is None
+
+    store.add_result(report)  # Everything already known: only the result ID is new for get()
+    assert 'y' * 1000 in store.get('R2')
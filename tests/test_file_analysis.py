@@ -0,0 +1,23 @@
+"""Tests for the crew wrappers in src/tools/file_analysis.py"""
+
+import struct
+import zlib
+
+import pytest
+
+pytest.importorskip('crewai_tools')
+
+from src.tools import file_analysis  # noqa: E402
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def test_png_summary_without_ihdr(tmp_path):
+    path = tmp_path / 'headless.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + _chunk(b'tEXt', b'Comment\x00hi') + _chunk(b'IEND', b''))
+    result = file_analysis.analyze_png_chunks.func(str(path))
+    assert result.status != 'error'
+    assert result.summary.startswith('no IHDR, ')
+    assert 'None' not in result.summary
@@ -0,0 +1,56 @@
+"""Tests for src/utils/file_context.py"""
+
+import hashlib
+import io
+
+from src.utils.file_context import FileContext, borrow, get_context, open_context
+
+
+def test_views_reader_and_derived_data(tmp_path):
+    path = tmp_path / 'sample.png'
+    payload = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+    path.write_bytes(payload)
+
+    with FileContext(str(path)) as context:
+        assert bytes(context.head(8)) == payload[:8]
+        with context.open() as f:
+            f.seek(-4, io.SEEK_END)
+            assert f.read() == payload[-4:]
+        assert context.sha256 == hashlib.sha256(payload).hexdigest()
+        assert context.file_type == 'PNG image'
+        assert context.histogram.sum() == len(payload)
+        assert 7.9 < context.entropy <= 8.0
+
+
+def test_file_types_without_signature(tmp_path):
+    for name, content, kind in (('a.txt', b'plain text\n', 'text'), ('b.bin', bytes(64), 'data'),
+                                ('c', b'', 'empty')):
+        (tmp_path / name).write_bytes(content)
+        with FileContext(str(tmp_path / name)) as context:
+            assert context.file_type == kind
+
+
+def test_strings_offsets(tmp_path):
+    path = tmp_path / 'blob'
+    path.write_bytes(b'\x00\x01hello\x00ab\x00CTF{x}\xff')
+    with FileContext(str(path)) as context:
+        assert list(context.strings()) == [(2, b'hello'), (11, b'CTF{x}')]
+
+
+def test_registry_and_borrow(tmp_path):
+    path = tmp_path / 'shared.bin'
+    path.write_bytes(b'first')
+
+    context = open_context(str(path))
+    try:
+        with borrow(str(path)) as borrowed:
+            assert borrowed is context
+        assert get_context(str(path)) is context
+
+        path.write_bytes(b'changed contents')  # Stale mappings are not handed out
+        assert get_context(str(path)) is None
+        with borrow(str(path)) as private:
+            assert private is not context and bytes(private.head()) == b'changed contents'
+    finally:
+        context.close()
+    assert get_context(str(path)) is None
@@ -0,0 +1,125 @@
+"""Tests for src/tools/gif_frames.py"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools.gif_frames import GIFFile, _deinterlace, analyze_gif, extract_frames, lzw_decode
+
+
+def palette_image(indices: np.ndarray, palette: np.ndarray) -> Image.Image:
+    image = Image.fromarray(indices.astype(np.uint8), 'P')
+    image.putpalette(palette.tobytes())
+    return image
+
+
+def animation(path, count: int = 3, size=(20, 24), colors: int = 16, **save) -> str:
+    rng = np.random.default_rng(count)
+    palette = rng.integers(0, 256, (colors, 3), dtype=np.uint8)
+    # Every pixel changes between frames, so PIL cannot crop them to a bounding box
+    frames = [palette_image(rng.integers(0, colors, size), palette) for _ in range(count)]
+    frames[0].save(path, save_all=True, append_images=frames[1:], optimize=False, **save)
+    return str(path)
+
+
+def test_frames_match_pil(tmp_path):
+    path = animation(tmp_path / 'a.gif', size=(37, 24), duration=[100, 200, 300])
+    image = Image.open(path)
+    with GIFFile(path) as gif:
+        assert (gif.width, gif.height, len(gif.frames)) == (24, 37, 3)
+        assert [frame.delay for frame in gif.frames] == [10, 20, 30]
+        assert [frame.local_palette is None for frame in gif.frames] == [True, False, False]
+        for frame in gif.frames:
+            image.seek(frame.index)
+            assert np.array_equal(frame.rgb(), np.asarray(image.convert('RGB')))
+
+
+def test_interlaced_frame_matches_pil(tmp_path):
+    path = tmp_path / 'i.gif'
+    palette = np.random.default_rng(2).integers(0, 256, (16, 3), dtype=np.uint8)
+    palette_image(np.random.default_rng(3).integers(0, 16, (37, 24)), palette).save(path, interlace=True)
+    with GIFFile(str(path)) as gif:
+        frame = gif.frames[0]
+        assert frame.interlaced
+        assert np.array_equal(frame.indices(), np.asarray(Image.open(path)))
+
+
+def test_deinterlace_pass_order():
+    # Passes of 10 rows: 0, 8 | 4 | 2, 6 | 1, 3, 5, 7, 9
+    stored = np.arange(10)[:, None]
+    assert _deinterlace(stored, 10)[:, 0].tolist() == [0, 5, 3, 6, 2, 7, 4, 8, 1, 9]
+
+
+def test_lzw_rejects_invalid_code():
+    # min code size 2: clear=4, end=5; code 7 right after clear is undefined
+    with pytest.raises(ValueError, match='Invalid LZW code'):
+        lzw_decode(bytes([0b111100]), 2)
+
+
+def test_comment_and_delay_channels(tmp_path):
+    message = b'CTF{delays}'
+    path = animation(tmp_path / 'd.gif', count=len(message), duration=[10 * c for c in message],
+                     comment=b'CTF{gif_comment}')
+    result = analyze_gif(path)
+    assert result['comments'][0]['text'] == 'CTF{gif_comment}'
+    assert result['delays']['as_text'] == 'CTF{delays}'
+    assert set(result['flags']) == {'CTF{gif_comment}', 'CTF{delays}'}
+
+
+def test_unused_palette_entries_and_trailing_data(tmp_path):
+    palette = np.zeros((16, 3), dtype=np.uint8)
+    palette[:2] = [[0, 0, 0], [255, 255, 255]]
+    hidden = b'CTF{palette!!}'.ljust(42, b'\x00')
+    palette[2:] = np.frombuffer(hidden, dtype=np.uint8).reshape(14, 3)
+    path = tmp_path / 'p.gif'
+    palette_image(np.random.default_rng(5).integers(0, 2, (16, 16)), palette).save(path, optimize=False)
+    path.write_bytes(path.read_bytes() + b'PK\x03\x04 CTF{after_trailer}')
+
+    result = analyze_gif(str(path))
+    assert result['palette']['unused'] == 14
+    assert result['palette']['unused_payload'] == 'CTF{palette!!}'
+    assert result['trailing']['signature'] == 'ZIP archive'
+    assert set(result['flags']) == {'CTF{palette!!}', 'CTF{after_trailer}'}
+
+
+def test_odd_frames_and_extraction(tmp_path):
+    path = animation(tmp_path / 'o.gif', count=4, duration=[500, 500, 10, 500])
+    result = analyze_gif(path)
+    assert result['odd_frames'] == [{'index': 2, 'delay': 1, 'outside_canvas': False}]
+
+    written = extract_frames(path, str(tmp_path / 'frames'), indexes=[2])
+    image = Image.open(path)
+    image.seek(2)
+    assert np.array_equal(np.asarray(Image.open(written[0])), np.asarray(image.convert('RGB')))
+
+
+def test_rejects_non_gif(tmp_path):
+    path = tmp_path / 'x.gif'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + bytes(16))
+    with pytest.raises(ValueError):
+        GIFFile(str(path))
+
+
+def test_truncated_files_report_missing_trailer(tmp_path):
+    path = animation(tmp_path / 'a.gif')
+    data = open(path, 'rb').read()
+    with GIFFile(path) as gif:
+        second = gif.frames[1]
+        cuts = {'descriptor': (second.offset + 5, 1), 'lzw': (second._spans[0][0] + 10, 2)}
+
+    cut = tmp_path / 'cut.gif'
+    for name, (length, frames) in cuts.items():
+        cut.write_bytes(data[:length])
+        with GIFFile(str(cut)) as gif:
+            assert len(gif.frames) == frames, name
+            assert gif.frames[-1].indices().shape == (20, 24)
+        assert analyze_gif(str(cut))['trailing']['missing_trailer']
+
+    for length in range(13, len(data)):  # Every cut point after the screen descriptor
+        cut.write_bytes(data[:length])
+        result = analyze_gif(str(cut))
+        assert result['trailing']['missing_trailer'], length
+
+    cut.write_bytes(data[:10])
+    with pytest.raises(ValueError):
+        GIFFile(str(cut))
@@ -0,0 +1,90 @@
+"""Tests for src/tools/hash_cracker.py"""
+
+import hashlib
+
+import pytest
+
+from src.tools.hash_cracker import (
+    analyze_hashes, crack_hashes, find_hashes, identify_hash, iter_wordlist, load_pot, mangle,
+)
+
+BCRYPT = '$2b$12$' + 'a' * 53
+
+
+def md5(word: bytes) -> str:
+    return hashlib.md5(word).hexdigest()
+
+
+def test_identify_hash():
+    assert identify_hash(md5(b'x')) == ['md5']
+    assert identify_hash(hashlib.sha256(b'x').hexdigest().upper())[0] == 'sha256'
+    assert identify_hash(BCRYPT) == ['bcrypt']
+    assert identify_hash('a' * 33) == []
+    assert identify_hash('not a hash') == []
+
+
+def test_find_hashes_skips_padding_and_embedded_hex():
+    digest = hashlib.sha1(b'x').hexdigest()
+    text = f"sha1={digest.upper()} pad={'0' * 32} id=x{md5(b'y')} crypt: '{BCRYPT}'"
+    found = find_hashes(text)
+    assert found == [{'hash': digest, 'algorithms': ['sha1'], 'crackable': True},
+                     {'hash': BCRYPT, 'algorithms': ['bcrypt'], 'crackable': False}]
+
+
+def test_mangle():
+    assert mangle(b'sun', ('none', 'capitalize', 'upper')) == [b'sun', b'Sun', b'SUN']
+    assert b'Sun123' in mangle(b'sun', ('capitalize', 'suffixes'))
+    assert mangle(b'ab', ('reverse', 'digits'))[:3] == [b'ba', b'ba0', b'ba1']
+    with pytest.raises(ValueError):
+        mangle(b'sun', ('leet',))
+
+
+def test_iter_wordlist_batches_and_strips_line_endings(tmp_path):
+    path = tmp_path / 'words.txt'
+    path.write_bytes(b'one\r\ntwo\nthr\xffee\nfour')
+    assert list(iter_wordlist(str(path), 3)) == [[b'one', b'two', b'thr\xffee'], [b'four']]
+
+
+def test_builtin_passwords_and_pot(tmp_path):
+    pot = str(tmp_path / 'hashes.pot')
+    digest = md5(b'Secret123')
+
+    first = crack_hashes([digest], wordlists=[], pot_path=pot)
+    assert first['cracked'] == {digest: {'algorithm': 'md5', 'plaintext': b'Secret123', 'source': 'builtin'}}
+    assert first['uncracked'] == []
+
+    second = crack_hashes([digest.upper()], wordlists=[], pot_path=pot)
+    assert second['cracked'][digest]['source'] == 'pot'
+    assert second['words_tried'] == 0
+
+
+def test_pot_keeps_unprintable_and_colon_plaintexts(tmp_path):
+    pot = str(tmp_path / 'hashes.pot')
+    words = tmp_path / 'words.txt'
+    words.write_bytes(b'a:b\n\xff\xfe\n')
+    crack_hashes([md5(b'a:b'), md5(b'\xff\xfe')], wordlists=[str(words)], rules=('none',),
+                 max_workers=1, pot_path=pot)
+    assert load_pot(pot) == {md5(b'a:b'): ('md5', b'a:b'), md5(b'\xff\xfe'): ('md5', b'\xff\xfe')}
+
+
+def test_streamed_wordlist(tmp_path):
+    words = tmp_path / 'words.txt'
+    words.write_bytes(b'\n'.join(b'word%d' % i for i in range(500)) + b'\npineapple\n')
+    sha256 = hashlib.sha256(b'Pineapple!').hexdigest()
+    sha3 = hashlib.sha3_256(b'word42').hexdigest()
+
+    result = crack_hashes([sha256, sha3, md5(b'nowhere')], wordlists=[str(words)],
+                          rules=('none', 'capitalize', 'suffixes'), max_workers=2, batch_size=50,
+                          pot_path='', exhaustive=True)
+    assert result['cracked'][sha256] == {'algorithm': 'sha256', 'plaintext': b'Pineapple!',
+                                         'source': str(words)}
+    assert result['cracked'][sha3]['algorithm'] == 'sha3_256'
+    assert result['uncracked'] == [md5(b'nowhere')]
+    assert result['words_tried'] > 501
+
+
+def test_analyze_hashes_reports_uncrackable(tmp_path):
+    text = f"hash {md5(b'password')} and {BCRYPT}"
+    result = analyze_hashes(text, wordlists=[], pot_path='')
+    assert result['cracked'][md5(b'password')]['plaintext'] == b'password'
+    assert result['skipped'] == [BCRYPT]
@@ -0,0 +1,67 @@
+"""Tests for src/tools/image_transforms.py"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools.image_transforms import (
+    TRANSFORMS, analyze_transforms, build_contact_sheet, compute_transforms, load_pixels,
+    rank_transforms, text_likelihood,
+)
+
+
+def _image_with_hidden_block(path, size=64):
+    """Noise image whose red LSB plane holds a solid rectangle."""
+    rng = np.random.default_rng(1)
+    pixels = rng.integers(0, 256, size=(size, size, 3), dtype=np.uint8)
+    pixels[..., 0] &= 0xFE
+    pixels[16:32, 8:56, 0] |= 1
+    Image.fromarray(pixels, 'RGB').save(path)
+    return pixels
+
+
+def test_load_pixels_matches_pil(tmp_path):
+    path = str(tmp_path / 'cover.png')
+    _image_with_hidden_block(path)
+    expected = np.asarray(Image.open(path).convert('RGBA'))
+    pixels = load_pixels(path)
+    assert np.array_equal(pixels, expected)
+    assert not pixels.flags.writeable
+
+
+def test_bit_plane_reveals_embedded_shape(tmp_path):
+    path = str(tmp_path / 'cover.png')
+    pixels = _image_with_hidden_block(path)
+    views = compute_transforms(load_pixels(path), ['red_bit0', 'green_bit0', 'invert'])
+
+    assert np.array_equal(views['red_bit0'] == 255, (pixels[..., 0] & 1) == 1)
+    assert np.array_equal(views['invert'], 255 - pixels)
+    assert text_likelihood(views['red_bit0']) > text_likelihood(views['green_bit0'])
+
+
+def test_ranking_puts_hidden_plane_first(tmp_path):
+    path = str(tmp_path / 'cover.png')
+    _image_with_hidden_block(path)
+    ranking = rank_transforms(compute_transforms(load_pixels(path)))
+    assert len(ranking) == len(TRANSFORMS)
+    assert ranking[0]['name'] in ('red_bit0', 'lsb_xor')
+
+
+def test_unknown_transform_rejected():
+    with pytest.raises(ValueError):
+        compute_transforms(np.zeros((2, 2, 4), dtype=np.uint8), ['no_such_view'])
+
+
+def test_contact_sheet_layout():
+    views = {f'v{i}': np.full((10, 20), i, dtype=np.uint8) for i in range(7)}
+    sheet = build_contact_sheet(views, thumb_size=20, columns=3)
+    assert sheet.shape == (3 * 12, 3 * 22, 3)
+    assert sheet[12, 22, 0] == 4  # Row 1, column 1 holds the fifth view
+
+
+def test_analyze_transforms_writes_sheet(tmp_path):
+    path = str(tmp_path / 'cover.png')
+    _image_with_hidden_block(path)
+    result = analyze_transforms(path, str(tmp_path / 'out'), top=4)
+    assert len(result['written']) == 1
+    assert Image.open(result['written'][0]).size[0] > 0
@@ -0,0 +1,122 @@
+"""Tests for src/tools/jpeg_dct.py"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools.jpeg_dct import (F5_ENCODER_COMMENT, JPEGCoefficients, _dct_matrix, analyze_jpeg_dct,
+                                coefficient_histogram, detect_f5, detect_jsteg, estimate_lsb_rate,
+                                extract_jsteg, pair_profile, triage_jpeg_batch)
+
+
+def photo(height: int = 48, width: int = 40, seed: int = 0) -> np.ndarray:
+    """Smooth shapes plus noise, so most AC coefficients are small but not all zero."""
+    y, x = np.mgrid[0:height, 0:width]
+    noise = np.random.default_rng(seed).normal(0, 12, (height, width))
+    return (128 + 60 * np.sin(x / 5) + 50 * np.cos(y / 7) + noise).clip(0, 255).astype(np.uint8)
+
+
+def save(path, pixels: np.ndarray, mode: str = 'L', **options) -> str:
+    Image.fromarray(pixels).convert(mode).save(path, 'JPEG', quality=options.pop('quality', 90), **options)
+    return str(path)
+
+
+def decode_plane(coefficients: JPEGCoefficients, index: int = 0) -> np.ndarray:
+    """Dequantize and inverse-DCT one component back to 8-bit samples."""
+    dct = _dct_matrix()
+    table = coefficients.components[index]['quant_table']
+    quant = coefficients.natural_order(coefficients.quant_tables[table].astype(np.float32))
+    blocks = coefficients.natural_order(coefficients.component_blocks(index))
+    rows, cols = blocks.shape[:2]
+    spatial = dct.T @ (blocks * quant) @ dct
+    return np.clip(np.round(spatial.transpose(0, 2, 1, 3).reshape(rows * 8, cols * 8) + 128), 0, 255)
+
+
+@pytest.mark.parametrize('options', [{}, {'restart_marker_blocks': 3}])
+def test_coefficients_decode_to_pil_pixels(tmp_path, options):
+    path = save(tmp_path / 'g.jpg', photo(), **options)
+    coefficients = JPEGCoefficients(path)
+    image = Image.open(path)
+
+    assert (coefficients.width, coefficients.height) == image.size
+    assert coefficients.blocks.shape == (6 * 5, 64)
+    assert coefficients.natural_order(coefficients.quant_tables[0]).ravel().tolist() == image.quantization[0]
+    # Float IDCT against libjpeg's integer one: off by at most one level
+    plane = decode_plane(coefficients)[:image.height, :image.width]
+    assert np.abs(plane - np.asarray(image, dtype=np.float64)).max() <= 1
+
+
+def test_subsampled_color_layout(tmp_path):
+    rgb = np.stack([photo(seed=s) for s in range(3)], axis=-1)
+    coefficients = JPEGCoefficients(save(tmp_path / 'c.jpg', rgb, 'RGB', subsampling=2))  # 4:2:0
+    assert [(c['h'], c['v']) for c in coefficients.components] == [(2, 2), (1, 1), (1, 1)]
+    assert np.bincount(coefficients.block_component).tolist() == [6 * 6, 3 * 3, 3 * 3]  # Luma padded to MCUs
+    assert coefficients.component_blocks(1).shape == (3, 3, 64)
+
+
+def test_progressive_rejected(tmp_path):
+    with pytest.raises(ValueError, match='Progressive'):
+        JPEGCoefficients(save(tmp_path / 'p.jpg', photo(), progressive=True))
+
+
+def embed_jsteg(coefficients: JPEGCoefficients, message: bytes):
+    """jsteg-style: LSB-replace usable AC coefficients (not 0 or 1) in decode order."""
+    bits = np.unpackbits(np.frombuffer(message, dtype=np.uint8))
+    blocks = coefficients.blocks
+    usable = (blocks != 0) & (blocks != 1)
+    usable[:, 0] = False  # DC is left alone
+    rows, cols = np.nonzero(usable)  # Row-major, i.e. decode order
+    assert len(rows) >= len(bits), "cover too small for the message"
+    rows, cols = rows[:len(bits)], cols[:len(bits)]
+    blocks[rows, cols] = (blocks[rows, cols] & ~1) | bits  # Never lands on 0 or 1
+
+
+def test_jsteg_round_trip_and_detection(tmp_path):
+    path = save(tmp_path / 'j.jpg', photo(96, 96), quality=95)
+    clean = JPEGCoefficients(path)
+    clean_profile = pair_profile(clean.ac_coefficients())
+
+    stego = JPEGCoefficients(path)
+    message = len(b'CTF{jsteg}').to_bytes(4, 'big') + b'CTF{jsteg}'
+    embed_jsteg(stego, message + bytes(np.random.default_rng(1).integers(0, 256, 120, dtype=np.uint8)))
+
+    extracted = extract_jsteg(stego)
+    assert extracted['payload'] == b'CTF{jsteg}'
+    assert extracted['scan']['flag'] == 'CTF{jsteg}'
+
+    stego_profile = pair_profile(stego.ac_coefficients())
+    rate = estimate_lsb_rate(coefficient_histogram(stego.ac_coefficients()))
+    assert stego_profile[0][1] > clean_profile[0][1]
+    assert detect_jsteg(stego_profile, rate)['score'] > 0.5
+
+
+def test_analyze_clean_file(tmp_path):
+    result = analyze_jpeg_dct(save(tmp_path / 'a.jpg', photo()))
+    assert result['dimensions'] == (40, 48) and result['blocks'] == 30
+    assert result['detectors']['jsteg']['score'] == 0.0
+    assert result['jsteg']['scan']['flag'] is None
+
+
+def test_f5_encoder_comment(tmp_path):
+    # Calibration is too noisy on small synthetic images to assert on, the comment is not
+    coefficients = JPEGCoefficients(save(tmp_path / 'f5.jpg', photo(), comment=F5_ENCODER_COMMENT))
+    result = detect_f5(coefficients)
+    assert result['evidence'][0] == 'F5 reference encoder comment'
+    assert result['score'] >= 0.9
+
+
+def test_truncated_entropy_data(tmp_path):
+    noise = np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8)
+    with open(save(tmp_path / 'full.jpg', noise, 'RGB'), 'rb') as f:
+        data = f.read()
+
+    paths = []
+    for cut in (200, 1000, len(data) // 2, len(data) - 300):
+        path = tmp_path / f'cut{cut}.jpg'
+        path.write_bytes(data[:-cut])
+        paths.append(str(path))
+        with pytest.raises(ValueError):
+            analyze_jpeg_dct(str(path))
+
+    results = triage_jpeg_batch(paths, max_workers=2)
+    assert all(result['detectors'] is None and result['error'] for result in results.values())
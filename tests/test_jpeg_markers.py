@@ -0,0 +1,116 @@
+"""Tests for src/tools/jpeg_markers.py"""
+
+import io
+import struct
+import zipfile
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools.jpeg_markers import find_scan_end, walk_jpeg
+
+
+def jpeg_bytes(width=40, height=24, **save) -> bytes:
+    pixels = np.random.default_rng(3).integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'JPEG', **save)
+    return buffer.getvalue()
+
+
+def test_segments_and_dimensions(tmp_path):
+    data = jpeg_bytes(progressive=True)
+    path = tmp_path / 'a.jpg'
+    path.write_bytes(data)
+    result = walk_jpeg(str(path))
+
+    image = Image.open(path)
+    assert result['dimensions'] == {'width': image.width, 'height': image.height, 'components': 3,
+                                    'precision': 8, 'progressive': True}
+    assert result['eoi_offset'] == len(data) - 2
+    assert result['trailing'] is None
+    # Every reported offset points at a marker
+    for segment in result['segments']:
+        assert data[segment['offset']] == 0xFF
+    markers = [segment['marker'] for segment in result['segments']]
+    assert markers[0] == 'APP0' and markers[-1] == 'EOI' and markers.count('SOS') > 1  # One scan per pass
+
+
+def test_comment_and_exif_flags(tmp_path):
+    exif = Image.Exif()
+    exif[0x010E] = 'CTF{in_exif}'  # ImageDescription
+    path = tmp_path / 'c.jpg'
+    path.write_bytes(jpeg_bytes(comment=b'CTF{in_comment}', exif=exif.tobytes()))
+    result = walk_jpeg(str(path))
+
+    assert result['flags'] == ['CTF{in_exif}', 'CTF{in_comment}']
+    comment = next(f for f in result['findings'] if f['type'] == 'comment')
+    assert comment['detail'] == 'CTF{in_comment}'
+    assert path.read_bytes()[comment['offset']:comment['offset'] + comment['length']] == b'CTF{in_comment}'
+    # A standard EXIF block is labelled in the segment list, not reported
+    assert [s['type'] for s in result['segments'] if 'type' in s] == ['JFIF', 'EXIF']
+    assert [f['type'] for f in result['findings']] == ['comment']
+
+
+def segment(marker: int, payload: bytes) -> bytes:
+    return bytes([0xFF, marker]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def test_only_anomalous_segments_are_findings(tmp_path):
+    data = jpeg_bytes()
+    path = tmp_path / 'plain.jpg'
+    path.write_bytes(data)
+    assert walk_jpeg(str(path))['findings'] == []
+
+    extra = (segment(0xE1, b'Exif\x00\x00MM') + segment(0xE1, b'Exif\x00\x00II')
+             + segment(0xE3, b'JFIF\x00\x01\x02') + segment(0xE5, b'stego tool v1'))
+    path.write_bytes(data[:2] + extra + data[2:])
+    findings = walk_jpeg(str(path))['findings']
+    assert [(f['marker'], f['type']) for f in findings] == [('APP1', 'EXIF'), ('APP3', 'JFIF'), ('APP5', 'unknown')]
+    assert findings[0]['detail'] == 'Duplicate EXIF segment'
+    assert findings[1]['detail'] == 'JFIF payload in APP3, expected in APP0'
+    assert findings[2]['detail'] == 'stego tool v1'
+
+    path.write_bytes(data[:2] + b'\xff\xfe\xff\xf0hidden')  # COM claims more bytes than remain
+    findings = walk_jpeg(str(path))['findings']
+    assert findings[0]['type'] == 'bad length' and findings[0]['marker'] == 'COM'
+
+
+def test_trailing_zip(tmp_path):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr('secret.txt', 'flag: CTF{after_eoi}')
+    data = jpeg_bytes()
+    path = tmp_path / 't.jpg'
+    path.write_bytes(data + archive.getvalue())
+    result = walk_jpeg(str(path))
+
+    trailing = result['trailing']
+    assert trailing['offset'] == len(data)
+    assert trailing['signature'] == 'ZIP archive'
+    assert trailing['archive'] == [{'name': 'secret.txt', 'size': 20, 'flags': ['CTF{after_eoi}']}]
+    assert result['flags'] == ['CTF{after_eoi}']
+    # PIL still decodes the carrier, so the data hides in plain sight
+    Image.open(path).load()
+
+
+def test_find_scan_end_skips_stuffing_and_restarts():
+    scan = b'\x12\xff\x00\x34\xff\xd0\x56\xff\xff\xd7\x78\xff\xd9'
+    assert find_scan_end(scan, 0) == len(scan) - 2
+    assert find_scan_end(b'\x00\xff\x00', 0) == 3
+
+
+def test_missing_eoi(tmp_path):
+    data = jpeg_bytes()
+    path = tmp_path / 'cut.jpg'
+    path.write_bytes(data[:-2])
+    result = walk_jpeg(str(path))
+    assert result['eoi_offset'] is None
+    assert result['findings'][-1]['type'] == 'missing EOI'
+
+
+def test_rejects_non_jpeg(tmp_path):
+    path = tmp_path / 'x.jpg'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + bytes(32))
+    with pytest.raises(ValueError, match='SOI'):
+        walk_jpeg(str(path))
@@ -0,0 +1,82 @@
+"""Tests for src/utils/llm_cache.py"""
+
+import json
+
+import pytest
+
+pytest.importorskip('langchain_core')
+
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration  # noqa: E402
+
+from src.utils import llm_cache  # noqa: E402
+from src.utils.llm_cache import LLMCache, ResponseCache, cache_key, normalize_prompt  # noqa: E402
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResponseCache(str(tmp_path / 'cache.sqlite'), ttl=100, max_bytes=1000)
+    yield store
+    store.close()
+
+
+def test_keys_ignore_per_run_noise():
+    first = json.dumps([{'content': 'Analyze x.png  \r\n', 'id': 'run-1', 'usage_metadata': {'tokens': 5}}])
+    second = json.dumps([{'content': 'Analyze x.png\n', 'id': 'run-2'}])
+    assert normalize_prompt(first) == normalize_prompt(second)
+    assert cache_key(first, 'model=a') == cache_key(second, 'model=a')
+    assert cache_key(first, 'model=a') != cache_key(first, 'model=b')
+    # A list 'id' is a serialized class path, not a per-run value
+    assert 'AIMessage' in normalize_prompt(json.dumps({'id': ['langchain', 'AIMessage']}))
+
+
+def test_hits_misses_and_ttl(store, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: clock[0])
+    assert store.get('a') is None
+    store.put('a', 'answer')
+    assert store.get('a') == 'answer'
+    assert (store.hits, store.misses, store.hit_rate) == (1, 1, 0.5)
+
+    clock[0] += 101
+    assert store.get('a') is None
+    assert store.stats()['entries'] == 0
+
+
+def test_lru_eviction_above_size_cap(store, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(llm_cache.time, 'time', lambda: clock[0])
+    for key in 'abc':
+        clock[0] += 1
+        store.put(key, key * 400)
+    # Three 400-byte values do not fit in 1000 bytes; 'a' was used least recently
+    assert store.get('a') is None and store.get('b') and store.get('c')
+
+    clock[0] += 1
+    store.get('b')  # Now 'c' is the oldest access
+    clock[0] += 1
+    store.put('d', 'd' * 400)
+    assert store.get('c') is None and store.get('b') and store.get('d')
+    assert store.stats()['bytes'] <= 1000
+
+
+def test_persists_across_connections(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    first = ResponseCache(path)
+    first.put('k', 'v')
+    first.close()
+    second = ResponseCache(path)
+    assert second.get('k') == 'v'
+    second.close()
+
+
+def test_langchain_adapter_round_trip(store):
+    cache = LLMCache(store)
+    prompt = json.dumps([{'content': 'What is in the file?'}])
+    assert cache.lookup(prompt, 'claude') is None
+    cache.update(prompt, 'claude', [ChatGeneration(message=AIMessage(content='Final Answer: CTF{cached}'))])
+    generations = cache.lookup(prompt, 'claude')
+    assert generations[0].message.content == 'Final Answer: CTF{cached}'
+
+    store.put(cache_key(prompt, 'other'), 'not json')
+    assert cache.lookup(prompt, 'other') is None  # Unreadable entries are misses
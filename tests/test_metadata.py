@@ -0,0 +1,122 @@
+"""Tests for src/tools/metadata.py"""
+
+import io
+import struct
+
+import pytest
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from src.tools.metadata import parse_iptc, parse_tiff, parse_xmp, read_metadata
+
+XMP = (b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+       b'<rdf:Description dc:format="image/jpeg"><dc:creator><rdf:Seq><rdf:li>CTF{xmp_creator}</rdf:li>'
+       b'</rdf:Seq></dc:creator></rdf:Description></rdf:RDF></x:xmpmeta>')
+
+
+def app_segment(marker: int, payload: bytes) -> bytes:
+    return bytes([0xFF, marker]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def photoshop(iptc: bytes) -> bytes:
+    return b'Photoshop 3.0\x00' + b'8BIM' + struct.pack('>HBxI', 0x0404, 0, len(iptc)) + iptc
+
+
+def iptc_record(dataset: int, value: bytes) -> bytes:
+    return struct.pack('>BBBH', 0x1C, 2, dataset, len(value)) + value
+
+
+def jpeg(path, exif: Image.Exif = None, extra: bytes = b'', comment: bytes = None) -> str:
+    buffer = io.BytesIO()
+    options = {'exif': exif.tobytes()} if exif is not None else {}
+    if comment is not None:
+        options['comment'] = comment
+    Image.new('RGB', (8, 8), 'white').save(buffer, 'JPEG', **options)
+    data = buffer.getvalue()
+    path.write_bytes(data[:2] + extra + data[2:])  # Extra segments right after SOI
+    return str(path)
+
+
+def by_name(result) -> dict:
+    return {(field['group'], field['name']): field for field in result['fields']}
+
+
+def test_exif_matches_pil(tmp_path):
+    exif = Image.Exif()
+    exif[0x010F] = 'StegoCam'
+    exif[0x013B] = 'CTF{exif_artist}'
+    exif[0x0112] = 3
+    exif.get_ifd(0x8769)[0x9286] = b'ASCII\x00\x00\x00secret note'  # ExifIFD UserComment
+    path = jpeg(tmp_path / 'e.jpg', exif)
+
+    result = read_metadata(path)
+    fields = by_name(result)
+    pil = Image.open(path).getexif()
+    assert result['format'] == 'JPEG'
+    assert fields[('EXIF', 'Make')]['value'] == pil[0x010F]
+    assert fields[('EXIF', 'Artist')]['value'] == pil[0x013B]
+    assert fields[('EXIF', 'Orientation')]['value'] == pil[0x0112]
+    assert fields[('ExifIFD', 'UserComment')]['value'] == 'secret note'
+    assert result['flags'] == ['CTF{exif_artist}']
+
+    artist = fields[('EXIF', 'Artist')]
+    data = open(path, 'rb').read()
+    assert data[artist['offset']:artist['offset'] + 16] == b'CTF{exif_artist}'
+
+
+def test_xmp_iptc_and_comment(tmp_path):
+    extra = (app_segment(0xE1, b'http://ns.adobe.com/xap/1.0/\x00' + XMP)
+             + app_segment(0xED, photoshop(iptc_record(0, b'\x00\x04') + iptc_record(120, b'CTF{iptc}'))))
+    path = jpeg(tmp_path / 'x.jpg', extra=extra, comment=b'plain comment')
+    fields = by_name(read_metadata(path))
+
+    assert fields[('XMP', 'dc:format')]['value'] == 'image/jpeg'
+    assert fields[('XMP', 'dc:creator')]['value'] == 'CTF{xmp_creator}'
+    assert fields[('Comment', 'Comment')]['value'] == 'plain comment'
+    assert ('IPTC', '2:0') not in fields  # Record version is not a field
+    assert 'CTF{iptc}' in {field['value'] for (group, _), field in fields.items() if group == 'IPTC'}
+
+
+def test_png_text_and_exif(tmp_path):
+    info = PngInfo()
+    info.add_text('Comment', 'CTF{png_text}')
+    info.add_text('Software', 'x' * 50, zip=True)
+    exif = Image.Exif()
+    exif[0x8298] = 'CTF{png_exif}'
+    path = tmp_path / 't.png'
+    Image.new('RGB', (4, 4)).save(path, pnginfo=info, exif=exif.tobytes())
+
+    result = read_metadata(str(path))
+    fields = by_name(result)
+    assert result['format'] == 'PNG'
+    assert fields[('tEXt', 'Comment')]['value'] == 'CTF{png_text}'
+    assert fields[('zTXt', 'Software')]['value'] == 'x' * 50
+    assert fields[('EXIF', 'Copyright')]['value'] == 'CTF{png_exif}'
+    assert set(result['flags']) == {'CTF{png_text}', 'CTF{png_exif}'}
+
+
+def test_ifd_loop_terminates():
+    # IFD0 at 8 with one entry, next-IFD pointer back to itself
+    entry = struct.pack('<HHI4s', 0x010F, 2, 4, b'abc\x00')
+    data = b'II*\x00' + struct.pack('<I', 8) + struct.pack('<H', 1) + entry + struct.pack('<I', 8)
+    fields = parse_tiff(data, base_offset=100)
+    assert [(f['name'], f['value'], f['offset']) for f in fields] == [('Make', 'abc', 118)]
+    with pytest.raises(ValueError):
+        parse_tiff(b'XX' + data[2:])
+
+
+def test_broken_xmp_still_parsed():
+    fields = parse_xmp(b'<rdf:Description><dc:title>CTF{unclosed}<dc:rights x:a="b"', base_offset=10)
+    assert fields[0]['name'] == 'dc:title' and fields[0]['value'] == 'CTF{unclosed}'
+
+
+def test_extended_iptc_dataset():
+    value = b'y' * 40
+    data = struct.pack('>BBBH', 0x1C, 2, 5, 0x8002) + struct.pack('>H', len(value)) + value
+    assert parse_iptc(data)[0]['value'] == 'y' * 40
+
+
+def test_unhandled_format(tmp_path):
+    path = tmp_path / 'a.gif'
+    Image.new('P', (2, 2)).save(path)
+    assert read_metadata(str(path)) is None
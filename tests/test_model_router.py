@@ -0,0 +1,70 @@
+"""Tests for src/utils/model_router.py"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.model_router import (
+    AGENT_TIERS, DEFAULT_SPEEDUP, FAST, GAVE_UP, STRONG, ModelRouter, parse_agent_tiers, stalled,
+)
+from src.utils.tool_result import ToolResult
+
+
+def test_parse_agent_tiers():
+    assert parse_agent_tiers('') == AGENT_TIERS
+    tiers = parse_agent_tiers(' decoder = strong , ,orchestrator=fast')
+    assert (tiers['decoder'], tiers['orchestrator'], tiers['recon']) == (STRONG, FAST, FAST)
+    with pytest.raises(ValueError):
+        parse_agent_tiers('decoder')
+    with pytest.raises(ValueError):
+        parse_agent_tiers('decoder=medium')
+
+
+def test_stalled():
+    ok = ToolResult('get_file_type')
+    failed = ToolResult.failed('extract_with_steghide', "steghide not installed")
+    assert stalled("", [ok]) == "no answer"
+    assert stalled(f"{GAVE_UP}.", [ok]) == "iteration limit"
+    assert stalled("done", [failed]) == "no tool ran successfully"
+    assert stalled("done", []) == "no tools called"
+    assert stalled("done", [], uses_tools=False) is None
+    assert stalled("done", [failed, ok]) is None
+
+
+def test_models_built_once_and_escalation():
+    built = []
+
+    def factory(model, tier):
+        built.append(tier)
+        return SimpleNamespace(model=model, tier=tier)
+
+    router = ModelRouter(factory, models={FAST: 'small', STRONG: 'large'})
+    recon = SimpleNamespace(role='Recon', llm=router.for_agent('recon'))
+    assert router.for_agent('stego') is recon.llm and recon.llm.model == 'small'
+    assert router.for_agent('unknown').model == 'large'
+    assert built == [FAST, STRONG]
+
+    assert router.escalate(recon, "no answer")
+    assert recon.llm.model == 'large' and router.tier_of(recon) == STRONG
+    assert not router.escalate(recon, "again")
+    assert not router.escalate(SimpleNamespace(role='Other', llm=object()), "not routed")
+    assert router.escalations == [('Recon', "no answer")]
+
+
+def call(label, tier, seconds, output_tokens):
+    """Stand-in for prompt_cache.CallRecord, which needs langchain_anthropic."""
+    return SimpleNamespace(label=label, tier=tier, seconds=seconds, output_tokens=output_tokens)
+
+
+def test_tier_report_uses_measured_speedup():
+    router = ModelRouter(lambda model, tier: None, models={FAST: 'small', STRONG: 'large'})
+    calls = [call('recon', FAST, 2.0, 200), call('recon', FAST, 2.0, 200),
+             call('orchestrator', STRONG, 3.0, 100)]
+    lines = router.tier_report(calls).splitlines()
+    # Fast: 0.01 s/token, strong: 0.03 s/token, so 4 s on the fast tier saved 8 s
+    assert lines[0].startswith('recon') and '2 calls' in lines[0] and 'saved ~8.0s' in lines[0]
+    assert 'saved' not in lines[1]
+    assert lines[-1] == "~8.0s saved on small (large ~3.0x slower per output token, measured this run)"
+
+    assumed = router.tier_report([call('recon', FAST, 1.0, 10)]).splitlines()[-1]
+    assert f"~{DEFAULT_SPEEDUP:.1f}x" in assumed and assumed.endswith("assumed)")
@@ -0,0 +1,93 @@
+"""Tests for src/utils/offline_llm.py"""
+
+import json
+
+import pytest
+
+pytest.importorskip('langchain_anthropic')
+
+from langchain_core.messages import HumanMessage, SystemMessage  # noqa: E402
+
+from src.utils.offline_llm import (  # noqa: E402
+    STOP_NOTICE, ReplayPolicy, ScriptedChatModel, offline_model, prompt_key, prompt_text, tool_sweep,
+)
+from src.utils.prompt_cache import usage_ledger  # noqa: E402
+
+TOOLS = """You ONLY have access to the following tools:
+Tool Name: get_file_type(file_path: str) -> ToolResult
+Tool Name: decode_base64(encoded: str) -> ToolResult
+Tool Name: extract_strings(file_path: str, min_length: int = 4) -> ToolResult
+
+Action: the action to take, only one name of [get_file_type, decode_base64, extract_strings], just the name
+"""
+
+
+def agent_prompt(file_path: str, scratchpad: str = "") -> str:
+    return f"{TOOLS}\nCurrent Task: Analyze {file_path} and report any flag\n{scratchpad}"
+
+
+def step(tool: str, file_path: str, observation: str) -> str:
+    return (f"Thought: Run it\nAction: {tool}\nAction Input: {json.dumps({'file_path': file_path})}\n"
+            f"Observation: {observation}\n")
+
+
+@pytest.fixture
+def challenge(tmp_path):
+    path = tmp_path / 'challenge.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n')
+    return str(path)
+
+
+def test_sweep_calls_each_path_tool_once_then_answers(challenge):
+    first = tool_sweep(agent_prompt(challenge))
+    assert first.endswith(f'Action: get_file_type\nAction Input: {json.dumps({"file_path": challenge})}')
+
+    # decode_base64 needs text, not a path, so it is skipped
+    scratchpad = step('get_file_type', challenge, "[get_file_type] ok | PNG image")
+    second = tool_sweep(agent_prompt(challenge, scratchpad))
+    assert '\nAction: extract_strings\n' in second
+
+    scratchpad += step('extract_strings', challenge, "[extract_strings] flag\nFLAG CTF{offline}")
+    final = tool_sweep(agent_prompt(challenge, scratchpad))
+    assert final.startswith("Thought: I now know the final answer\nFinal Answer: FLAG: CTF{offline}\n")
+    assert "- get_file_type: [get_file_type] ok | PNG image" in final
+
+
+def test_sweep_stops_on_notice_and_without_a_file(challenge):
+    scratchpad = step('get_file_type', challenge, f"Run cancelled. {STOP_NOTICE}.")
+    assert 'Final Answer:' in tool_sweep(agent_prompt(challenge, scratchpad))
+    assert 'Final Answer: No flag found.' in tool_sweep(agent_prompt('/nonexistent/file.png'))
+
+
+def test_replay_matches_normalized_prompts(tmp_path):
+    text = "human: what is in the file?"
+    transcript = tmp_path / 'trace.jsonl'
+    transcript.write_text("\n".join([
+        json.dumps({'type': 'run', 'note': 'not a reply'}),
+        json.dumps({'key': prompt_key(text), 'response': "first", 'seconds': 0.5}),
+        json.dumps({'key': prompt_key(text), 'response': "second"}),
+    ]) + "\n")
+
+    policy = ReplayPolicy(str(transcript), fallback=lambda text: "fallback")
+    assert policy(text + "   \r\n") == "first"  # Trailing whitespace and CRLF do not change the key
+    assert policy("human: something else") == "fallback"
+    assert (policy.hits, policy.misses) == (1, 1)
+
+
+def test_scripted_model_applies_stop_and_records_usage(challenge):
+    usage_ledger.reset()
+    model = offline_model('scripted', model='ignored', tier='fast')
+    reply = model.invoke([SystemMessage(content="You are Recon."), HumanMessage(content=agent_prompt(challenge))],
+                         stop=["\nAction Input:"])
+    assert reply.content.endswith("Action: get_file_type")
+    assert usage_ledger.calls[0].tier == 'fast' and usage_ledger.calls[0].output_tokens > 0
+    usage_ledger.reset()
+
+    assert isinstance(offline_model('scripted'), ScriptedChatModel)
+    with pytest.raises(ValueError):
+        offline_model('gpt')
+
+
+def test_prompt_text_joins_blocks():
+    message = HumanMessage(content=[{'type': 'text', 'text': 'static '}, {'type': 'text', 'text': 'dynamic'}])
+    assert prompt_text([SystemMessage(content="rules"), message]) == "system: rules\n\nhuman: static dynamic"
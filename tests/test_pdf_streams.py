@@ -0,0 +1,139 @@
+"""Tests for src/tools/pdf_streams.py"""
+
+import base64
+import struct
+import zlib
+
+import pytest
+
+from src.tools.pdf_streams import INFLATE_STEP, PDFDocument, analyze_pdf, inflate_chunks
+
+
+def stream_object(dictionary: bytes, data: bytes) -> bytes:
+    return b'<< ' + dictionary + b' /Length %d >>\nstream\n' % len(data) + data + b'\nendstream'
+
+
+def build_pdf(bodies: list, xref: str = 'table', xref_dictionary: bytes = None, tail: bytes = b'',
+              compressed: dict = None) -> bytes:
+    """
+    PDF with objects 1..n and an xref table or an xref stream (object n+1,
+    /W [1 4 2] unless xref_dictionary replaces its entries). compressed maps
+    further object numbers to (object stream, index) entries of the stream.
+    """
+    out = b'%PDF-1.7\n'
+    offsets = []
+    for number, body in enumerate(bodies, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+
+    xref_at = len(out)
+    size = len(bodies) + 1
+    if xref == 'table':
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % size
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root 1 0 R >>\n' % size
+    elif xref == 'stream':
+        rows = b''.join(struct.pack('>BIH', 1, offset, 0) for offset in offsets)
+        rows += struct.pack('>BIH', 1, xref_at, 0)
+        index = b'1 %d' % size
+        for number, (container, position) in sorted((compressed or {}).items()):
+            rows += struct.pack('>BIH', 2, container, position)
+            index += b' %d 1' % number
+        entries = xref_dictionary if xref_dictionary is not None else b'/W [1 4 2]'
+        out += b'%d 0 obj\n' % size
+        out += stream_object(b'/Type /XRef /Size %d /Index [%s] ' % (size + 1 + len(compressed or ()), index) + entries
+                             + b' /Filter /FlateDecode', zlib.compress(rows))
+        out += b'\nendobj\n'
+    return out + b'startxref\n%d\n%%%%EOF\n' % xref_at + tail
+
+
+def write(tmp_path, data: bytes, name: str = 'a.pdf') -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+CATALOG = b'<< /Type /Catalog /Pages 2 0 R >>'
+PAGES = b'<< /Type /Pages /Kids [] /Count 0 >>'
+SECRET = stream_object(b'/Filter /FlateDecode', zlib.compress(b'BT (CTF{in_flate}) Tj ET'))
+
+
+@pytest.mark.parametrize('xref', ['table', 'stream'])
+def test_index_from_xref(tmp_path, xref):
+    data = build_pdf([CATALOG, PAGES, SECRET], xref)
+    with PDFDocument(write(tmp_path, data)) as pdf:
+        assert pdf.xref_source == xref
+        assert pdf.version == '1.7'
+        assert data[pdf.offsets[3]:].startswith(b'3 0 obj')
+        body, span = pdf.object(3)
+        assert b''.join(pdf.decode_stream_chunks(body, span)) == b'BT (CTF{in_flate}) Tj ET'
+
+    result = analyze_pdf(write(tmp_path, data))
+    assert result['flags'] == ['CTF{in_flate}']
+    assert any(stream['decoded_length'] == 24 for stream in result['streams'])
+
+
+@pytest.mark.parametrize('entries', [b'', b'/W [1 4]', b'/W [0 0 0]'])
+def test_malformed_xref_stream_falls_back_to_scan(tmp_path, entries):
+    data = build_pdf([CATALOG, PAGES, SECRET], 'stream', xref_dictionary=entries)
+    with PDFDocument(write(tmp_path, data)) as pdf:
+        assert pdf.xref_source == 'scan'
+        assert sorted(pdf.offsets) == [1, 2, 3, 4]
+    assert analyze_pdf(write(tmp_path, data))['flags'] == ['CTF{in_flate}']
+
+
+def test_shifted_xref_table_falls_back_to_scan(tmp_path):
+    data = build_pdf([CATALOG, PAGES, SECRET]).replace(b'%PDF-1.7\n', b'%PDF-1.7\n%padding\n', 1)
+    with PDFDocument(write(tmp_path, data)) as pdf:
+        assert pdf.xref_source == 'scan'
+        assert data[pdf.offsets[2]:].startswith(b'2 0 obj')
+
+
+def test_object_stream(tmp_path):
+    members = b'<< /Secret (CTF{compressed_object}) >>'
+    header = b'5 0 '
+    objstm = stream_object(b'/Type /ObjStm /N 1 /First %d /Filter /FlateDecode' % len(header),
+                           zlib.compress(header + members))
+    data = build_pdf([CATALOG, PAGES, objstm], 'stream', compressed={5: (3, 0)})
+    with PDFDocument(write(tmp_path, data)) as pdf:
+        assert pdf.compressed == {5: (3, 0)}
+        assert pdf.object_body(5) == members
+    assert analyze_pdf(write(tmp_path, data))['flags'] == ['CTF{compressed_object}']
+
+
+def test_filter_chain_javascript_and_attachments(tmp_path):
+    hex_then_flate = stream_object(b'/Filter [/AHx /Fl]', zlib.compress(b'CTF{hex_flate}').hex().encode() + b'>')
+    a85 = stream_object(b'/Filter /ASCII85Decode', b'<~' + base64.a85encode(b'CTF{a85}') + b'~>')
+    attachment = stream_object(b'/Type /EmbeddedFile', b'PK\x03\x04zipdata')
+    action = b'<< /S /JavaScript /JS (app.alert\\(1\\)) >>'
+    data = build_pdf([CATALOG, PAGES, hex_then_flate, a85, attachment, action], tail=b'PK\x03\x04 after eof')
+
+    result = analyze_pdf(write(tmp_path, data))
+    assert set(result['flags']) == {'CTF{hex_flate}', 'CTF{a85}'}
+    assert result['embedded_files'] == [{'object': 5, 'length': 11, 'signature': 'ZIP archive'}]
+    assert result['javascript'][0]['object'] == 6
+    assert result['trailing']['signature'] == 'ZIP archive'
+    assert result['incremental_updates'] == 0
+
+
+def test_undecodable_javascript_stream_is_reported(tmp_path):
+    action = b'<< /S /JavaScript /JS 4 0 R >>'
+    broken = stream_object(b'/Filter /FlateDecode', b'not zlib at all')
+    data = build_pdf([CATALOG, PAGES, action, broken, b'<< /JSON (x) /Length 0 >>'])
+
+    result = analyze_pdf(write(tmp_path, data))
+    [script] = result['javascript']
+    assert script['object'] == 4 and script['code'] is None and script['error']
+    assert result['streams'][0]['error']
+
+
+def test_inflate_stops_at_limit():
+    bomb = zlib.compress(bytes(10 << 20))
+    pieces = [bomb[i:i + 1000] for i in range(0, len(bomb), 1000)]
+    produced = sum(len(piece) for piece in inflate_chunks(pieces, max_bytes=1 << 20))
+    assert 1 << 20 <= produced < (1 << 20) + INFLATE_STEP
+
+
+def test_rejects_non_pdf(tmp_path):
+    with pytest.raises(ValueError):
+        PDFDocument(write(tmp_path, b'GIF89a' + bytes(64), 'x.pdf'))
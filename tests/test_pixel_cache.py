@@ -0,0 +1,122 @@
+"""Tests for src/utils/pixel_cache.py"""
+
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools import image_transforms, png_lsb
+from src.utils.file_context import FileContext
+from src.utils.pixel_cache import PixelCache, attach, detach
+
+
+def _write_png(path, seed=0, size=32):
+    pixels = np.random.default_rng(seed).integers(0, 256, size=(size, size, 3), dtype=np.uint8)
+    Image.fromarray(pixels, 'RGB').save(path)
+    return str(path)
+
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# An unrelated interpreter has its own resource tracker, which unlinks what it tracks at exit
+ATTACH_SCRIPT = """
+import sys
+from src.utils.pixel_cache import SharedPixels, attach
+print(int(attach(SharedPixels(sys.argv[1], (32, 32, 4), '|u1')).sum()))
+"""
+
+
+def _checksum(handle):
+    return int(attach(handle).astype(np.int64).sum())
+
+
+@pytest.fixture
+def cache():
+    cache = PixelCache()
+    yield cache
+    cache.clear()
+
+
+def test_decodes_once_and_keys_on_content_hash(tmp_path, cache):
+    path = _write_png(tmp_path / 'a.png')
+    first = cache.get(path)
+    second = cache.get(path)
+    assert np.array_equal(first, np.asarray(Image.open(path).convert('RGBA')))
+    assert (cache.hits, cache.misses) == (1, 1)
+    with FileContext(path) as context:
+        assert cache.digest(path) == context.sha256
+    assert not second.flags.writeable
+
+
+def test_identical_content_shares_one_entry(tmp_path, cache):
+    a = _write_png(tmp_path / 'a.png')
+    b = tmp_path / 'b.png'
+    b.write_bytes(open(a, 'rb').read())
+    cache.get(a)
+    cache.get(str(b))
+    assert cache.stats()['entries'] == 1
+
+
+def test_peek_never_decodes(tmp_path, cache):
+    path = _write_png(tmp_path / 'a.png')
+    assert cache.peek(path) is None
+    assert cache.misses == 0
+    pixels = cache.get(path)
+    assert np.array_equal(cache.peek(path), pixels)
+
+
+def test_lru_eviction_by_bytes(tmp_path):
+    cache = PixelCache(max_bytes=2 * 32 * 32 * 4)
+    paths = [_write_png(tmp_path / f'{i}.png', seed=i) for i in range(3)]
+    for path in paths:
+        cache.get(path)
+    assert cache.stats()['entries'] == 2
+    assert cache.peek(paths[0]) is None
+    cache.clear()
+
+
+def test_worker_process_attaches_without_decoding(tmp_path, cache):
+    path = _write_png(tmp_path / 'a.png')
+    handle = cache.share(path)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        remote = pool.submit(_checksum, handle).result()
+    assert remote == int(cache.get(path).astype(np.int64).sum())
+    assert cache.misses == 1
+
+
+def test_segment_outlives_attached_workers(tmp_path, cache):
+    path = _write_png(tmp_path / 'a.png')
+    handle = cache.share(path)
+    expected = int(cache.get(path).astype(np.int64).sum())
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert list(pool.map(_checksum, [handle] * 4)) == [expected] * 4
+    output = subprocess.run([sys.executable, '-c', ATTACH_SCRIPT, handle.name], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    assert int(output.stdout) == expected
+    assert 'leaked' not in output.stderr
+
+    # Reopened by name, so this fails if any worker's exit unlinked the segment
+    assert _checksum(handle) == expected
+    detach(handle)
+
+
+def test_parallel_ranking_matches_serial(tmp_path):
+    path = _write_png(tmp_path / 'a.png', size=48)
+    serial = image_transforms.analyze_transforms(path, workers=1)['ranking']
+    parallel = image_transforms.analyze_transforms(path, workers=2)['ranking']
+    assert parallel == serial
+
+
+def test_png_lsb_reads_cached_pixels(tmp_path, monkeypatch, cache):
+    path = _write_png(tmp_path / 'a.png')
+    monkeypatch.setattr(png_lsb, 'get_pixel_cache', lambda: cache)
+    streamed = b''.join(png_lsb.iter_lsb_bytes(path, 'bgr', 1))
+    cache.get(path)
+    from_cache = b''.join(png_lsb.iter_lsb_bytes(path, 'bgr', 1))
+    assert from_cache == streamed
+    assert cache.hits == 1
@@ -0,0 +1,118 @@
+"""Tests for src/tools/png_chunks.py"""
+
+import io
+import struct
+import zlib
+
+import pytest
+from PIL import Image
+
+from src.tools.png_chunks import analyze_png, recover_dimensions
+from test_png_lsb import _chunk
+
+SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def ihdr(width: int = 12, height: int = 5) -> bytes:
+    return struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+
+
+def idat(width: int = 12, height: int = 5) -> bytes:
+    return zlib.compress(bytes(height * (1 + 3 * width)))
+
+
+def write(path, *chunks, trailing: bytes = b'') -> str:
+    path.write_bytes(SIGNATURE + b''.join(_chunk(kind, data) for kind, data in chunks) + trailing)
+    return str(path)
+
+
+def basic(*extra):
+    return [(b'IHDR', ihdr()), *extra, (b'IDAT', idat()), (b'IEND', b'')]
+
+
+def test_clean_file(tmp_path):
+    path = write(tmp_path / 'a.png', *basic())
+    result = analyze_png(path)
+    image = Image.open(path)
+    assert (result['header']['width'], result['header']['height']) == image.size
+    assert [chunk['type'] for chunk in result['chunks']] == ['IHDR', 'IDAT', 'IEND']
+    assert all(chunk['crc_ok'] for chunk in result['chunks'])
+    assert result['anomalies'] == [] and result['trailing'] is None
+
+
+def test_pil_text_chunks(tmp_path):
+    from PIL.PngImagePlugin import PngInfo
+
+    info = PngInfo()
+    info.add_text('Comment', 'CTF{plain}')
+    info.add_text('Author', 'CTF{compressed}', zip=True)
+    info.add_itxt('Title', 'CTF{intl_ü}', lang='de', zip=True)
+    buffer = io.BytesIO()
+    Image.new('RGB', (4, 4)).save(buffer, 'PNG', pnginfo=info)
+    path = tmp_path / 't.png'
+    path.write_bytes(buffer.getvalue())
+
+    result = analyze_png(str(path))
+    texts = {chunk.keyword: (chunk.chunk_type, chunk.text) for chunk in result['text_chunks']}
+    assert texts == {'Comment': ('tEXt', 'CTF{plain}'), 'Author': ('zTXt', 'CTF{compressed}'),
+                     'Title': ('iTXt', 'CTF{intl_ü}')}
+    assert result['text_chunks'][2].language == 'de'
+    assert set(result['flags']) == {'CTF{plain}', 'CTF{compressed}', 'CTF{intl_ü}'}
+
+
+def test_corrupt_ztxt_is_an_anomaly(tmp_path):
+    path = write(tmp_path / 'z.png', *basic((b'zTXt', b'Broken\x00\x00not zlib at all'),
+                                            (b'tEXt', b'Later\x00CTF{still_found}')))
+    result = analyze_png(path)
+    assert [a['type'] for a in result['anomalies']] == ['corrupt text chunk']
+    assert result['anomalies'][0]['chunk'] == 'zTXt'
+    assert result['text_chunks'][0].text == ''
+    assert result['flags'] == ['CTF{still_found}']
+    assert result['chunks'][-1]['type'] == 'IEND'
+
+
+def test_corrupt_idat_keeps_walking(tmp_path):
+    stream = bytearray(idat())
+    stream[2:6] = b'\xff\xff\xff\xff'  # Invalid deflate block after the zlib header
+    path = write(tmp_path / 'i.png', (b'IHDR', ihdr()), (b'IDAT', bytes(stream)),
+                 (b'tEXt', b'After\x00CTF{after_idat}'), (b'IEND', b''))
+    result = analyze_png(path)
+    assert [a['type'] for a in result['anomalies']] == ['corrupt IDAT stream']
+    assert result['flags'] == ['CTF{after_idat}']
+    assert result['chunks'][-1]['type'] == 'IEND'
+
+
+def test_recovers_tampered_height(tmp_path):
+    original = ihdr(12, 5)
+    crc = zlib.crc32(b'IHDR' + original)
+    tampered = ihdr(12, 2)
+    header = struct.pack('>I', 13) + b'IHDR' + tampered + struct.pack('>I', crc)
+    path = tmp_path / 'h.png'
+    path.write_bytes(SIGNATURE + header + _chunk(b'IDAT', idat(12, 5)) + _chunk(b'IEND', b''))
+
+    result = analyze_png(str(path))
+    assert result['anomalies'][0]['type'] == 'bad CRC'
+    assert result['recovered_dimensions'][0] == (12, 5)
+    assert (12, 5) in recover_dimensions(tampered, crc, max_dimension=64)
+
+
+def test_height_patched_with_crc(tmp_path):
+    path = write(tmp_path / 'p.png', (b'IHDR', ihdr(12, 2)), (b'IDAT', idat(12, 5)), (b'IEND', b''))
+    result = analyze_png(path)
+    assert result['anomalies'][0]['type'] == 'IDAT size does not match IHDR dimensions'
+    assert result['recovered_dimensions'] == [(12, 5)]
+
+
+def test_unknown_chunk_and_trailing_data(tmp_path):
+    path = write(tmp_path / 'u.png', *basic((b'stEg', b'payload')), trailing=b'PK\x03\x04 CTF{tail}')
+    result = analyze_png(path)
+    assert result['anomalies'][0] == {'type': 'unknown chunk', 'chunk': 'stEg', 'offset': 33, 'length': 7}
+    assert result['trailing']['signature'] == 'ZIP archive'
+    assert result['flags'] == ['CTF{tail}']
+
+
+def test_rejects_non_png(tmp_path):
+    path = tmp_path / 'x.png'
+    path.write_bytes(b'GIF89a' + bytes(16))
+    with pytest.raises(ValueError):
+        analyze_png(str(path))
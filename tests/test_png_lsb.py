@@ -0,0 +1,166 @@
+"""Tests for src/tools/png_lsb.py"""
+
+import struct
+import zlib
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.tools import png_lsb
+from src.tools.png_lsb import iter_lsb_bytes, read_header, scan_png_lsb, unfilter_rows, unfilter_scanline
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    return a if pa <= pb and pa <= pc else b if pb <= pc else c
+
+
+def _filter_row(kind: int, row: bytes, prev: bytes, bpp: int) -> bytes:
+    out = bytearray()
+    for i, x in enumerate(row):
+        a = row[i - bpp] if i >= bpp else 0
+        b = prev[i]
+        c = prev[i - bpp] if i >= bpp else 0
+        predictor = (0, a, b, (a + b) // 2, _paeth(a, b, c))[kind]
+        out.append((x - predictor) & 0xFF)
+    return bytes([kind]) + bytes(out)
+
+
+def write_png(path, pixels: np.ndarray, color_type: int = 2, depth: int = 8, filters=(0, 1, 2, 3, 4)):
+    """PNG with explicit per-row filters (cycled) so every unfilter path is exercised."""
+    height, width = pixels.shape[:2]
+    raw = pixels.astype('>u2' if depth == 16 else np.uint8).reshape(height, -1).view(np.uint8)
+    bpp = raw.shape[1] // width
+    prev = bytes(raw.shape[1])
+    stream = b''
+    for y in range(height):
+        row = raw[y].tobytes()
+        stream += _filter_row(filters[y % len(filters)], row, prev, bpp)
+        prev = row
+    ihdr = struct.pack('>IIBBBBB', width, height, depth, color_type, 0, 0, 0)
+    data = b'\x89PNG\r\n\x1a\n' + _chunk(b'IHDR', ihdr)
+    compressed = zlib.compress(stream)
+    for i in range(0, len(compressed), 97):  # Several IDAT chunks
+        data += _chunk(b'IDAT', compressed[i:i + 97])
+    path.write_bytes(data + _chunk(b'IEND', b''))
+    return str(path)
+
+
+def _expected_bits(pixels, selector, bit, depth=8):
+    values = pixels[..., selector].reshape(-1).astype(np.int64)
+    return np.packbits((values >> bit) & 1).tobytes()
+
+
+@pytest.fixture
+def pixels():
+    return np.random.default_rng(3).integers(0, 256, size=(12, 9, 3), dtype=np.uint8)
+
+
+def test_every_filter_type_reconstructs_pil_pixels(tmp_path, pixels):
+    path = write_png(tmp_path / 'f.png', pixels)
+    assert np.array_equal(np.asarray(Image.open(path).convert('RGB')), pixels)
+    extracted = b''.join(iter_lsb_bytes(path, 'rgb', 0))
+    assert extracted == _expected_bits(pixels, [0, 1, 2], 0)[:len(extracted)]
+    assert len(extracted) == 12 * 9 * 3 // 8
+
+
+def test_channel_order_and_bit_plane(tmp_path, pixels):
+    path = write_png(tmp_path / 'f.png', pixels)
+    extracted = b''.join(iter_lsb_bytes(path, 'bgr', 2))
+    assert extracted == _expected_bits(pixels, [2, 1, 0], 2)[:len(extracted)]
+
+
+def test_sixteen_bit_uses_low_byte(tmp_path):
+    wide = np.random.default_rng(4).integers(0, 65536, size=(8, 8, 3)).astype(np.uint16)
+    path = write_png(tmp_path / 'w.png', wide, depth=16)
+    extracted = b''.join(iter_lsb_bytes(path, 'rgb', 0))
+    assert extracted == _expected_bits(wide & 0xFF, [0, 1, 2], 0)
+
+
+def test_embedded_flag_found_with_offset(tmp_path):
+    cover = np.random.default_rng(5).integers(0, 256, size=(40, 40, 3), dtype=np.uint8)
+    message = b'noise' * 4 + b'CTF{lsb_round_trip}'
+    bits = np.unpackbits(np.frombuffer(message, dtype=np.uint8))
+    flat = cover.reshape(-1)
+    flat[:len(bits)] = (flat[:len(bits)] & 0xFE) | bits
+    path = write_png(tmp_path / 's.png', cover)
+
+    result = scan_png_lsb(path)
+    assert result['flag'] == 'CTF{lsb_round_trip}'
+    assert result['flag_offset'] == 20
+    assert result['stopped_early']
+
+
+def test_header_and_errors(tmp_path, pixels):
+    path = write_png(tmp_path / 'f.png', pixels)
+    with open(path, 'rb') as f:
+        header = read_header(f)
+    assert (header['width'], header['height'], header['channels'], header['stride']) == (9, 12, 'rgb', 27)
+
+    with pytest.raises(ValueError):
+        b''.join(iter_lsb_bytes(path, 'a'))  # No alpha channel
+    bad = tmp_path / 'bad.png'
+    bad.write_bytes(b'not a png at all')
+    with pytest.raises(ValueError):
+        b''.join(iter_lsb_bytes(str(bad)))
+
+
+def test_unfilter_rejects_unknown_filter():
+    with pytest.raises(ValueError):
+        unfilter_scanline(7, bytearray(6), np.zeros(6, dtype=np.uint8), 3)
+
+
+@pytest.mark.parametrize('bpp', [1, 3, 4, 6])
+@pytest.mark.parametrize('kinds', [(0, 1, 2, 3, 4), (3,), (4,)])
+def test_block_unfilter_matches_row_by_row(bpp, kinds):
+    rng = np.random.default_rng(bpp)
+    filters = rng.choice(np.array(kinds, dtype=np.uint8), 40)
+    raw = rng.integers(0, 256, (40, 7 * bpp), dtype=np.uint8)
+    prev = rng.integers(0, 256, 7 * bpp, dtype=np.uint8)
+
+    rows = unfilter_rows(filters, raw, prev, bpp)
+    for filter_type, cur, row in zip(filters, raw, rows):
+        prev = unfilter_scanline(int(filter_type), bytearray(cur.tobytes()), prev, bpp)
+        assert np.array_equal(row, prev)
+
+    filters[5] = 9
+    with pytest.raises(ValueError):
+        unfilter_rows(filters, raw, prev, bpp)
+
+
+@pytest.mark.parametrize('color_type, samples, depth', [(0, 1, 8), (6, 4, 8), (2, 3, 16)])
+def test_average_and_paeth_blocks_match_pil(tmp_path, monkeypatch, color_type, samples, depth):
+    monkeypatch.setattr(png_lsb, 'BLOCK_BYTES', 1)  # Blocks of 16 rows, so prev carries across blocks
+    shape = (37, 11, samples) if samples > 1 else (37, 11)
+    pixels = np.random.default_rng(6).integers(0, 1 << depth, size=shape)
+    path = write_png(tmp_path / 'p.png', pixels, color_type=color_type, depth=depth, filters=(3, 4, 4, 3, 1))
+    if depth == 8:
+        assert np.array_equal(np.asarray(Image.open(path)), pixels)
+    extracted = b''.join(iter_lsb_bytes(path, bit=1))
+    channels = min(samples, 3)
+    assert len(extracted) == 37 * 11 * channels // 8
+    assert extracted == _expected_bits(pixels.reshape(37, 11, -1) & 0xFF, slice(0, channels), 1)[:len(extracted)]
+
+
+def test_paeth_scan_stops_at_max_bytes(tmp_path, monkeypatch):
+    pixels = np.random.default_rng(7).integers(0, 256, size=(64, 64, 3), dtype=np.uint8)
+    path = write_png(tmp_path / 'p.png', pixels, filters=(4,))
+    monkeypatch.setattr(png_lsb, 'BLOCK_BYTES', 4 * 64 * 3)  # Four rows per block
+
+    unfiltered = []
+    original = png_lsb.unfilter_rows
+
+    def counting(filters, raw, prev, bpp):
+        unfiltered.append(len(raw))
+        return original(filters, raw, prev, bpp)
+
+    monkeypatch.setattr(png_lsb, 'unfilter_rows', counting)
+    result = scan_png_lsb(path, max_bytes=24)  # One row of RGB bits
+    assert unfiltered == [4]
+    assert result['bytes_scanned'] == 4 * 24
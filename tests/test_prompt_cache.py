@@ -0,0 +1,84 @@
+"""Tests for src/utils/prompt_cache.py"""
+
+import pytest
+
+pytest.importorskip('langchain_anthropic')
+
+from langchain_anthropic import ChatAnthropic  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+
+from src.utils.prompt_cache import (  # noqa: E402
+    EPHEMERAL, MAX_BREAKPOINTS, CachingChatAnthropic, UsageLedger, _mark_tools, add_cache_breakpoints, usage_ledger,
+)
+
+AGENT_PROMPT = "You are Recon.\nTools: get_file_type, extract_strings\n\nCurrent Task: analyze /tmp/a.png"
+
+
+def test_breakpoint_at_the_static_prefix():
+    messages = [SystemMessage(content="system rules"), HumanMessage(content=AGENT_PROMPT),
+                AIMessage(content="Thought: check type"), HumanMessage(content="Observation\nCurrent Task: x")]
+    marked = add_cache_breakpoints(messages)
+
+    assert marked[0].content == [{'type': 'text', 'text': "system rules", 'cache_control': EPHEMERAL}]
+    static, rest = marked[1].content
+    assert static == {'type': 'text', 'text': AGENT_PROMPT.split("\nCurrent Task:")[0], 'cache_control': EPHEMERAL}
+    assert rest == {'type': 'text', 'text': "\nCurrent Task: analyze /tmp/a.png"}
+    assert marked[2] is messages[2] and marked[3] is messages[3]  # Only the first human message is split
+    assert messages[1].content == AGENT_PROMPT  # Input is not modified
+
+
+def test_no_marker_and_breakpoint_limit():
+    plain = HumanMessage(content="no marker here")
+    assert add_cache_breakpoints([plain])[0] is plain
+
+    systems = [SystemMessage(content=f"part {i}") for i in range(MAX_BREAKPOINTS + 2)]
+    marked = add_cache_breakpoints(systems)
+    assert sum(isinstance(m.content, list) for m in marked) == MAX_BREAKPOINTS
+    assert marked[-1] is systems[-1]
+
+
+def test_last_tool_schema_is_marked():
+    tools = [{'name': 'a'}, {'name': 'b'}]
+    marked = _mark_tools(tools)
+    assert marked == [{'name': 'a'}, {'name': 'b', 'cache_control': EPHEMERAL}]
+    assert 'cache_control' not in tools[-1]
+
+
+def test_ledger_totals_per_label():
+    ledger = UsageLedger()
+    ledger.begin('recon')
+    ledger.record({'input_tokens': 100, 'cache_creation_input_tokens': 1500, 'output_tokens': 40}, 'fast', 1.0)
+    ledger.record({'input_tokens': 120, 'cache_read_input_tokens': 1500, 'output_tokens': 30}, 'fast', 0.5)
+    ledger.begin('orchestrator')
+    ledger.record({'input_tokens': 50, 'output_tokens': None}, 'strong', 2.0)
+
+    assert ledger.totals['recon'] == {'calls': 2, 'uncached': 220, 'cache_write': 1500, 'cache_read': 1500,
+                                      'output': 70}
+    assert [call.label for call in ledger.calls] == ['recon', 'recon', 'orchestrator']
+    lines = ledger.report().splitlines()
+    assert lines[0].startswith('recon') and 'cached    1500 ( 47%)' in lines[0]
+    assert lines[-1].startswith('TOTAL') and '3 calls' in lines[-1]
+    ledger.reset()
+    assert ledger.calls == [] and ledger.label == 'other'
+
+
+def test_model_marks_requests_and_records_usage(monkeypatch):
+    sent = {}
+
+    def fake_generate(self, messages, stop=None, run_manager=None, **kwargs):
+        sent['messages'], sent['tools'] = messages, kwargs.get('tools')
+        usage = {'input_tokens': 10, 'cache_read_input_tokens': 2000, 'output_tokens': 5}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))], llm_output={'usage': usage})
+
+    monkeypatch.setattr(ChatAnthropic, '_generate', fake_generate)
+    model = CachingChatAnthropic(model='claude-3-5-haiku-20241022', api_key='test', tier='fast')
+    assert model.default_headers['anthropic-beta'].startswith('prompt-caching')
+
+    usage_ledger.reset()
+    model._generate([HumanMessage(content=AGENT_PROMPT)], tools=[{'name': 'get_file_type'}])
+    assert sent['messages'][0].content[0]['cache_control'] == EPHEMERAL
+    assert sent['tools'][-1]['cache_control'] == EPHEMERAL
+    assert usage_ledger.totals['other']['cache_read'] == 2000
+    assert usage_ledger.calls[0].tier == 'fast'
+    usage_ledger.reset()
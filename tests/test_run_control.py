@@ -0,0 +1,63 @@
+"""Tests for src/utils/run_control.py"""
+
+import json
+import os
+import subprocess
+import sys
+
+from src.utils.helpers import find_flags
+from src.utils.run_control import RunControl
+from src.utils.tool_result import ToolResult
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Flags are searched with the format configured at import time, so a custom one needs a fresh interpreter
+CUSTOM_FORMAT_SCRIPT = """
+import json
+from src.tools.steganalysis import scan_stream
+from src.utils.helpers import find_flags
+from src.utils.run_control import RunControl
+from src.utils.tool_result import ToolResult
+
+text = b'picoCTF{abc} HTB{xyz}'
+result = ToolResult('strings')
+result.add_flags(find_flags(text))
+control = RunControl()
+note = ToolResult('extract_strings')
+note.notable('keyword', value='hidden picoCTF{in_a_finding}')
+print(json.dumps({'find_flags': find_flags(text), 'scan': scan_stream([text])['flag'],
+                  'recorded': control.record(result), 'cancelled': control.cancelled,
+                  'from_findings': RunControl().record(note)}))
+"""
+
+
+def test_first_verified_flag_cancels_the_run():
+    control = RunControl()
+    placeholder = ToolResult('strings')
+    placeholder.add_flags(find_flags("submit as CTF{example}"))
+    assert control.record(placeholder) == []
+    assert not control.cancelled
+
+    found = ToolResult('analyze_png_chunks')
+    found.add_flags(find_flags(b"zTXt: CTF{real_one}"))
+    assert control.record(found) == ['CTF{real_one}']
+    assert control.cancelled and control.flags == [('CTF{real_one}', 'analyze_png_chunks')]
+    assert control.results == [placeholder, found]
+
+
+def test_flags_in_findings_are_reported():
+    control = RunControl()
+    result = ToolResult('analyze_metadata', summary="3 fields")
+    result.notable('comment', value='x' * 200 + ' CTF{past_the_clip}')
+    result.notable('raw', value=b'\x00CTF{in_bytes}\xff')
+    assert control.record(result) == ['CTF{past_the_clip}', 'CTF{in_bytes}']
+    assert control.cancelled
+
+
+def test_configured_flag_format_reaches_the_tools():
+    env = dict(os.environ, STEGOCREW_FLAG_FORMAT=r'picoCTF\{[^}]+\}')
+    output = subprocess.run([sys.executable, '-c', CUSTOM_FORMAT_SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == {'find_flags': ['picoCTF{abc}'], 'scan': 'picoCTF{abc}',
+                                  'recorded': ['picoCTF{abc}'], 'cancelled': True,
+                                  'from_findings': ['picoCTF{in_a_finding}']}
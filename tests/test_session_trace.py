@@ -0,0 +1,105 @@
+"""Tests for src/utils/session_trace.py"""
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('langchain_anthropic')
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+from src.utils import session_trace  # noqa: E402
+from src.utils.offline_llm import ReplayPolicy, ScriptedChatModel, prompt_key  # noqa: E402
+from src.utils.session_trace import (  # noqa: E402
+    ToolReplay, TraceRecorder, full_prompt, read_trace, start_trace, stop_trace, summarize, trace_report,
+    trace_tool, tracer,
+)
+from src.utils.tool_result import ToolResult  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_active_trace(monkeypatch):
+    monkeypatch.setattr(session_trace, '_tool_replay', None)
+    yield
+    stop_trace()
+
+
+def test_growing_prompts_are_stored_as_deltas(tmp_path):
+    path = str(tmp_path / 'run.jsonl')
+    recorder = TraceRecorder(path, file='a.png')
+    prompts = ["system: rules\nhuman: task", "system: rules\nhuman: task\nObservation: one",
+               "system: rules\nhuman: task\nObservation: one\nObservation: two"]
+    for i, prompt in enumerate(prompts):
+        recorder.llm('recon', 'small', prompt, f"reply {i}", t=i, seconds=0.5)
+    recorder.llm('stego', 'small', prompts[2], "other task", t=3, seconds=0.5)  # Different label: full prompt
+    recorder.llm('recon', 'small', "unrelated", "restart", t=4, seconds=0.5)
+    recorder.close(flags=['CTF{x}'])
+
+    events = read_trace(path)
+    assert events[0]['type'] == 'run' and events[0]['file'] == 'a.png'
+    llm = [event for event in events if event['type'] == 'llm']
+    assert [event.get('base') for event in llm] == [None, llm[0]['seq'], llm[1]['seq'], None, None]
+    assert llm[2]['prompt'] == "\nObservation: two"
+    for event, prompt in zip(llm, prompts + [prompts[2], "unrelated"]):
+        assert full_prompt(events, event['seq']) == prompt
+        assert event['key'] == prompt_key(prompt)
+    assert events[-1]['type'] == 'end' and events[-1]['flags'] == ['CTF{x}']
+
+
+def test_summarize_and_report(tmp_path):
+    def trace(path, model_seconds, tool_seconds):
+        recorder = TraceRecorder(str(path))
+        recorder.llm('recon', 'small', "p", "r", t=0.0, seconds=model_seconds)
+        recorder.tool('get_file_type', ('a.png',), {}, "PNG", t=1.0, seconds=tool_seconds)
+        recorder.close()
+        return str(path)
+
+    run = trace(tmp_path / 'run.jsonl', 2.0, 1.0)
+    baseline = trace(tmp_path / 'base.jsonl', 4.0, 1.0)
+    summary = summarize(read_trace(run))
+    assert (summary['model'], summary['tools'], summary['by_tool']['get_file_type']) == (2.0, 1.0, [1, 1.0])
+    assert summary['framework'] == pytest.approx(summary['wall'] - 3.0)
+
+    report = trace_report(run, baseline).splitlines()
+    assert report[1].startswith('model') and '(was    4.00s,   -2.00s)' in report[1]
+    assert any(line.strip().startswith('get_file_type') and '1x' in line for line in report)
+
+
+def test_tool_calls_recorded_then_replayed(tmp_path, monkeypatch):
+    calls = []
+
+    def analyze(file_path, bits=1):
+        calls.append(file_path)
+        result = ToolResult('analyze', f"call {len(calls)}")
+        result.add_flag('CTF{tool}')
+        return result
+
+    tool = trace_tool(SimpleNamespace(name='analyze', func=analyze))
+    path = str(tmp_path / 'tools.jsonl')
+    start_trace(path)
+    tool.func('a.wav', bits=2)
+    tool.func('a.wav', bits=2)
+    stop_trace()
+
+    replay = ToolReplay(path)
+    monkeypatch.setattr(session_trace, '_tool_replay', replay)
+    first, second = tool.func('a.wav', bits=2), tool.func('a.wav', bits=2)
+    assert (first.summary, second.summary) == ("call 1", "call 2")  # Recorded order
+    assert first.flag_values == ['CTF{tool}'] and len(calls) == 2
+
+    assert tool.func('a.wav', bits=1).summary == "call 3"  # Different arguments run the real tool
+    assert (replay.hits, replay.misses) == (2, 1)
+
+
+def test_model_calls_recorded_and_replayable(tmp_path):
+    path = str(tmp_path / 'llm.jsonl')
+    model = ScriptedChatModel(policy=lambda text: "Final Answer: CTF{recorded}", callbacks=[tracer])
+    start_trace(path)
+    model.invoke([HumanMessage(content="Current Task: analyze")])
+    stop_trace()
+
+    llm = [event for event in read_trace(path) if event['type'] == 'llm']
+    assert len(llm) == 1 and llm[0]['response'] == "Final Answer: CTF{recorded}"
+
+    replayed = ScriptedChatModel(policy=ReplayPolicy(path, fallback=lambda text: "miss"))
+    assert replayed.invoke([HumanMessage(content="Current Task: analyze")]).content == "Final Answer: CTF{recorded}"
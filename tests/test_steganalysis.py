@@ -0,0 +1,60 @@
+"""Tests for src/tools/steganalysis.py"""
+
+import math
+
+import numpy as np
+
+from src.tools.steganalysis import chi2_sf, chi_square_pairs, chi_square_profile, pack_bits, scan_stream
+
+
+def test_scan_stream_matches_flags_across_chunks():
+    data = b'\x01' * 100 + b'junk CTF{split_flag} ' + bytes(50)
+    chunks = [data[i:i + 7] for i in range(0, len(data), 7)]
+    result = scan_stream(chunks)
+    assert result['flag'] == 'CTF{split_flag}'
+    assert result['flag_offset'] == data.index(b'CTF{')
+    assert result['stopped_early'] and result['bytes_scanned'] < len(data)
+
+
+def test_scan_stream_signatures_only_at_the_start():
+    assert scan_stream([b'\x89PNG\r\n\x1a\n' + bytes(8)])['signature'] == {'type': 'PNG image', 'offset': 0}
+    assert scan_stream([b'\x00\x00\x01\x00PK\x03\x04' + bytes(8)])['signature']['offset'] == 4
+    assert scan_stream([bytes(100) + b'PK\x03\x04' + bytes(8)])['signature'] is None
+
+
+def test_scan_stream_byte_cap():
+    result = scan_stream((bytes(10) for _ in range(100)), max_bytes=35)
+    assert result['bytes_scanned'] == 40 and result['stopped_early'] and result['flag'] is None
+
+
+def test_pack_bits_carries_partial_bytes():
+    bits = np.unpackbits(np.frombuffer(b'CTF{bits}', dtype=np.uint8))
+    pieces = [bits[:3], bits[3:20], bits[20:21], bits[21:]]
+    assert b''.join(pack_bits(pieces)) == b'CTF{bits}'
+
+
+def test_chi2_sf_known_values():
+    assert chi2_sf(0, 5) == 1.0
+    assert math.isclose(chi2_sf(2.0, 2), math.exp(-1.0), rel_tol=1e-9)  # 2 dof is exp(-x/2)
+    assert math.isclose(chi2_sf(3.841, 1), 0.05, abs_tol=1e-3)
+    assert chi2_sf(500, 10) < 1e-9
+
+
+def test_chi_square_pairs():
+    rng = np.random.default_rng(0)
+    cover = rng.integers(0, 64, 20000) * 2  # Even values only: pairs maximally unequal
+    embedded = cover + rng.integers(0, 2, cover.size)
+    assert chi_square_pairs(np.bincount(cover, minlength=256)) < 0.01
+    assert chi_square_pairs(np.bincount(embedded, minlength=256)) > 0.95
+    assert chi_square_pairs(np.zeros(256)) == 0.0
+
+
+def test_chi_square_profile_marks_where_the_payload_ends():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 64, 40000) * 2
+    values[:8000] += rng.integers(0, 2, 8000)  # Payload in the first 20%
+    blocks = np.array_split(values, 13)
+    profile = chi_square_profile(blocks, len(values), steps=5)
+    assert [fraction for fraction, _ in profile] == [0.2, 0.4, 0.6, 0.8, 1.0]
+    assert profile[0][1] > 0.95 and profile[-1][1] < 0.05
+    assert chi_square_profile([], 0) == []
@@ -0,0 +1,30 @@
+"""Tests for the crew wrappers in src/tools/stego_tools.py"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('crewai_tools')
+
+from src.tools import stego_tools  # noqa: E402
+from test_bmp_reader import write_bmp  # noqa: E402
+
+
+def test_analyze_bmp_skips_empty_profiles(tmp_path):
+    path = write_bmp(tmp_path / 'e.bmp', np.zeros((0, 0, 3), dtype=np.uint8))
+    result = stego_tools.analyze_bmp.func(path)
+    assert result.status != 'error'
+    assert not result.by_kind('chi_square')
+
+
+def test_analyze_audio_lsb_skips_empty_profiles(tmp_path, monkeypatch):
+    from src.tools import audio_analysis
+    from test_audio_analysis import write_au
+
+    path = write_au(tmp_path / 'a.au', bytes(range(256)), encoding=1)
+    analyze = audio_analysis.analyze_audio
+    monkeypatch.setattr(audio_analysis, 'analyze_audio',
+                        lambda *args: {**analyze(*args), 'chi_square': {0: []}})
+    result = stego_tools.analyze_audio_lsb.func(path)
+    assert result.status != 'error'
+    assert 'mu-law' in result.summary
+    assert not result.by_kind('chi_square channel 0')
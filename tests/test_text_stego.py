@@ -0,0 +1,100 @@
+"""Tests for src/tools/text_stego.py"""
+
+from src.tools import text_stego
+from src.tools.text_stego import BitSink, HOMOGLYPHS, analyze_text_stego
+
+FLAG = 'CTF{hidden_text}'
+COVER = ["The quick brown fox jumps over the lazy dog.", "Pack my box with five dozen liquor jugs.",
+         "Sphinx of black quartz, judge my vow."] * 30
+LOOKALIKES = {latin: lookalike for lookalike, latin in HOMOGLYPHS.items()}
+
+
+def bits_of(message: str) -> str:
+    return ''.join(format(b, '08b') for b in message.encode())
+
+
+def write(tmp_path, text: str, name: str = 'cover.txt', newline: str = '\n') -> str:
+    path = tmp_path / name
+    path.write_bytes(text.replace('\n', newline).encode('utf-8'))
+    return str(path)
+
+
+def test_snow_runs(tmp_path):
+    bits = bits_of(FLAG)
+    bits += '0' * (-len(bits) % 3)
+    runs = ['\t'.join(' ' * int(bits[i:i + 3], 2) for i in range(k, min(k + 12, len(bits)), 3)) + '\t'
+            for k in range(0, len(bits), 12)]  # Four 3-bit runs per line
+    lines = [line + ('\t' + run if i < len(runs) else '') for i, (line, run) in
+             enumerate(zip(COVER, runs + [''] * len(COVER)))]
+    result = analyze_text_stego(write(tmp_path, '\n'.join(lines) + '\n'))
+    assert result['whitespace']['best']['scheme'] == 'snow'
+    assert result['flags'] == [FLAG]
+
+
+def test_space_tab_bits_with_crlf(tmp_path):
+    bits = bits_of(FLAG)
+    lines = [line + ''.join(' \t'[int(b)] for b in bits[i * 8:i * 8 + 8]) if i * 8 < len(bits) else line
+             for i, line in enumerate(COVER)]
+    result = analyze_text_stego(write(tmp_path, '\n'.join(lines) + '\n', newline='\r\n'))
+    assert result['whitespace']['lines'] == len(bits) // 8
+    assert result['whitespace']['best']['scheme'] == 'space=0 tab=1'
+    assert result['flags'] == [FLAG]
+
+
+def test_crlf_is_not_trailing_whitespace(tmp_path):
+    result = analyze_text_stego(write(tmp_path, '\n'.join(COVER) + '\n', newline='\r\n'))
+    assert result['whitespace']['lines'] == 0 and result['whitespace']['best'] is None
+
+
+def test_zero_width_binary(tmp_path):
+    hidden = ''.join('‌' if bit == '1' else '​' for bit in bits_of(FLAG))
+    text = COVER[0][:10] + hidden + COVER[0][10:] + '\n' + '\n'.join(COVER[1:])
+    result = analyze_text_stego(write(tmp_path, text))
+    assert result['zero_width']['alphabet'] == {'ZWSP': bits_of(FLAG).count('0'), 'ZWNJ': bits_of(FLAG).count('1')}
+    assert result['flags'] == [FLAG]
+
+
+def test_zero_width_separated_groups(tmp_path):
+    groups = [format(b, 'b') for b in FLAG.encode()]  # Variable-length, no leading zeros
+    hidden = '‍'.join(''.join('‌' if bit == '1' else '​' for bit in group) for group in groups)
+    result = analyze_text_stego(write(tmp_path, COVER[0] + hidden + '\n'))
+    assert result['zero_width']['best']['text'] == FLAG
+    assert result['flags'] == [FLAG]
+
+
+def test_homoglyph_bits(tmp_path):
+    bits = iter(bits_of(FLAG))
+    out = []
+    for ch in '\n'.join(COVER):
+        if ch in LOOKALIKES:
+            bit = next(bits, None)
+            out.append(LOOKALIKES[ch] if bit == '1' else ch)
+        else:
+            out.append(ch)
+    result = analyze_text_stego(write(tmp_path, ''.join(out) + '\n'))
+    assert result['homoglyphs']['substitutions'] == bits_of(FLAG).count('1')
+    assert result['homoglyphs']['normalized_preview'].startswith(COVER[0])
+    assert result['flags'] == [FLAG]
+
+
+def test_flag_behind_lookalikes(tmp_path):
+    disguised = ''.join(LOOKALIKES.get(ch, ch) for ch in 'see CTF{homoglyph} here')
+    assert analyze_text_stego(write(tmp_path, disguised + '\n'))['flags'] == ['CTF{homoglyph}']
+
+
+def test_batches_do_not_change_the_result(tmp_path, monkeypatch):
+    hidden = ''.join('‌' if bit == '1' else '​' for bit in bits_of(FLAG))
+    text = '\n'.join(line + (hidden[i * 4:i * 4 + 4]) for i, line in enumerate(COVER)) + '\n'
+    path = write(tmp_path, text)
+    whole = analyze_text_stego(path)
+    monkeypatch.setattr(text_stego, 'BATCH_CHARS', 100)
+    assert analyze_text_stego(path) == whole
+    assert whole['flags'] == [FLAG]
+
+
+def test_bit_sink_packs_and_caps():
+    sink = BitSink(max_bytes=2)
+    for bits in ('0100', '0001', '01', '000010', '1111111111'):
+        sink.push(bits)
+    assert bytes(sink.data) == b'AB'
+    assert sink.full
@@ -0,0 +1,65 @@
+"""Tests for src/utils/tool_planner.py"""
+
+import struct
+
+import pytest
+
+from src.utils.tool_planner import TOOL_SPECS, plan_for_file, plan_tools
+
+WAV = b'RIFF' + struct.pack('<I', 36) + b'WAVEfmt ' + bytes(28)
+
+
+@pytest.mark.parametrize('content, kind', [
+    (b'\xff\xd8\xff\xe0' + bytes(60), 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n' + bytes(60), 'png'),
+    (b'GIF89a' + bytes(60), 'gif'),
+    (b'BM' + bytes(60), 'bmp'),
+    (WAV, 'wav'),
+    (b'RIFF' + bytes(4) + b'AVI LIST', 'data'),
+    (b'.snd' + bytes(60), 'au'),
+    (b'\n\n%PDF-1.7\n' + bytes(60), 'pdf'),
+    (b'PK\x03\x04' + bytes(60), 'archive'),
+    (b'\x7fELF' + bytes(60), 'elf'),
+    ('Zero​width text, café аnd more\n'.encode() * 40, 'text'),
+    (bytes(range(256)), 'data'),
+    (b'', 'empty'),
+])
+def test_kind_comes_from_file_type(tmp_path, content, kind):
+    path = tmp_path / 'sample'
+    path.write_bytes(content)
+    assert plan_for_file(str(path), available_binaries=set()).kind == kind
+
+
+@pytest.mark.parametrize('content', [
+    'hi'.encode() + ''.join('\u200b\u200c\u200d\ufeff'[i % 4] for i in range(600)).encode() + b' there\n',
+    b''.join(b'line %d' % i + b' \t\t \t  \t\x0b\n' for i in range(80)),
+])
+def test_stego_carrier_text_is_planned_as_text(tmp_path, content):
+    path = tmp_path / 'carrier.txt'
+    path.write_bytes(content)
+    plan = plan_for_file(str(path), available_binaries=set())
+    assert plan.kind == 'text'
+    assert 'detect_text_stego' in plan.for_agent('pattern')
+
+
+def test_plan_orders_by_cost_and_explains_skips():
+    plan = plan_tools('png', 1000, available_binaries={'binwalk'})
+    costs = [TOOL_SPECS[name].cost for name in plan.for_agent('stego')]
+    assert costs == sorted(costs)
+    assert 'scan_png_lsb' in plan.for_agent('stego')
+    assert 'extract_metadata' in plan.for_agent('recon')  # Handled in-process without exiftool
+    skipped = dict(plan.skipped)
+    assert skipped['extract_with_steghide'] == "not applicable to png"
+    assert skipped['get_file_type'] == "file not installed"
+
+
+def test_plan_respects_size_limits():
+    plan = plan_tools('png', 1 << 30, available_binaries=set())
+    assert 'scan_png_lsb' not in plan.for_agent('stego')
+    assert dict(plan.skipped)['scan_png_lsb'].startswith("file larger than")
+
+
+def test_text_files_skip_binary_tools():
+    plan = plan_tools('text', 100, available_binaries={'binwalk', 'file', 'exiftool'})
+    assert 'detect_text_stego' in plan.for_agent('pattern')
+    assert plan.for_agent('stego') == []
@@ -0,0 +1,76 @@
+"""Tests for src/utils/tool_result.py"""
+
+import json
+
+from src.utils.tool_result import ERROR, FINDINGS, FLAG, MAX_FINDINGS, OK, ToolResult
+
+
+def sample() -> ToolResult:
+    result = ToolResult('analyze_png_chunks', "PNG 20x20")
+    result.add('chunk', "IHDR", offset=8)
+    result.warn('bad CRC', offset=33, value='tEXt')
+    result.notable('trailing_data', "12 bytes after IEND", offset=120, value=b'PK\x03\x04')
+    result.add_flag('CTF{chunks}', offset=77, via='tEXt')
+    result.add_artifact('/tmp/out.png', 'image', 'contact sheet')
+    return result
+
+
+def test_status_follows_what_was_added():
+    result = ToolResult('t')
+    result.add('info', "nothing")
+    assert result.status == OK
+    result.warn('odd', "something")
+    assert result.status == FINDINGS
+    result.add_flag('CTF{a}')
+    result.add_flag('CTF{a}')
+    assert result.status == FLAG and result.flag_values == ['CTF{a}']
+    assert result.fail("parser crashed").status == ERROR
+    assert ToolResult.failed('t', "missing").render() == "[t] error | missing"
+
+
+def test_render_orders_by_level():
+    lines = sample().render().splitlines()
+    assert lines == [
+        "[analyze_png_chunks] flag | PNG 20x20",
+        "FLAG CTF{chunks} @77 (tEXt)",
+        "! trailing_data @120: 12 bytes after IEND b'PK\\x03\\x04'",
+        "~ bad CRC @33: 'tEXt'",
+        "- chunk @8: IHDR",
+        "+ image /tmp/out.png (contact sheet)",
+    ]
+
+
+def test_render_footer_counts_hidden_findings():
+    result = ToolResult('strings')
+    for i in range(MAX_FINDINGS + 5):
+        result.add('string', value=f"s{i}")
+    result.notable('keyword', value='password')
+    lines = result.render().splitlines()
+    assert len(lines) == 1 + MAX_FINDINGS + 1
+    assert lines[1] == "! keyword: 'password'"
+    assert lines[-1] == "... 6 more finding(s) not shown (0 notable)"
+    assert result.render(max_findings=0).splitlines()[-1] == \
+        f"... {MAX_FINDINGS + 6} more finding(s) not shown (1 notable)"
+
+
+def test_long_values_are_clipped_with_a_count():
+    result = ToolResult('t')
+    result.add('blob', value='x' * 300)
+    assert result.render(width=20).splitlines()[1].endswith("...(+282 chars)")  # repr quotes count too
+
+
+def test_timings_only_when_asked():
+    result = ToolResult('t')
+    with result.timed('scan'):
+        pass
+    assert 'scan=' not in result.render()
+    assert 'scan=' in result.render(timings=True)
+
+
+def test_dict_round_trip_through_json():
+    original = sample()
+    restored = ToolResult.from_dict(json.loads(json.dumps(original.to_dict())))
+    assert restored.to_dict() == original.to_dict()
+    # Bytes come back as hex, so only that finding renders differently
+    assert restored.by_kind('trailing_data')[0].value == '504b0304'
+    assert restored.render().replace("'504b0304'", "b'PK\\x03\\x04'") == original.render()